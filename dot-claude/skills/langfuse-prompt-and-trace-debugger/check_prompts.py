@@ -9,7 +9,9 @@ INSTRUCTIONS FOR CLAUDE/AI AGENTS:
 - This is strictly a verification tool for local development
 
 This script lists all prompts from Langfuse and shows their status
-in the current environment with colored indicators.
+in the current environment with colored indicators. Label presence comes from
+the list endpoint's metadata in a single paginated pass, so it is fast enough
+for a pre-deploy gate (exit code 1 if any prompt is missing the label).
 
 Environment:
     Requires LANGFUSE_PUBLIC_KEY and LANGFUSE_SECRET_KEY environment variables.
@@ -19,15 +21,20 @@ Environment:
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add current directory to path to import env_loader
 sys.path.insert(0, str(Path(__file__).parent))
 from env_loader import load_superpowers_env
+from langfuse_client import get_langfuse
 
 from langfuse import Langfuse
 from langfuse.api.resources.commons.errors.not_found_error import NotFoundError
 
+# Per-prompt lookups in flight at once, only used when list metadata lacks labels
+DEFAULT_CONCURRENCY = 8
+
 
 # Color codes for terminal output
 class Colors:
@@ -38,33 +45,13 @@ class Colors:
     BOLD = "\033[1m"
 
 
-def get_langfuse() -> Langfuse | None:
-    """Get Langfuse client from environment variables."""
-    try:
-        public_key = os.environ.get("LANGFUSE_PUBLIC_KEY")
-        secret_key = os.environ.get("LANGFUSE_SECRET_KEY")
-        host = os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com")
-
-        if not public_key or not secret_key:
-            print("ERROR: Missing required environment variables:")
-            print("  - LANGFUSE_PUBLIC_KEY")
-            print("  - LANGFUSE_SECRET_KEY")
-            print("\nLoad them with: set -a; source superpowers/.env; set +a")
-            return None
-
-        return Langfuse(
-            public_key=public_key,
-            secret_key=secret_key,
-            host=host
-        )
-    except Exception as e:
-        print(f"ERROR: Failed to initialize Langfuse client: {e}")
-        return None
-
+def get_all_prompts(langfuse: Langfuse) -> dict[str, list[str] | None]:
+    """
+    Get all prompt names from Langfuse with the labels the list endpoint reports.
 
-def get_all_prompts(langfuse: Langfuse) -> list[str]:
-    """Get all prompt names from Langfuse."""
-    all_prompts = []
+    Labels are None when the response carried no label metadata for a prompt.
+    """
+    all_prompts: dict[str, list[str] | None] = {}
     page = 1
     page_size = 100
     max_pages = 100
@@ -73,11 +60,10 @@ def get_all_prompts(langfuse: Langfuse) -> list[str]:
         try:
             # Use the api.prompts.list() method which is the correct API for Langfuse v3
             response = langfuse.api.prompts.list(page=page, limit=page_size)
-            page_prompts = [p.name for p in response.data]
-            all_prompts.extend(page_prompts)
+            all_prompts.update((p.name, getattr(p, "labels", None)) for p in response.data)
 
             # Check if last page
-            if len(page_prompts) < page_size:
+            if len(response.data) < page_size:
                 break
 
             # Check meta info if available
@@ -92,10 +78,10 @@ def get_all_prompts(langfuse: Langfuse) -> list[str]:
                 # Try fallback to simple list on first page
                 try:
                     response = langfuse.api.prompts.list()
-                    return [p.name for p in response.data]
+                    return {p.name: getattr(p, "labels", None) for p in response.data}
                 except Exception as fallback_e:
                     print(f"ERROR: Fallback also failed: {fallback_e}")
-                    return []
+                    return {}
             break
 
     return all_prompts
@@ -120,6 +106,31 @@ def check_prompt_exists(langfuse: Langfuse, prompt_type: str, environment: str)
         return False, "none"
 
 
+def resolve_label_presence(
+    langfuse: Langfuse,
+    prompts: dict[str, list[str] | None],
+    environment: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> dict[str, bool]:
+    """
+    Decide which prompts carry the environment label.
+
+    The list metadata answers this for every prompt in one pass; prompts listed
+    without label metadata fall back to concurrent per-prompt lookups.
+    """
+    presence = {name: environment in labels for name, labels in prompts.items() if labels is not None}
+
+    ambiguous = sorted(name for name, labels in prompts.items() if labels is None)
+    if ambiguous:
+        print(f"Checking {len(ambiguous)} prompt(s) without label metadata individually...\n")
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            results = executor.map(lambda name: check_prompt_exists(langfuse, name, environment), ambiguous)
+            for name, (exists, _) in zip(ambiguous, results):
+                presence[name] = exists
+
+    return presence
+
+
 def print_prompt_status(prompt_type: str, exists: bool, environment: str = "") -> None:
     """Print the status of a prompt with colored indicators."""
     if exists:
@@ -160,10 +171,11 @@ def main() -> None:
     found_prompts = 0
 
     # Check each prompt's availability in current environment
+    presence = resolve_label_presence(langfuse, all_prompts, env)
     print(f"{Colors.BOLD}All Prompts in Langfuse ({total_prompts} total):{Colors.RESET}")
     for prompt_name in sorted(all_prompts):
-        exists, environment = check_prompt_exists(langfuse, prompt_name, env)
-        print_prompt_status(prompt_name, exists, environment)
+        exists = presence[prompt_name]
+        print_prompt_status(prompt_name, exists, env)
         if exists:
             found_prompts += 1
 
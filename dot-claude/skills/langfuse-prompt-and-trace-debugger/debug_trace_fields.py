@@ -2,25 +2,21 @@
 """Debug script to see what fields are in traces."""
 
 import json
-import os
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 from env_loader import load_superpowers_env, select_langfuse_environment
-
-from langfuse import Langfuse
+from langfuse_client import get_langfuse
 
 if not load_superpowers_env():
     sys.exit(1)
 
 select_langfuse_environment("production")
 
-langfuse = Langfuse(
-    public_key=os.environ["LANGFUSE_PUBLIC_KEY"],
-    secret_key=os.environ["LANGFUSE_SECRET_KEY"],
-    host=os.environ.get("LANGFUSE_HOST"),
-)
+langfuse = get_langfuse()
+if not langfuse:
+    sys.exit(1)
 
 traces = langfuse.fetch_traces(limit=5)
 
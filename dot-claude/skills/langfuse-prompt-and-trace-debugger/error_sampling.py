@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Error-rate estimation from a stratified random sample of traces.
+
+Used by `fetch_error_traces.py --estimate`. The window is split into time
+buckets (the strata); each bucket's trace count comes from the API's page
+metadata, and a sample proportional to that count is drawn from every bucket.
+Error rates for the whole window, each bucket and each trace name are then
+weighted by bucket (N_h / n_h per sampled trace), with linearized variances
+including the finite population correction, and reported with Wilson score
+intervals, which stay sensible for rare errors and small samples.
+"""
+
+import math
+from collections.abc import Callable
+from dataclasses import dataclass
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959964
+# Every non-empty bucket gets at least this many samples, so it has a variance estimate
+MIN_SAMPLES_PER_STRATUM = 2
+
+
+def allocate_sample(stratum_sizes: list[int], sample_size: int) -> list[int]:
+    """Proportional allocation of `sample_size` draws over strata, never more than a stratum holds."""
+    population = sum(stratum_sizes)
+    if not population:
+        return [0] * len(stratum_sizes)
+    return [
+        min(size, max(MIN_SAMPLES_PER_STRATUM, round(sample_size * size / population))) if size else 0
+        for size in stratum_sizes
+    ]
+
+
+@dataclass
+class SampledTrace:
+    """One sampled trace and whether any of its observations is at ERROR level."""
+
+    trace_id: str
+    name: str
+    stratum: int
+    has_error: bool
+
+
+@dataclass
+class RateEstimate:
+    """Estimated share of traces with errors in a domain (all traces, one bucket, one trace name)."""
+
+    rate: float
+    low: float
+    high: float
+    # Estimated number of traces in the domain, and what the sample saw of it
+    population: float
+    sampled: int
+    errors: int
+
+
+def wilson_interval(rate: float, n: float, z: float = Z_95) -> tuple[float, float]:
+    """Wilson score interval for a proportion observed over `n` (effective) trials."""
+    if n <= 0:
+        return 0.0, 1.0
+    denominator = 1 + z * z / n
+    center = (rate + z * z / (2 * n)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def estimate_rate(
+    samples: list[SampledTrace],
+    stratum_sizes: list[int],
+    in_domain: Callable[[SampledTrace], bool] = lambda sample: True,
+    z: float = Z_95,
+) -> RateEstimate | None:
+    """
+    Stratified ratio estimate of the error rate among traces in a domain.
+
+    Each sample stands for N_h / n_h traces of its stratum. The variance is the
+    usual Taylor linearization of the ratio, summed over strata with the finite
+    population correction, and turned into an effective sample size for the
+    Wilson interval. Returns None when no sampled trace falls in the domain.
+    """
+    by_stratum: dict[int, list[SampledTrace]] = {}
+    for sample in samples:
+        by_stratum.setdefault(sample.stratum, []).append(sample)
+
+    weights = {stratum: stratum_sizes[stratum] / len(group) for stratum, group in by_stratum.items()}
+    domain = [sample for sample in samples if in_domain(sample)]
+    if not domain:
+        return None
+
+    population = sum(weights[sample.stratum] for sample in domain)
+    errors = sum(1 for sample in domain if sample.has_error)
+    rate = sum(weights[sample.stratum] for sample in domain if sample.has_error) / population
+
+    variance = 0.0
+    exact = True
+    for stratum, group in by_stratum.items():
+        n, size = len(group), stratum_sizes[stratum]
+        if n >= size:
+            # Every trace of the stratum was checked, nothing left to estimate
+            continue
+        exact = exact and not any(in_domain(sample) for sample in group)
+        if n < 2:
+            continue
+        residuals = [
+            weights[stratum] * ((sample.has_error - rate) if in_domain(sample) else 0.0) for sample in group
+        ]
+        mean = sum(residuals) / n
+        variance += (1 - n / size) * n / (n - 1) * sum((r - mean) ** 2 for r in residuals)
+    variance /= population * population
+
+    if exact:
+        low, high = rate, rate
+    else:
+        # A rate of 0 or 1 has no sample variance; fall back to the raw sample count
+        effective_n = rate * (1 - rate) / variance if variance > 0 else len(domain)
+        low, high = wilson_interval(rate, effective_n, z)
+    return RateEstimate(rate, low, high, population, len(domain), errors)
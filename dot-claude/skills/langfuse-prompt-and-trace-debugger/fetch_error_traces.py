@@ -27,6 +27,21 @@ Examples:
     # Limit to 5 results
     python fetch_error_traces.py --limit 5
 
+    # Fetch up to 16 error traces' details at once
+    python fetch_error_traces.py --concurrency 16
+
+    # Query the local mirror filled by sync_traces.py instead of the API
+    python fetch_error_traces.py --local --days 7
+
+    # One line per distinct error (IDs, numbers and quoted values stripped), new ones flagged
+    python fetch_error_traces.py --days 7 --clusters
+
+    # Live tail: poll for new errors, printing each distinct error the first time it appears
+    python fetch_error_traces.py --env production --follow
+
+    # Share of traces with errors per day and per trace name, from a 400-trace sample
+    python fetch_error_traces.py --days 7 --estimate
+
 Environment:
     Requires LANGFUSE_PUBLIC_KEY, LANGFUSE_SECRET_KEY, and LANGFUSE_HOST environment variables.
     These are automatically loaded from arsenal/.env
@@ -35,77 +50,220 @@ Environment:
 import argparse
 import json
 import os
+import random
+import re
 import sys
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
 # Add current directory to path to import env_loader
 sys.path.insert(0, str(Path(__file__).parent))
 from env_loader import load_superpowers_env, select_langfuse_environment
+from error_sampling import RateEstimate, SampledTrace, allocate_sample, estimate_rate
+from langfuse_client import bulk_reader, get_langfuse
+from trace_profile import parse_time
+from trace_store import open_local_store
 
 from langfuse import Langfuse
 
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_CONCURRENCY = 8
+
+# How far before the window to look when deciding whether an error cluster is new
+DEFAULT_BASELINE_DAYS = 7
+MAX_EXAMPLE_TRACES = 3
+MAX_FINGERPRINT_LENGTH = 300
+
+# Applied in order: quoted values first so IDs inside them don't leave partial placeholders
+FINGERPRINT_PATTERNS = [
+    (re.compile(r"'[^'\n]*'|\"[^\"\n]*\""), "<str>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<uuid>"),
+    (re.compile(r"\b(0x)?(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b"), "<hex>"),
+    # Standalone numbers only, so names like gpt4 or e2e survive
+    (re.compile(r"(?<![A-Za-z])\d+(\.\d+)?"), "<n>"),
+]
+
+# Langfuse API has a max limit of 100 per request
+PAGE_SIZE = 100
+
+# --follow polls every DEFAULT_POLL_SECONDS while errors keep arriving and backs
+# off (doubling) to DEFAULT_MAX_POLL_SECONDS while it is quiet
+DEFAULT_POLL_SECONDS = 5.0
+DEFAULT_MAX_POLL_SECONDS = 60.0
+# An ERROR observation is only queryable once it has ended and been ingested, so a
+# long span can show up well after later errors; each poll re-reads this far behind
+# the newest error seen, skipping IDs already handled in that overlap
+DEFAULT_FOLLOW_OVERLAP_MINUTES = 15
+
+# --estimate: traces checked per run (spread over the time buckets), and the
+# longest window still reported per hour when no --bucket is given
+DEFAULT_SAMPLE_SIZE = 400
+MAX_HOURLY_WINDOW = timedelta(days=2)
+
+
+def iter_error_observations(langfuse: Langfuse, from_timestamp: datetime, to_timestamp: datetime) -> Iterator[dict]:
+    """
+    Yield ERROR-level observations in the time range, newest first, one page at a time.
 
-def get_langfuse() -> Langfuse | None:
-    """Get Langfuse client from environment variables."""
-    try:
-        public_key = os.environ.get("LANGFUSE_PUBLIC_KEY")
-        secret_key = os.environ.get("LANGFUSE_SECRET_KEY")
-        host = os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com")
-
-        if not public_key or not secret_key:
-            print("ERROR: Missing required environment variables:")
-            print("  - LANGFUSE_PUBLIC_KEY")
-            print("  - LANGFUSE_SECRET_KEY")
-            print("\nThese are automatically loaded from arsenal/.env")
-            return None
-
-        return Langfuse(public_key=public_key, secret_key=secret_key, host=host)
-    except Exception as e:
-        print(f"ERROR: Failed to initialize Langfuse client: {e}")
-        return None
+    The level filter runs server-side; pages are read as raw JSON (see
+    langfuse_client.RawApi) since the v2 SDK's fetch_observations has no `level`.
+    """
+    reader = bulk_reader(langfuse)
+    page = 1
+    while True:
+        observations = reader.fetch_observations(
+            page=page, limit=PAGE_SIZE, from_start_time=from_timestamp, to_start_time=to_timestamp, level="ERROR"
+        )
+
+        for obs_dict in observations.data:
+            # Guard against servers that ignore the level parameter
+            if obs_dict.get("level") == "ERROR":
+                yield obs_dict
+
+        total_pages = getattr(getattr(observations, "meta", None), "total_pages", None)
+        if len(observations.data) < PAGE_SIZE or (total_pages is not None and page >= total_pages):
+            return
+        page += 1
+
+
+def group_errors_by_trace(observations: Iterable[dict], limit: int) -> dict[str, list[str]]:
+    """
+    Collect error messages per traceId, in order of each trace's newest error.
 
+    Stops reading once a trace beyond `limit` shows up, so only as many pages are
+    fetched as needed to cover `limit` traces.
+    """
+    errors_by_trace: dict[str, list[str]] = {}
+    for obs in observations:
+        trace_id = obs.get("traceId")
+        if not trace_id:
+            continue
+        if trace_id not in errors_by_trace and len(errors_by_trace) >= limit:
+            break
+
+        errors_by_trace.setdefault(trace_id, []).append(error_message(obs))
+    return errors_by_trace
+
+
+def error_message(obs: dict) -> str:
+    """Observation name plus its status message, as shown for each error."""
+    obs_name = obs.get("name") or "unknown"
+    status_message = obs.get("statusMessage")
+    return f"{obs_name}: {status_message}" if status_message else f"{obs_name} (ERROR level)"
 
-def has_error_observations(langfuse: Langfuse, trace_dict: dict) -> tuple[bool, list[str]]:
+
+def fingerprint_error(message: str) -> str:
     """
-    Check if a trace has any errors (either trace-level or observation-level).
+    Normalize an error message so recurrences of the same failure compare equal.
 
-    Returns:
-        Tuple of (has_errors, error_messages)
+    Quoted values, timestamps, UUIDs, long hex IDs and numbers are replaced with
+    placeholders, e.g. `KeyError: 'abc-123'` and `KeyError: 'def-456'` both become
+    `KeyError: <str>`.
     """
-    trace_id = trace_dict.get("id")
-    error_messages = []
+    fingerprint = message
+    for pattern, placeholder in FINGERPRINT_PATTERNS:
+        fingerprint = pattern.sub(placeholder, fingerprint)
+    return " ".join(fingerprint.split())[:MAX_FINGERPRINT_LENGTH]
+
+
+@dataclass
+class ErrorCluster:
+    """Errors sharing a fingerprint; counts and examples cover the report window only."""
+
+    fingerprint: str
+    example: str = ""
+    count: int = 0
+    baseline_count: int = 0
+    first_seen: datetime | None = None
+    last_seen: datetime | None = None
+    trace_ids: set[str] = field(default_factory=set)
+    example_trace_ids: list[str] = field(default_factory=list)
+
+    @property
+    def is_new(self) -> bool:
+        """Seen in the window but never during the baseline period before it."""
+        return self.count > 0 and self.baseline_count == 0
+
+    def add(self, obs: dict, message: str, seen_at: datetime | None, baseline: bool = False) -> None:
+        """Count one error observation, in the window or (baseline=True) before it."""
+        if baseline:
+            self.baseline_count += 1
+            return
+
+        self.count += 1
+        if seen_at is not None:
+            self.first_seen = min(self.first_seen or seen_at, seen_at)
+            self.last_seen = max(self.last_seen or seen_at, seen_at)
+        if not self.example:
+            self.example = message
+        if trace_id := obs.get("traceId"):
+            if trace_id not in self.trace_ids and len(self.example_trace_ids) < MAX_EXAMPLE_TRACES:
+                self.example_trace_ids.append(trace_id)
+            self.trace_ids.add(trace_id)
+
+
+def cluster_errors(observations: Iterable[dict], window_start: datetime) -> dict[str, ErrorCluster]:
+    """
+    Group error observations by fingerprint in one streaming pass.
+
+    Observations that started before `window_start` only count towards the
+    baseline, which decides whether a cluster is new.
+    """
+    clusters: dict[str, ErrorCluster] = {}
+    for obs in observations:
+        message = error_message(obs)
+        fingerprint = fingerprint_error(message)
+        cluster = clusters.get(fingerprint)
+        if cluster is None:
+            cluster = clusters[fingerprint] = ErrorCluster(fingerprint)
+
+        seen_at = parse_time(obs.get("startTime"))
+        cluster.add(obs, message, seen_at, baseline=seen_at is not None and seen_at < window_start)
+    return clusters
 
-    # First check trace-level error count
-    error_count = trace_dict.get("errorCount", 0)
-    if error_count and error_count > 0:
-        error_messages.append(f"Trace has {error_count} error(s)")
 
-    # Then check observations for ERROR level or error status
+def fetch_trace_metadata(langfuse: Langfuse, trace_id: str) -> dict:
+    """Fetch one trace's metadata, falling back to just its ID if the lookup fails."""
     try:
-        observations = langfuse.fetch_observations(trace_id=trace_id)
-
-        for obs in observations.data:
-            obs_dict = obs.dict() if hasattr(obs, "dict") else obs
-            level = obs_dict.get("level")
-            status_message = obs_dict.get("statusMessage")
-
-            # Check if observation has ERROR level or error status
-            if level == "ERROR" or (status_message and "error" in status_message.lower()):
-                obs_name = obs_dict.get("name", "unknown")
-                if status_message:
-                    error_messages.append(f"{obs_name}: {status_message}")
-                else:
-                    error_messages.append(f"{obs_name} (ERROR level)")
-
-        return len(error_messages) > 0, error_messages
+        trace = langfuse.fetch_trace(trace_id).data
+        trace_dict = trace.dict() if hasattr(trace, "dict") else dict(trace)
+        trace_dict.pop("observations", None)
+        return trace_dict
     except Exception as e:
-        # If we can't fetch observations but trace has error count, still report it
-        if error_count and error_count > 0:
-            return True, error_messages
-        print(f"  Warning: Could not fetch observations for trace {trace_id}: {e}")
-        return False, []
+        print(f"  Warning: Could not fetch trace {trace_id}: {e}")
+        return {"id": trace_id}
+
+
+def map_in_order(fn: Callable[[T], R], items: Iterable[T], concurrency: int) -> Iterator[R]:
+    """
+    Yield fn(item) for each item in input order, running up to `concurrency` calls at once.
+
+    Only a small window of calls is queued ahead of the consumer, so closing the
+    generator early (e.g. once enough results were found) cancels the rest.
+    """
+    items = iter(items)
+    window = max(1, concurrency) * 2
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        pending: deque[Future[R]] = deque(executor.submit(fn, item) for _, item in zip(range(window), items))
+        try:
+            while pending:
+                result = pending.popleft().result()
+                for item in islice(items, 1):
+                    pending.append(executor.submit(fn, item))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
 
 
 def fetch_error_traces(
@@ -113,6 +271,7 @@ def fetch_error_traces(
     hours: int | None = None,
     days: int | None = None,
     limit: int = 50,
+    concurrency: int = DEFAULT_CONCURRENCY,
 ) -> None:
     """
     Fetch traces with errors from the specified time range.
@@ -121,7 +280,8 @@ def fetch_error_traces(
         langfuse: Langfuse client
         hours: Number of hours to look back (mutually exclusive with days)
         days: Number of days to look back (mutually exclusive with hours)
-        limit: Maximum number of traces to fetch
+        limit: Maximum number of error traces to display
+        concurrency: Maximum number of trace lookups in flight at once
     """
     # Calculate time range
     now = datetime.now(timezone.utc)
@@ -143,58 +303,20 @@ def fetch_error_traces(
     print("=" * 80)
 
     try:
-        # Fetch traces from the time range
-        # Note: The Langfuse SDK supports various filters, but we need to check all traces
-        # and then filter for errors by examining their observations
-        print(f"\nFetching up to {limit} traces from {time_desc}...")
+        # Ask the API for ERROR-level observations only, so the work scales with
+        # the number of errors rather than total traffic
+        print(f"\nFetching ERROR-level observations from {time_desc}...")
+        errors_by_trace = group_errors_by_trace(iter_error_observations(langfuse, from_timestamp, now), limit)
 
-        # Langfuse API has a max limit of 100 per request
-        fetch_limit = min(limit * 3, 100)
+        if errors_by_trace:
+            print(f"  Errors found in {len(errors_by_trace)} trace(s), fetching trace details...")
 
-        # Try to use from_timestamp parameter if supported by the SDK
-        try:
-            traces = langfuse.fetch_traces(
-                limit=fetch_limit,  # Fetch more since we'll filter for errors
-                from_timestamp=from_timestamp,
-            )
-        except TypeError:
-            # If from_timestamp not supported, fall back to fetching recent traces
-            print("  Note: Time filtering not supported by SDK, checking recent traces...")
-            traces = langfuse.fetch_traces(limit=fetch_limit)
-
-        if not traces or not traces.data:
-            print("\n❌ No traces found in the specified time range")
-            return
-
-        print(f"  Found {len(traces.data)} total traces, checking for errors...")
-
-        # Filter traces that have error observations
-        error_traces: list[tuple[Any, list[str]]] = []
-
-        for trace in traces.data:
-            trace_dict = trace.dict() if hasattr(trace, "dict") else trace
-            trace_id = trace_dict.get("id", "unknown")
-            timestamp = trace_dict.get("timestamp")
-
-            # Skip traces outside our time range (if we couldn't filter in the query)
-            if timestamp:
-                if isinstance(timestamp, str):
-                    trace_time = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-                else:
-                    trace_time = timestamp
-
-                if trace_time < from_timestamp:
-                    continue
-
-            # Check if trace has error observations
-            has_errors, error_messages = has_error_observations(langfuse, trace_dict)
-
-            if has_errors:
-                error_traces.append((trace_dict, error_messages))
-
-                # Stop if we've found enough error traces
-                if len(error_traces) >= limit:
-                    break
+        # Fetch metadata only for traces that had errors, concurrently and in order
+        trace_ids = list(errors_by_trace)
+        traces = map_in_order(lambda trace_id: fetch_trace_metadata(langfuse, trace_id), trace_ids, concurrency)
+        error_traces: list[tuple[dict, list[str]]] = [
+            (trace_dict, errors_by_trace[trace_id]) for trace_id, trace_dict in zip(trace_ids, traces)
+        ]
 
         # Display results
         if not error_traces:
@@ -233,6 +355,432 @@ def fetch_error_traces(
         traceback.print_exc()
 
 
+def print_error_clusters(clusters: list[ErrorCluster], total_errors: int, flag_new: bool = True) -> None:
+    """Print clusters most frequent first, flagging ones not seen before the window."""
+    langfuse_host = os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com")
+    for cluster in clusters:
+        share = 100 * cluster.count / total_errors if total_errors else 0
+        flag = "🆕 NEW " if flag_new and cluster.is_new else ""
+        print(f"\n{flag}🔴 {cluster.count}× ({share:.0f}%) in {len(cluster.trace_ids)} trace(s)")
+        print(f"   Fingerprint: {cluster.fingerprint}")
+        if cluster.example != cluster.fingerprint:
+            print(f"   Example: {cluster.example[:MAX_FINGERPRINT_LENGTH]}")
+        first_seen = cluster.first_seen.strftime("%Y-%m-%d %H:%M:%S") if cluster.first_seen else "unknown"
+        last_seen = cluster.last_seen.strftime("%Y-%m-%d %H:%M:%S") if cluster.last_seen else "unknown"
+        print(f"   First seen: {first_seen} UTC   Last seen: {last_seen} UTC")
+        for trace_id in cluster.example_trace_ids:
+            print(f"   Trace: {langfuse_host}/trace/{trace_id}")
+
+
+def fetch_error_clusters(
+    langfuse: Langfuse,
+    hours: int | None = None,
+    days: int | None = None,
+    limit: int = 50,
+    baseline_days: int = DEFAULT_BASELINE_DAYS,
+) -> None:
+    """
+    Group errors from the specified time range into fingerprint clusters.
+
+    Args:
+        langfuse: Langfuse client
+        hours: Number of hours to look back (mutually exclusive with days)
+        days: Number of days to look back (mutually exclusive with hours)
+        limit: Maximum number of clusters to display
+        baseline_days: Days before the window to scan for earlier occurrences (0 disables NEW flags)
+    """
+    # Calculate time range
+    now = datetime.now(timezone.utc)
+    if days:
+        time_delta = timedelta(days=days)
+        time_desc = f"last {days} day(s)"
+    else:
+        hours = hours or 24
+        time_delta = timedelta(hours=hours)
+        time_desc = f"last {hours} hour(s)"
+
+    from_timestamp = now - time_delta
+    baseline_start = from_timestamp - timedelta(days=baseline_days)
+
+    print("\n" + "=" * 80)
+    print(f"ERROR CLUSTERS ({time_desc})")
+    print("=" * 80)
+    print(f"Time range: {from_timestamp.strftime('%Y-%m-%d %H:%M:%S')} to {now.strftime('%Y-%m-%d %H:%M:%S')} UTC")
+    if baseline_days:
+        print(f"Baseline for new errors: {baseline_days} day(s) before the window")
+    print(f"Langfuse host: {os.environ.get('LANGFUSE_HOST', 'unknown')}")
+    print("=" * 80)
+
+    try:
+        print(f"\nFetching ERROR-level observations from {time_desc}...")
+        clusters = cluster_errors(iter_error_observations(langfuse, baseline_start, now), from_timestamp)
+    except Exception as e:
+        print(f"\nERROR: Failed to fetch errors: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return
+
+    in_window = sorted((c for c in clusters.values() if c.count), key=lambda c: (-c.count, c.fingerprint))
+    if not in_window:
+        print(f"\n✅ No errors found in {time_desc}")
+        return
+
+    total_errors = sum(c.count for c in in_window)
+    new_clusters = sum(1 for c in in_window if c.is_new)
+    print(f"\n❌ {total_errors} error(s) in {len(in_window)} cluster(s)", end="")
+    print(f", {new_clusters} new" if baseline_days else "")
+    print("=" * 80)
+
+    print_error_clusters(in_window[:limit], total_errors)
+    if len(in_window) > limit:
+        print(f"\n... {len(in_window) - limit} more cluster(s), raise --limit to see them")
+
+    print("\n" + "=" * 80)
+    print("\nTo view detailed trace information, run:")
+    print("  cd .claude/skills/langfuse-prompt-and-trace-debugger")
+    print("  uv run python fetch_trace.py <trace_id>")
+
+
+@dataclass
+class FollowCursor:
+    """How far --follow has read: newest error start time seen, plus the IDs handled near it."""
+
+    start: datetime
+    newest: datetime
+    overlap: timedelta = timedelta(minutes=DEFAULT_FOLLOW_OVERLAP_MINUTES)
+    seen: dict[str, datetime] = field(default_factory=dict)
+
+    @property
+    def poll_from(self) -> datetime:
+        return max(self.start, self.newest - self.overlap)
+
+    def take_new(self, observations: Iterable[dict]) -> list[tuple[dict, datetime]]:
+        """Observations not handled before, oldest first, with their start times; advances the cursor."""
+        new = []
+        for obs in observations:
+            key = obs.get("id") or f"{obs.get('traceId')}:{obs.get('name')}:{obs.get('startTime')}"
+            if key in self.seen:
+                continue
+            seen_at = parse_time(obs.get("startTime")) or self.newest
+            self.seen[key] = seen_at
+            new.append((obs, seen_at))
+
+        new.sort(key=lambda item: item[1])
+        if new:
+            self.newest = max(self.newest, new[-1][1])
+        # Anything older than the next poll's start can't come back
+        horizon = self.poll_from
+        self.seen = {key: seen_at for key, seen_at in self.seen.items() if seen_at >= horizon}
+        return new
+
+
+def print_followed_error(cluster: ErrorCluster, trace_dict: dict, seen_at: datetime) -> None:
+    """Print the first occurrence of a fingerprint during --follow."""
+    langfuse_host = os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com")
+    trace_id = trace_dict.get("id", "unknown")
+    name = trace_dict.get("name", "unnamed")
+    user_id = trace_dict.get("userId", "")
+
+    print(f"\n[{seen_at.strftime('%Y-%m-%d %H:%M:%S')} UTC] 🔴 {name}  (user: {user_id or 'N/A'})")
+    print(f"   Error: {cluster.example[:MAX_FINGERPRINT_LENGTH]}")
+    if cluster.example != cluster.fingerprint:
+        print(f"   Fingerprint: {cluster.fingerprint}")
+    print(f"   URL: {langfuse_host}/trace/{trace_id}")
+
+
+def follow_error_traces(
+    langfuse: Langfuse,
+    hours: int | None = None,
+    days: int | None = None,
+    interval: float = DEFAULT_POLL_SECONDS,
+    max_interval: float = DEFAULT_MAX_POLL_SECONDS,
+    overlap_minutes: int = DEFAULT_FOLLOW_OVERLAP_MINUTES,
+) -> None:
+    """
+    Live-tail error traces, printing each error fingerprint the first time it shows up.
+
+    Each poll asks only for ERROR observations since the cursor, so a quiet
+    system costs one small request per poll. Repeats of fingerprints already
+    printed are summarized in one line per poll. Runs until interrupted, then
+    prints the session's clusters.
+
+    Args:
+        langfuse: Langfuse client
+        hours: Also show errors from this many hours back before following (default: start now)
+        days: Like hours, in days
+        interval: Seconds between polls while errors are arriving
+        max_interval: Longest wait between polls while nothing happens
+        overlap_minutes: How far behind the newest error each poll re-reads, for late-ingested errors
+    """
+    now = datetime.now(timezone.utc)
+    backlog = timedelta(days=days) if days else timedelta(hours=hours or 0)
+    cursor = FollowCursor(start=now - backlog, newest=now - backlog, overlap=timedelta(minutes=overlap_minutes))
+    clusters: dict[str, ErrorCluster] = {}
+
+    print("\n" + "=" * 80)
+    print("FOLLOWING ERROR TRACES (Ctrl+C to stop)")
+    print("=" * 80)
+    print(f"Since: {cursor.start.strftime('%Y-%m-%d %H:%M:%S')} UTC")
+    print(f"Polling every {interval:g}s while errors arrive, up to {max_interval:g}s when quiet")
+    print(f"Re-reading the last {overlap_minutes} min behind the newest error for late arrivals")
+    print(f"Langfuse host: {os.environ.get('LANGFUSE_HOST', 'unknown')}")
+    print("=" * 80)
+
+    delay = interval
+    try:
+        while True:
+            poll_to = datetime.now(timezone.utc)
+            try:
+                new = cursor.take_new(iter_error_observations(langfuse, cursor.poll_from, poll_to))
+            except Exception as e:
+                print(f"\n[{poll_to.strftime('%Y-%m-%d %H:%M:%S')} UTC] Warning: poll failed, retrying: {e}")
+                delay = min(delay * 2, max_interval)
+                time.sleep(delay)
+                continue
+
+            repeats: dict[str, int] = {}
+            for obs, seen_at in new:
+                message = error_message(obs)
+                fingerprint = fingerprint_error(message)
+                cluster = clusters.get(fingerprint)
+                if cluster is not None:
+                    cluster.add(obs, message, seen_at)
+                    repeats[fingerprint] = repeats.get(fingerprint, 0) + 1
+                    continue
+
+                cluster = clusters[fingerprint] = ErrorCluster(fingerprint)
+                cluster.add(obs, message, seen_at)
+                # Trace details are looked up only for errors that get printed
+                trace_id = obs.get("traceId")
+                trace_dict = fetch_trace_metadata(langfuse, trace_id) if trace_id else {}
+                print_followed_error(cluster, trace_dict, seen_at)
+
+            if repeats:
+                top, top_count = max(repeats.items(), key=lambda item: item[1])
+                print(
+                    f"[{poll_to.strftime('%Y-%m-%d %H:%M:%S')} UTC] ↻ {sum(repeats.values())} repeat(s) of "
+                    f"{len(repeats)} known error(s), most: {top_count}× {top[:80]}"
+                )
+
+            delay = interval if new else min(delay * 2, max_interval)
+            time.sleep(delay)
+    except KeyboardInterrupt:
+        pass
+
+    in_session = sorted(clusters.values(), key=lambda c: (-c.count, c.fingerprint))
+    total_errors = sum(c.count for c in in_session)
+    print("\n\n" + "=" * 80)
+    print(f"Stopped following: {total_errors} error(s) in {len(in_session)} cluster(s)")
+    print("=" * 80)
+    # No baseline was read, so every cluster would count as new
+    print_error_clusters(in_session, total_errors, flag_new=False)
+
+
+def time_buckets(start: datetime, end: datetime, bucket: str) -> list[tuple[datetime, datetime]]:
+    """Split [start, end) at UTC hour or day boundaries; the first and last buckets may be partial."""
+    if bucket == "hour":
+        step, edge = timedelta(hours=1), start.replace(minute=0, second=0, microsecond=0)
+    else:
+        step, edge = timedelta(days=1), start.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    buckets = []
+    lower = start
+    while lower < end:
+        edge += step
+        upper = min(edge, end)
+        buckets.append((lower, upper))
+        lower = upper
+    return buckets
+
+
+def count_traces(reader: Any, lower: datetime, upper: datetime) -> int:
+    """Number of traces in [lower, upper), from the page metadata of a one-trace request."""
+    page = reader.fetch_traces(page=1, limit=1, from_timestamp=lower, to_timestamp=upper, fields="core")
+    return int(page.meta.total_items or 0)
+
+
+def sample_traces(
+    reader: Any,
+    buckets: list[tuple[datetime, datetime]],
+    sizes: list[int],
+    allocation: list[int],
+    rng: random.Random,
+    concurrency: int,
+) -> list[tuple[int, dict]]:
+    """
+    Draw allocation[h] traces uniformly without replacement from each bucket h, as (h, trace) pairs.
+
+    Each draw is one single-trace page at a random offset, unless listing the whole
+    bucket takes fewer requests. Random choices are all made on this thread so a
+    seed reproduces the sample; the requests run concurrently.
+    """
+    query = {"order_by": "timestamp.asc", "fields": "core"}
+    requests = []
+    for stratum, (size, count) in enumerate(zip(sizes, allocation)):
+        lower, upper = buckets[stratum]
+        bucket_query = {**query, "from_timestamp": lower, "to_timestamp": upper}
+        pages = -(-size // PAGE_SIZE)
+        if count and pages <= count:
+            requests.extend(
+                (stratum, {**bucket_query, "page": page, "limit": PAGE_SIZE}) for page in range(1, pages + 1)
+            )
+        elif count:
+            requests.extend(
+                (stratum, {**bucket_query, "page": offset + 1, "limit": 1}) for offset in rng.sample(range(size), count)
+            )
+
+    pages = map_in_order(lambda request: reader.fetch_traces(**request[1]).data, requests, concurrency)
+    listed: dict[int, dict[str, dict]] = {}
+    for (stratum, _), data in zip(requests, pages):
+        # Traces sharing a timestamp have no stable order, so a trace can come back twice
+        for trace_dict in data:
+            listed.setdefault(stratum, {}).setdefault(trace_dict["id"], trace_dict)
+
+    sampled = []
+    for stratum, traces in sorted(listed.items()):
+        group = list(traces.values())
+        if len(group) > allocation[stratum]:
+            group = rng.sample(group, allocation[stratum])
+        sampled.extend((stratum, trace_dict) for trace_dict in group)
+    return sampled
+
+
+def trace_has_error(reader: Any, trace_id: str) -> bool:
+    """Whether any observation of the trace is at ERROR level."""
+    observations = reader.fetch_observations(trace_id=trace_id, level="ERROR")
+    # Guard against servers that ignore the level parameter
+    return any(obs.get("level") == "ERROR" for obs in observations.data)
+
+
+def format_rate(estimate: RateEstimate | None) -> tuple[str, str]:
+    """Rate and 95% interval columns for one estimate."""
+    if estimate is None:
+        return "-", "-"
+    return f"{100 * estimate.rate:.2f}%", f"{100 * estimate.low:.2f}% - {100 * estimate.high:.2f}%"
+
+
+def print_rate_rows(header: str, rows: list[tuple[str, str, RateEstimate | None]]) -> None:
+    """One table of (label, trace count, estimate) rows."""
+    width = max([len(header)] + [len(label) for label, _, _ in rows])
+    print(f"{header:<{width}}  {'TRACES':>10}  {'SAMPLED':>7}  {'ERRORS':>6}  {'RATE':>7}  95% CI")
+    print("-" * (width + 60))
+    for label, traces, estimate in rows:
+        rate, interval = format_rate(estimate)
+        sampled = estimate.sampled if estimate else 0
+        errors = estimate.errors if estimate else 0
+        print(f"{label:<{width}}  {traces:>10}  {sampled:>7}  {errors:>6}  {rate:>7}  {interval}")
+
+
+def estimate_error_rate(
+    langfuse: Langfuse,
+    hours: int | None = None,
+    days: int | None = None,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    bucket: str | None = None,
+    limit: int = 50,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    seed: int | None = None,
+) -> None:
+    """
+    Estimate the share of traces with errors from a stratified random sample.
+
+    The API cost is fixed by the sample size rather than the traffic: one
+    request per time bucket to count its traces, then about two per sampled
+    trace (draw it, check it for ERROR observations).
+
+    Args:
+        langfuse: Langfuse client
+        hours: Number of hours to look back (mutually exclusive with days)
+        days: Number of days to look back (mutually exclusive with hours)
+        sample_size: Traces to check, allocated to buckets in proportion to their traffic
+        bucket: "hour" or "day" (default: hour for windows up to 2 days)
+        limit: Maximum number of trace names to display
+        concurrency: Maximum number of requests in flight at once
+        seed: Random seed, to reproduce a sample
+    """
+    now = datetime.now(timezone.utc)
+    if days:
+        time_delta = timedelta(days=days)
+        time_desc = f"last {days} day(s)"
+    else:
+        hours = hours or 24
+        time_delta = timedelta(hours=hours)
+        time_desc = f"last {hours} hour(s)"
+
+    from_timestamp = now - time_delta
+    bucket = bucket or ("hour" if time_delta <= MAX_HOURLY_WINDOW else "day")
+    buckets = time_buckets(from_timestamp, now, bucket)
+    reader = bulk_reader(langfuse)
+    rng = random.Random(seed)
+
+    print("\n" + "=" * 80)
+    print(f"ERROR RATE ESTIMATE ({time_desc})")
+    print("=" * 80)
+    print(f"Time range: {from_timestamp.strftime('%Y-%m-%d %H:%M:%S')} to {now.strftime('%Y-%m-%d %H:%M:%S')} UTC")
+    print(f"Langfuse host: {os.environ.get('LANGFUSE_HOST', 'unknown')}")
+    print("=" * 80)
+
+    try:
+        print(f"\nCounting traces in {len(buckets)} {bucket} bucket(s)...")
+        sizes = list(map_in_order(lambda bounds: count_traces(reader, *bounds), buckets, concurrency))
+        population = sum(sizes)
+        if not population:
+            print(f"\n✅ No traces found in {time_desc}")
+            return
+
+        allocation = allocate_sample(sizes, sample_size)
+        print(f"Sampling {sum(allocation)} of {population:,} traces...")
+        drawn = sample_traces(reader, buckets, sizes, allocation, rng, concurrency)
+
+        print(f"Checking {len(drawn)} sampled trace(s) for errors...")
+        checks = map_in_order(lambda item: trace_has_error(reader, item[1]["id"]), drawn, concurrency)
+        samples = [
+            SampledTrace(trace_dict["id"], trace_dict.get("name") or "unnamed", stratum, has_error)
+            for (stratum, trace_dict), has_error in zip(drawn, checks)
+        ]
+    except Exception as e:
+        print(f"\nERROR: Failed to sample traces: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return
+
+    overall = estimate_rate(samples, sizes)
+    if overall is None:
+        print(f"\nNo traces could be sampled in {time_desc}")
+        return
+
+    rate, interval = format_rate(overall)
+    print("\n" + "=" * 80)
+    print(f"Traces with errors: {rate} (95% CI {interval})")
+    print(f"  ≈ {overall.rate * population:,.0f} of {population:,} traces", end="")
+    print(f"; {overall.errors} error(s) in {overall.sampled} sampled")
+    print("=" * 80 + "\n")
+
+    label_format = "%Y-%m-%d %H:00" if bucket == "hour" else "%Y-%m-%d"
+    print_rate_rows(
+        f"{bucket.upper()} (UTC)",
+        [
+            (lower.strftime(label_format), f"{size:,}", estimate_rate(samples, sizes, lambda t, h=h: t.stratum == h))
+            for h, ((lower, _), size) in enumerate(zip(buckets, sizes))
+        ],
+    )
+
+    by_name = {
+        name: estimate_rate(samples, sizes, lambda t, name=name: t.name == name)
+        for name in {sample.name for sample in samples}
+    }
+    ranked = sorted(by_name.items(), key=lambda item: (-item[1].rate * item[1].population, item[0]))
+    print()
+    print_rate_rows("TRACE NAME", [(name, f"≈{e.population:,.0f}", e) for name, e in ranked[:limit]])
+    if len(ranked) > limit:
+        print(f"\n... {len(ranked) - limit} more trace name(s), raise --limit to see them")
+
+    print("\nRates are estimated from a stratified random sample; raise --sample-size for narrower intervals.")
+    print("Trace names seen in few samples have wide intervals, and names never sampled are not listed.")
+
+
 def main() -> None:
     """Main function."""
     parser = argparse.ArgumentParser(
@@ -254,6 +802,21 @@ Examples:
 
   # Use production Langfuse server
   python fetch_error_traces.py --env production
+
+  # Fetch up to 16 error traces' details at once
+  python fetch_error_traces.py --concurrency 16
+
+  # Query the local mirror filled by sync_traces.py instead of the API
+  python fetch_error_traces.py --local --days 7
+
+  # Group recurring errors by fingerprint, flagging ones new this week
+  python fetch_error_traces.py --days 7 --clusters
+
+  # Watch production errors live, each distinct error printed once
+  python fetch_error_traces.py --env production --follow
+
+  # Estimate this week's error rate per day and trace name with 95% intervals
+  python fetch_error_traces.py --days 7 --estimate --sample-size 1000
         """,
     )
 
@@ -271,13 +834,81 @@ Examples:
         "--limit",
         type=int,
         default=50,
-        help="Maximum number of error traces to display (default: 50)",
+        help="Maximum number of error traces (or clusters with --clusters) to display (default: 50)",
     )
     parser.add_argument(
         "--env",
         choices=["staging", "production", "prod"],
         help="Langfuse environment to use (default: from LANGFUSE_ENVIRONMENT or staging)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum trace lookups in flight at once (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Read from the local mirror (run sync_traces.py first) instead of the Langfuse API",
+    )
+
+    parser.add_argument(
+        "--clusters",
+        action="store_true",
+        help="Group errors by normalized message instead of listing traces",
+    )
+    parser.add_argument(
+        "--baseline-days",
+        type=int,
+        default=DEFAULT_BASELINE_DAYS,
+        help=f"With --clusters, days before the window checked to flag new errors (default: {DEFAULT_BASELINE_DAYS})",
+    )
+
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep polling and print each new error fingerprint as it appears (--hours/--days add a backlog)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_POLL_SECONDS,
+        help=f"With --follow, seconds between polls while errors arrive (default: {DEFAULT_POLL_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=DEFAULT_MAX_POLL_SECONDS,
+        help=f"With --follow, longest wait between polls when quiet (default: {DEFAULT_MAX_POLL_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--overlap-minutes",
+        type=int,
+        default=DEFAULT_FOLLOW_OVERLAP_MINUTES,
+        help=(
+            "With --follow, minutes each poll re-reads behind the newest error, to catch errors from long spans "
+            f"or late ingestion (default: {DEFAULT_FOLLOW_OVERLAP_MINUTES})"
+        ),
+    )
+
+    parser.add_argument(
+        "--estimate",
+        action="store_true",
+        help="Estimate the share of traces with errors from a stratified random sample of traces",
+    )
+    parser.add_argument(
+        "--sample-size",
+        type=int,
+        default=DEFAULT_SAMPLE_SIZE,
+        help=f"With --estimate, traces to check (default: {DEFAULT_SAMPLE_SIZE})",
+    )
+    parser.add_argument(
+        "--bucket",
+        choices=["hour", "day"],
+        help="With --estimate, time bucket to stratify and report by (default: hour up to 2 days, else day)",
+    )
+    parser.add_argument("--seed", type=int, help="With --estimate, random seed to reproduce a sample")
 
     args = parser.parse_args()
 
@@ -287,6 +918,14 @@ Examples:
         parser.print_help()
         sys.exit(1)
 
+    if args.follow and args.clusters:
+        print("ERROR: --follow and --clusters are mutually exclusive (--follow already groups by fingerprint)")
+        sys.exit(1)
+
+    if args.estimate and (args.follow or args.clusters):
+        print("ERROR: --estimate cannot be combined with --follow or --clusters")
+        sys.exit(1)
+
     # Auto-load environment from arsenal/.env
     if not load_superpowers_env():
         sys.exit(1)
@@ -295,15 +934,50 @@ Examples:
     if args.env:
         select_langfuse_environment(args.env)
 
-    langfuse = get_langfuse()
+    langfuse = open_local_store() if args.local else get_langfuse()
     if not langfuse:
         sys.exit(1)
 
+    if args.estimate:
+        estimate_error_rate(
+            langfuse,
+            hours=args.hours,
+            days=args.days,
+            sample_size=args.sample_size,
+            bucket=args.bucket,
+            limit=args.limit,
+            concurrency=args.concurrency,
+            seed=args.seed,
+        )
+        return
+
+    if args.follow:
+        follow_error_traces(
+            langfuse,
+            hours=args.hours,
+            days=args.days,
+            interval=args.interval,
+            max_interval=max(args.interval, args.max_interval),
+            overlap_minutes=args.overlap_minutes,
+        )
+        return
+
+    if args.clusters:
+        fetch_error_clusters(
+            langfuse,
+            hours=args.hours,
+            days=args.days,
+            limit=args.limit,
+            baseline_days=args.baseline_days,
+        )
+        return
+
     fetch_error_traces(
         langfuse,
         hours=args.hours,
         days=args.days,
         limit=args.limit,
+        concurrency=args.concurrency,
     )
 
 
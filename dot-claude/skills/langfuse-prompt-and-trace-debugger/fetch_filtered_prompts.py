@@ -17,7 +17,7 @@ os.environ["LANGFUSE_PUBLIC_KEY"] = os.environ.get("LANGFUSE_PUBLIC_KEY_PROD", "
 os.environ["LANGFUSE_SECRET_KEY"] = os.environ.get("LANGFUSE_SECRET_KEY_PROD", "")
 os.environ["LANGFUSE_HOST"] = os.environ.get("LANGFUSE_HOST_PROD", "")
 
-from langfuse import Langfuse
+from langfuse_client import get_langfuse
 
 # Use production credentials
 public_key = os.environ["LANGFUSE_PUBLIC_KEY"]
@@ -30,11 +30,9 @@ if not all([public_key, secret_key, host]):
 
 print(f"Connecting to production Langfuse: {host}\n")
 
-client = Langfuse(
-    public_key=public_key,
-    secret_key=secret_key,
-    host=host
-)
+client = get_langfuse()
+if not client:
+    sys.exit(1)
 
 # Fetch all prompts
 print("Fetching all prompts from production...")
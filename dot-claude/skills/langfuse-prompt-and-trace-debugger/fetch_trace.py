@@ -12,11 +12,17 @@ Usage:
     python fetch_trace.py <trace_id>
     python fetch_trace.py <langfuse_url>
     python fetch_trace.py --list [--limit 10]
+    python fetch_trace.py --session <session_id>
 
 Examples:
     python fetch_trace.py db29520b-9acb-4af9-a7a0-1aa005eb7b24
     python fetch_trace.py "https://langfuse.prod.example.com/project/.../traces?peek=db29520b..."
     python fetch_trace.py --list --limit 5
+    python fetch_trace.py <trace_id> --max-depth 2 --max-children 20   # skim a huge agent trace
+    python fetch_trace.py <trace_id> --profile                          # where did the time go?
+    python fetch_trace.py <trace_id> --profile --export-profile trace.json  # open in speedscope/Perfetto
+    python fetch_trace.py --session <session_id>                        # a whole conversation, turn by turn
+    python fetch_trace.py --session <session_id> --max-depth 0          # turns and their top-level steps only
 
 Environment:
     Requires LANGFUSE_PUBLIC_KEY and LANGFUSE_SECRET_KEY environment variables.
@@ -28,13 +34,21 @@ import json
 import os
 import re
 import sys
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import TypeAlias
 from urllib.parse import parse_qs, urlparse
 
+import httpx
+
 # Add current directory to path to import env_loader
 sys.path.insert(0, str(Path(__file__).parent))
 from env_loader import load_superpowers_env, select_langfuse_environment
+from langfuse_client import bulk_reader, get_langfuse
+from trace_profile import build_profile, export_profile, parse_time, print_profile
 
 from langfuse import Langfuse
 from langfuse.api.resources.commons.errors.not_found_error import NotFoundError
@@ -42,29 +56,12 @@ from langfuse.api.resources.commons.errors.not_found_error import NotFoundError
 # Type alias for observation data from Langfuse API
 ObservationDict: TypeAlias = dict[str, object]
 
+# Langfuse API has a max limit of 100 per request
+PAGE_SIZE = 100
 
-def get_langfuse() -> Langfuse | None:
-    """Get Langfuse client from environment variables."""
-    try:
-        public_key = os.environ.get("LANGFUSE_PUBLIC_KEY")
-        secret_key = os.environ.get("LANGFUSE_SECRET_KEY")
-        host = os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com")
-
-        if not public_key or not secret_key:
-            print("ERROR: Missing required environment variables:")
-            print("  - LANGFUSE_PUBLIC_KEY")
-            print("  - LANGFUSE_SECRET_KEY")
-            print("\nLoad them with: set -a; source superpowers/.env; set +a")
-            return None
-
-        return Langfuse(
-            public_key=public_key,
-            secret_key=secret_key,
-            host=host
-        )
-    except Exception as e:
-        print(f"ERROR: Failed to initialize Langfuse client: {e}")
-        return None
+DEFAULT_CONCURRENCY = 8
+# Characters of each turn's input/output shown in a session timeline
+TURN_PREVIEW_CHARS = 120
 
 
 def extract_trace_id_from_url(url: str) -> str | None:
@@ -142,8 +139,128 @@ def format_observation(obs: ObservationDict, indent: int = 0) -> str:
     return "\n".join(lines)
 
 
-def display_trace(langfuse: Langfuse, trace_id: str) -> None:
-    """Fetch and display a trace with all its observations."""
+def iter_trace_observations(
+    langfuse: Langfuse, trace_id: str, page_size: int = PAGE_SIZE
+) -> Iterator[ObservationDict]:
+    """Yield every observation of a trace as a plain dict, one API page at a time."""
+    reader = bulk_reader(langfuse)
+    page = 1
+    while True:
+        observations = reader.fetch_observations(trace_id=trace_id, page=page, limit=page_size)
+        yield from observations.data
+
+        total_pages = getattr(getattr(observations, "meta", None), "total_pages", None)
+        if len(observations.data) < page_size or (total_pages is not None and page >= total_pages):
+            return
+        page += 1
+
+
+def build_observation_tree(
+    observations: list[ObservationDict],
+) -> tuple[list[ObservationDict], dict[str, list[ObservationDict]], dict[str, int]]:
+    """
+    Index observations by parent, each sibling list sorted by startTime.
+
+    Observations whose parent is missing from the trace are treated as roots so
+    they are never silently dropped.
+
+    Returns:
+        (roots, children by parent ID, subtree size by observation ID)
+    """
+    ids = {str(obs["id"]) for obs in observations}
+    roots: list[ObservationDict] = []
+    children: dict[str, list[ObservationDict]] = {}
+
+    for obs in observations:
+        parent_id = obs.get("parentObservationId")
+        if parent_id and str(parent_id) in ids:
+            children.setdefault(str(parent_id), []).append(obs)
+        else:
+            roots.append(obs)
+
+    roots.sort(key=lambda x: str(x.get("startTime", "")))
+    for siblings in children.values():
+        siblings.sort(key=lambda x: str(x.get("startTime", "")))
+
+    # Subtree sizes, computed bottom-up without recursion
+    subtree_size: dict[str, int] = {}
+    stack: list[tuple[ObservationDict, bool]] = [(root, False) for root in roots]
+    while stack:
+        obs, expanded = stack.pop()
+        obs_id = str(obs["id"])
+        if expanded:
+            subtree_size[obs_id] = 1 + sum(subtree_size[str(child["id"])] for child in children.get(obs_id, []))
+        else:
+            stack.append((obs, True))
+            stack.extend((child, False) for child in children.get(obs_id, []))
+
+    return roots, children, subtree_size
+
+
+def print_observation_tree(
+    roots: list[ObservationDict],
+    children: dict[str, list[ObservationDict]],
+    subtree_size: dict[str, int],
+    max_depth: int | None = None,
+    max_children: int | None = None,
+) -> None:
+    """
+    Print the observation tree depth-first with an explicit stack, one node at a time.
+
+    Subtrees deeper than `max_depth` and siblings beyond `max_children` are
+    collapsed into a one-line summary of how many observations they hold.
+    """
+
+    def hidden_summary(hidden: list[ObservationDict], description: str, indent: int) -> str:
+        total = sum(subtree_size[str(obs["id"])] for obs in hidden)
+        return f"{'  ' * indent}   … {len(hidden)} {description} ({total} observation(s) hidden)"
+
+    # Stack items: ("node", obs, depth), ("text", line, _) or ("end", None, _) for the blank line after a subtree
+    stack: list[tuple[str, object, int]] = []
+
+    def push_siblings(siblings: list[ObservationDict], depth: int, what: str) -> None:
+        shown = siblings if max_children is None else siblings[:max_children]
+        if len(shown) < len(siblings):
+            stack.append(("text", hidden_summary(siblings[len(shown) :], f"more {what}", depth), depth))
+        stack.extend(("node", obs, depth) for obs in reversed(shown))
+
+    push_siblings(roots, 0, "root observations")
+    while stack:
+        kind, item, depth = stack.pop()
+        if kind == "text":
+            print(item)
+            continue
+        if kind == "end":
+            print()
+            continue
+
+        obs = item
+        print(format_observation(obs, depth))
+        stack.append(("end", None, depth))
+
+        kids = children.get(str(obs["id"]), [])
+        if not kids:
+            continue
+        if max_depth is not None and depth + 1 > max_depth:
+            stack.append(("text", hidden_summary(kids, "child observation(s) below --max-depth", depth + 1), depth + 1))
+        else:
+            push_siblings(kids, depth + 1, "child observations")
+
+
+def display_trace(
+    langfuse: Langfuse,
+    trace_id: str,
+    max_depth: int | None = None,
+    max_children: int | None = None,
+    profile: bool = False,
+    export_path: Path | None = None,
+) -> None:
+    """
+    Fetch and display a trace with all its observations.
+
+    With profile=True the observation tree is replaced by a timing report
+    (critical path, self time, concurrency); export_path writes it for a trace viewer.
+    """
     try:
         # Fetch the trace
         trace_response = langfuse.fetch_trace(trace_id)
@@ -172,54 +289,42 @@ def display_trace(langfuse: Langfuse, trace_id: str) -> None:
 
         # Fetch and display observations
         print("\n" + "-" * 80)
-        print("OBSERVATIONS:")
+        print("PROFILE:" if profile else "OBSERVATIONS:")
         print("-" * 80)
 
-        observations = langfuse.fetch_observations(trace_id=trace_id)
-
-        # Group observations by parent
-        root_observations = []
-        child_observations: dict[str, list[ObservationDict]] = {}
-
-        for obs in observations.data:
-            obs_dict = obs.dict() if hasattr(obs, "dict") else obs
-            parent_id_obj = obs_dict.get("parentObservationId")
-
-            if not parent_id_obj:
-                root_observations.append(obs_dict)
-            else:
-                parent_id = str(parent_id_obj)
-                if parent_id not in child_observations:
-                    child_observations[parent_id] = []
-                child_observations[parent_id].append(obs_dict)
-
-        # Sort observations by startTime
-        root_observations.sort(key=lambda x: str(x.get("startTime", "")))
-
-        # Display observations hierarchically
-        def display_observation_tree(obs: ObservationDict, indent: int = 0) -> None:
-            print(format_observation(obs, indent))
-
-            # Display children
-            obs_id = str(obs["id"])
-            if obs_id in child_observations:
-                for child in sorted(child_observations[obs_id], key=lambda x: str(x.get("startTime", ""))):
-                    display_observation_tree(child, indent + 1)
-            print()
-
-        for obs in root_observations:
-            display_observation_tree(obs)
+        observations: list[ObservationDict] = []
+        for obs in iter_trace_observations(langfuse, trace_id):
+            observations.append(obs)
+            if len(observations) % (PAGE_SIZE * 10) == 0:
+                print(f"  ...fetched {len(observations)} observations", file=sys.stderr)
+
+        if profile or export_path:
+            report = build_profile(observations)
+            if report is None:
+                print("  No observations with start times - nothing to profile")
+                return
+            if profile:
+                print_profile(report)
+            if export_path:
+                export_profile(report, export_path, trace.name or trace_id)
+                print(f"\nProfile written to {export_path} (open at https://www.speedscope.app)")
+            if profile:
+                print("\n" + "=" * 80)
+                return
+
+        roots, children, subtree_size = build_observation_tree(observations)
+        print(f"{len(observations)} observation(s)\n")
+        print_observation_tree(roots, children, subtree_size, max_depth, max_children)
 
         # Look for SQL query spans specifically
         print("\n" + "-" * 80)
         print("SQL QUERY ANALYSIS:")
         print("-" * 80)
 
-        sql_spans = [obs for obs in observations.data if hasattr(obs, "name") and obs.name == "sql_query"]
+        sql_spans = [obs for obs in observations if obs.get("name") == "sql_query"]
 
         if sql_spans:
-            for span in sql_spans:
-                span_dict = span.dict() if hasattr(span, "dict") else span
+            for span_dict in sql_spans:
                 condition_key = "unknown"
                 if input_data := span_dict.get("input"):
                     if isinstance(input_data, dict):
@@ -238,16 +343,13 @@ def display_trace(langfuse: Langfuse, trace_id: str) -> None:
             print("  No SQL query spans found in trace")
 
         # Check for intervention conditions summary
-        summary_spans = [
-            obs for obs in observations.data if hasattr(obs, "name") and obs.name == "sql_conditions_summary"
-        ]
+        summary_spans = [obs for obs in observations if obs.get("name") == "sql_conditions_summary"]
 
         if summary_spans:
             print("\n" + "-" * 80)
             print("INTERVENTION CONDITIONS SUMMARY:")
             print("-" * 80)
-            for span in summary_spans:
-                span_dict = span.dict() if hasattr(span, "dict") else span
+            for span_dict in summary_spans:
                 if input_data := span_dict.get("input"):
                     if isinstance(input_data, dict):
                         if evaluated := input_data.get("conditions_evaluated"):
@@ -273,6 +375,222 @@ def display_trace(langfuse: Langfuse, trace_id: str) -> None:
         print("  LANGFUSE_HOST")
 
 
+@dataclass
+class SessionTurn:
+    """One trace of a session, with its observations and when it ran."""
+
+    number: int
+    trace: dict
+    observations: list[ObservationDict]
+    start: datetime
+    end: datetime
+
+    @property
+    def latency_ms(self) -> float:
+        return (self.end - self.start).total_seconds() * 1000
+
+    def at_level(self, level: str) -> list[ObservationDict]:
+        return [obs for obs in self.observations if obs.get("level") == level]
+
+
+def extract_session_id_from_url(url: str) -> str | None:
+    """Extract a session ID from a Langfuse sessions URL."""
+    path_match = re.search(r"/sessions/([^/?#]+)", urlparse(url).path)
+    return path_match.group(1) if path_match else None
+
+
+def iter_session_traces(langfuse: Langfuse, session_id: str) -> Iterator[dict]:
+    """Yield every trace of a session as a plain dict, oldest first, one API page at a time."""
+    reader = bulk_reader(langfuse)
+    page = 1
+    while True:
+        traces = reader.fetch_traces(session_id=session_id, page=page, limit=PAGE_SIZE, order_by="timestamp.asc")
+        yield from traces.data
+
+        total_pages = getattr(getattr(traces, "meta", None), "total_pages", None)
+        if len(traces.data) < PAGE_SIZE or (total_pages is not None and page >= total_pages):
+            return
+        page += 1
+
+
+def fetch_session(langfuse: Langfuse, session_id: str, concurrency: int = DEFAULT_CONCURRENCY) -> list[SessionTurn]:
+    """
+    Every trace of a session with all its observations, as turns in start order.
+
+    Observation fetches are queued as each page of traces arrives and run
+    `concurrency` at a time, so a long session takes about as long as a few
+    trace fetches instead of the sum of all of them.
+    """
+    def fetch_all_observations(trace_id: str) -> list[ObservationDict]:
+        return list(iter_trace_observations(langfuse, trace_id))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        pending = [
+            (trace_dict, executor.submit(fetch_all_observations, trace_dict["id"]))
+            for trace_dict in iter_session_traces(langfuse, session_id)
+        ]
+        fetched = [(trace_dict, future.result()) for trace_dict, future in pending]
+
+    turns = []
+    for trace_dict, observations in fetched:
+        times = [parse_time(trace_dict.get("timestamp"))]
+        for obs in observations:
+            times.extend((parse_time(obs.get("startTime")), parse_time(obs.get("endTime"))))
+        times = [time for time in times if time is not None]
+        if not times:
+            continue
+        start, end = min(times), max(times)
+        # Traces without timed observations still carry the API's latency (seconds)
+        if end == start and trace_dict.get("latency"):
+            end = start + timedelta(seconds=float(trace_dict["latency"]))
+        turns.append(SessionTurn(0, trace_dict, observations, start, end))
+
+    turns.sort(key=lambda turn: turn.start)
+    for number, turn in enumerate(turns, 1):
+        turn.number = number
+    return turns
+
+
+def _fmt(ms: float) -> str:
+    return f"{ms / 1000:.2f}s" if ms >= 1000 else f"{ms:.0f}ms"
+
+
+def format_offset(seconds: float) -> str:
+    """Time since the session started, e.g. +1:05.250 or +2:01:05.250."""
+    minutes, secs = divmod(max(0.0, seconds), 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"+{hours}:{minutes:02d}:{secs:06.3f}" if hours else f"+{minutes}:{secs:06.3f}"
+
+
+def format_span(seconds: float) -> str:
+    """A duration in its two largest units, e.g. 4m 05s, 3h 05m or 2d 4h."""
+    if seconds < 60:
+        return _fmt(seconds * 1000)
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    if days:
+        return f"{days}d {hours}h"
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m {secs:02d}s"
+
+
+def preview(value: object, limit: int = TURN_PREVIEW_CHARS) -> str:
+    """A one-line, truncated rendering of a trace input or output."""
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def observation_depths(observations: list[ObservationDict]) -> dict[str, int]:
+    """Nesting depth of each observation (roots = 0), from the parent/child tree."""
+    roots, children, _ = build_observation_tree(observations)
+    depths: dict[str, int] = {}
+    stack = [(root, 0) for root in roots]
+    while stack:
+        obs, depth = stack.pop()
+        depths[str(obs["id"])] = depth
+        stack.extend((child, depth + 1) for child in children.get(str(obs["id"]), []))
+    return depths
+
+
+def print_session_timeline(turns: list[SessionTurn], max_depth: int | None = None) -> None:
+    """Print a per-turn summary, then every turn's observations merged into one timeline."""
+    session_start = turns[0].start
+    langfuse_host = os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com")
+    width = len(format_offset((max(turn.end for turn in turns) - session_start).total_seconds()))
+
+    print("\n" + "-" * 80)
+    print("TURNS:")
+    print("-" * 80)
+    print(
+        f"{'#':>3}  {'START (UTC)':<19}  {'OFFSET':>{width}}  {'LATENCY':>8}  {'GAP':>8}  {'OBS':>4}  {'ERRORS':>6}  NAME"
+    )
+    previous_end = None
+    for turn in turns:
+        if previous_end is None:
+            gap = "-"
+        elif turn.start < previous_end:
+            gap = "overlap"
+        else:
+            gap = format_span((turn.start - previous_end).total_seconds())
+        errors = len(turn.at_level("ERROR"))
+        print(
+            f"{turn.number:>3}  {turn.start.strftime('%Y-%m-%d %H:%M:%S'):<19}  "
+            f"{format_offset((turn.start - session_start).total_seconds()):>{width}}  {_fmt(turn.latency_ms):>8}  "
+            f"{gap:>8}  {len(turn.observations):>4}  {('❌ ' + str(errors)) if errors else '-':>6}  "
+            f"{turn.trace.get('name') or 'unnamed'}"
+        )
+        previous_end = max(previous_end or turn.end, turn.end)
+
+    # (time, order at equal times, turn number, line): turn start, its observations, turn end
+    events: list[tuple[datetime, int, int, str]] = []
+    for turn in turns:
+        trace = turn.trace
+        start_line = f"▶ {trace.get('name') or 'unnamed'}  {langfuse_host}/trace/{trace.get('id')}"
+        if trace.get("input"):
+            start_line += f"\n{' ' * (width + 10)}in:  {preview(trace['input'])}"
+        events.append((turn.start, 0, turn.number, start_line))
+
+        depths = observation_depths(turn.observations)
+        for obs in turn.observations:
+            obs_start = parse_time(obs.get("startTime"))
+            depth = depths.get(str(obs["id"]), 0)
+            if obs_start is None or (max_depth is not None and depth > max_depth):
+                continue
+            obs_end = parse_time(obs.get("endTime"))
+            duration = f"  {_fmt((obs_end - obs_start).total_seconds() * 1000)}" if obs_end else ""
+            line = f"{'  ' * (depth + 1)}{str(obs.get('type', '')).lower()} {obs.get('name') or 'unnamed'}{duration}"
+            if obs.get("level") in ("ERROR", "WARNING"):
+                marker = "❌" if obs.get("level") == "ERROR" else "⚠️ "
+                line += f"  {marker} {preview(obs.get('statusMessage') or obs['level'])}"
+            events.append((obs_start, 1, turn.number, line))
+
+        end_line = f"■ done in {_fmt(turn.latency_ms)}"
+        if trace.get("output"):
+            end_line += f"  out: {preview(trace['output'])}"
+        events.append((turn.end, 2, turn.number, end_line))
+
+    print("\n" + "-" * 80)
+    print("TIMELINE:")
+    print("-" * 80)
+    for time, _, number, line in sorted(events, key=lambda event: event[:3]):
+        print(f"{format_offset((time - session_start).total_seconds()):>{width}}  T{number:<4} {line}")
+
+
+def display_session(
+    langfuse: Langfuse, session_id: str, max_depth: int | None = None, concurrency: int = DEFAULT_CONCURRENCY
+) -> None:
+    """Fetch every trace of a session and show it as one chronological timeline."""
+    try:
+        print(f"Fetching traces of session {session_id}...")
+        turns = fetch_session(langfuse, session_id, concurrency)
+    except (ConnectionError, TimeoutError, httpx.HTTPError) as e:
+        print(f"\nERROR: Failed to fetch session from Langfuse: {e}")
+        return
+
+    if not turns:
+        print(f"\nERROR: No traces found for session '{session_id}'")
+        return
+
+    users = sorted({str(turn.trace["userId"]) for turn in turns if turn.trace.get("userId")})
+    session_end = max(turn.end for turn in turns)
+    errors = sum(len(turn.at_level("ERROR")) for turn in turns)
+    slowest = max(turns, key=lambda turn: turn.latency_ms)
+
+    print("\n" + "=" * 80)
+    print(f"SESSION: {session_id}")
+    print("=" * 80)
+    print(f"Turns: {len(turns)}   Observations: {sum(len(turn.observations) for turn in turns)}   Errors: {errors}")
+    print(f"User(s): {', '.join(users) or 'N/A'}")
+    print(f"Span: {turns[0].start.strftime('%Y-%m-%d %H:%M:%S')} to ", end="")
+    print(f"{session_end.strftime('%Y-%m-%d %H:%M:%S')} UTC", end="")
+    print(f" ({format_span((session_end - turns[0].start).total_seconds())})")
+    print(f"Slowest turn: #{slowest.number} ({_fmt(slowest.latency_ms)})")
+
+    print_session_timeline(turns, max_depth)
+    print("\n" + "=" * 80)
+
+
 def list_recent_traces(langfuse: Langfuse, limit: int = 10) -> None:
     """List recent traces."""
     try:
@@ -312,6 +630,28 @@ def main() -> None:
     parser.add_argument("trace_input", nargs="?", help="Trace ID or Langfuse URL")
     parser.add_argument("--list", action="store_true", help="List recent traces")
     parser.add_argument("--limit", type=int, default=10, help="Number of traces to list (default: 10)")
+    parser.add_argument("--max-depth", type=int, help="Collapse observations nested deeper than this (root = 0)")
+    parser.add_argument("--max-children", type=int, help="Show at most this many children per observation")
+    parser.add_argument(
+        "--profile", action="store_true", help="Show critical path, self time and concurrency instead of the tree"
+    )
+    parser.add_argument(
+        "--export-profile",
+        type=Path,
+        metavar="PATH",
+        help="Write the timeline as Chrome trace JSON (*.speedscope.json writes native speedscope format)",
+    )
+    parser.add_argument(
+        "--session",
+        metavar="SESSION_ID",
+        help="Show every trace of a session (ID or Langfuse sessions URL) as one timeline",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"With --session, traces fetched at once (default: {DEFAULT_CONCURRENCY})",
+    )
     parser.add_argument(
         "--env",
         choices=["staging", "production", "prod"],
@@ -332,7 +672,15 @@ def main() -> None:
     if not langfuse:
         sys.exit(1)
 
-    if args.list:
+    if args.session:
+        session_id = args.session
+        if session_id.startswith("http"):
+            session_id = extract_session_id_from_url(session_id)
+            if not session_id:
+                print(f"ERROR: Could not extract session ID from URL: {args.session}")
+                sys.exit(1)
+        display_session(langfuse, session_id, args.max_depth, args.concurrency)
+    elif args.list:
         list_recent_traces(langfuse, args.limit)
     elif args.trace_input:
         # Check if it's a URL or direct trace ID
@@ -342,9 +690,9 @@ def main() -> None:
                 print(f"ERROR: Could not extract trace ID from URL: {args.trace_input}")
                 sys.exit(1)
             print(f"Extracted trace ID from URL: {trace_id}")
-            display_trace(langfuse, trace_id)
         else:
-            display_trace(langfuse, args.trace_input)
+            trace_id = args.trace_input
+        display_trace(langfuse, trace_id, args.max_depth, args.max_children, args.profile, args.export_profile)
     else:
         parser.print_help()
 
@@ -1,22 +1,60 @@
 #!/usr/bin/env python3
 """
 Fetch Langfuse traces from a specific time window.
+
+The window is filtered server-side and every page of it is walked, so old
+windows work no matter how many traces came after them. With --local the
+window is read from the mirror filled by sync_traces.py instead.
 """
 
 import argparse
 import os
 import sys
+from collections.abc import Iterator
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 from env_loader import load_superpowers_env, select_langfuse_environment
+from langfuse_client import bulk_reader, get_langfuse
+from trace_store import open_local_store
 
 from langfuse import Langfuse
 
+# Langfuse API has a max limit of 100 per request
+PAGE_SIZE = 100
+
+
+def iter_traces_in_window(
+    langfuse: Langfuse, start_time: datetime, end_time: datetime, page_size: int = PAGE_SIZE
+) -> Iterator[dict]:
+    """Lazily yield every trace in [start_time, end_time] as a plain dict, oldest first, one API page at a time."""
+    reader = bulk_reader(langfuse)
+    page = 1
+    while True:
+        traces = reader.fetch_traces(
+            page=page,
+            limit=page_size,
+            from_timestamp=start_time,
+            to_timestamp=end_time,
+            order_by="timestamp.asc",
+            # Only metadata is printed, so skip input/output where the server supports it
+            fields="core",
+        )
+
+        yield from traces.data
+
+        total_pages = getattr(getattr(traces, "meta", None), "total_pages", None)
+        if len(traces.data) < page_size or (total_pages is not None and page >= total_pages):
+            return
+        page += 1
+
 
-def fetch_traces_by_time(langfuse: Langfuse, start_time_str: str, end_time_str: str, limit: int = 100):
-    """Fetch traces from a specific time window."""
+def fetch_traces_by_time(
+    langfuse: Langfuse, start_time_str: str, end_time_str: str, limit: int | None = None, page_size: int = PAGE_SIZE
+):
+    """Fetch traces from a specific time window, printing them as pages arrive."""
 
     # Parse time strings
     start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
@@ -26,26 +64,14 @@ def fetch_traces_by_time(langfuse: Langfuse, start_time_str: str, end_time_str:
     print(f"  Start: {start_time}")
     print(f"  End:   {end_time}")
     print(f"  Host:  {os.environ.get('LANGFUSE_HOST')}")
+    print()
 
-    traces = langfuse.fetch_traces(limit=limit)
+    traces = iter_traces_in_window(langfuse, start_time, end_time, page_size)
+    if limit is not None:
+        traces = islice(traces, limit)
 
-    matching_traces = []
-    for trace in traces.data:
-        trace_dict = trace.dict() if hasattr(trace, "dict") else trace
-        timestamp = trace_dict.get("timestamp")
-
-        if timestamp:
-            if isinstance(timestamp, str):
-                trace_time = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-            else:
-                trace_time = timestamp
-
-            if start_time <= trace_time <= end_time:
-                matching_traces.append(trace_dict)
-
-    print(f"\nFound {len(matching_traces)} traces in time window:\n")
-
-    for trace_dict in matching_traces:
+    count = 0
+    for trace_dict in traces:
         trace_id = trace_dict.get("id")
         name = trace_dict.get("name", "unnamed")
         timestamp = trace_dict.get("timestamp", "")
@@ -57,14 +83,19 @@ def fetch_traces_by_time(langfuse: Langfuse, start_time_str: str, end_time_str:
         print(f"   User: {user_id or 'N/A'}")
         print(f"   URL: {os.environ.get('LANGFUSE_HOST')}/trace/{trace_id}")
         print()
+        count += 1
+
+    print(f"Found {count} traces in time window")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Fetch traces from specific time window")
     parser.add_argument("start_time", help="Start time (ISO format: 2025-11-14T02:00:00Z)")
     parser.add_argument("end_time", help="End time (ISO format: 2025-11-14T03:00:00Z)")
-    parser.add_argument("--limit", type=int, default=100, help="Max traces to fetch")
+    parser.add_argument("--limit", type=int, help="Stop after this many traces (default: all traces in the window)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help=f"Traces per API call (default: {PAGE_SIZE})")
     parser.add_argument("--env", choices=["staging", "production", "prod"], help="Langfuse environment")
+    parser.add_argument("--local", action="store_true", help="Read from the local mirror (run sync_traces.py first)")
 
     args = parser.parse_args()
 
@@ -74,13 +105,11 @@ def main():
     if args.env:
         select_langfuse_environment(args.env)
 
-    langfuse = Langfuse(
-        public_key=os.environ["LANGFUSE_PUBLIC_KEY"],
-        secret_key=os.environ["LANGFUSE_SECRET_KEY"],
-        host=os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com"),
-    )
+    langfuse = open_local_store() if args.local else get_langfuse()
+    if not langfuse:
+        sys.exit(1)
 
-    fetch_traces_by_time(langfuse, args.start_time, args.end_time, args.limit)
+    fetch_traces_by_time(langfuse, args.start_time, args.end_time, args.limit, args.page_size)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Shared, pooled HTTP client for every script in this skill.
+
+All Langfuse traffic (SDK calls and raw REST requests) goes through one
+process-wide httpx.Client, so connections are kept alive and reused instead of
+paying a TLS handshake per request. httpx negotiates gzip/deflate compression by
+default. Transient failures are retried with jittered exponential backoff,
+honoring `Retry-After` on 429 responses.
+
+Environment (all optional):
+    LANGFUSE_HTTP_TIMEOUT          Read/write timeout in seconds (default: 30)
+    LANGFUSE_HTTP_CONNECT_TIMEOUT  Connect timeout in seconds (default: 10)
+    LANGFUSE_HTTP_MAX_CONNECTIONS  Connection pool size (default: 20)
+    LANGFUSE_HTTP_MAX_RETRIES      Retries per request (default: 4)
+    LANGFUSE_HTTP2                 Set to 1 to use HTTP/2 (needs the `h2` package)
+    LANGFUSE_RECORD_DIR            Save every API response into this cassette directory,
+                                   for replay with standin_server.py
+
+Bulk scans use RawApi instead of the SDK: list endpoints are read as raw JSON
+pages and decoded straight into plain dicts (with orjson when installed), so
+there is no pydantic model construction, validation and `.dict()` round trip
+per trace or observation, and pages are only decoded when their data is used.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from functools import cached_property, lru_cache
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+from langfuse import Langfuse
+
+try:
+    # Several times faster than the stdlib decoder on large pages; optional
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+HTTP_TIMEOUT = float(os.environ.get("LANGFUSE_HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("LANGFUSE_HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("LANGFUSE_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_RETRIES = int(os.environ.get("LANGFUSE_HTTP_MAX_RETRIES", "4"))
+HTTP2 = os.environ.get("LANGFUSE_HTTP2", "").lower() in ("1", "true", "yes")
+RECORD_DIR = os.environ.get("LANGFUSE_RECORD_DIR")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Requests that are safe to send twice; POST is only retried when the server
+# provably did not process it (connection never made, or 429)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_CAP_SECONDS = 30.0
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with full jitter, so parallel workers do not retry in lockstep."""
+    return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt))
+
+
+class RetryTransport(httpx.BaseTransport):
+    """Wraps a transport and retries transient failures (timeouts, resets, 429 and 5xx)."""
+
+    def __init__(self, transport: httpx.BaseTransport, max_retries: int = HTTP_MAX_RETRIES):
+        self.transport = transport
+        self.max_retries = max_retries
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        idempotent = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            try:
+                response = self.transport.handle_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                # The request never reached the server, so any method is safe to resend
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_seconds(attempt)
+            except (httpx.ReadTimeout, httpx.RemoteProtocolError, httpx.ReadError):
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                delay = backoff_seconds(attempt)
+            else:
+                status = response.status_code
+                if (
+                    status not in RETRY_STATUSES
+                    or attempt >= self.max_retries
+                    or (status != 429 and not idempotent)
+                ):
+                    return response
+                delay = retry_after_seconds(response)
+                if delay is None:
+                    delay = backoff_seconds(attempt)
+                response.close()
+
+            attempt += 1
+            time.sleep(min(delay, BACKOFF_CAP_SECONDS * 2))
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+def cassette_key(method: str, path: str, query: list[tuple[str, str]]) -> str:
+    """Stable file name for a request, independent of query parameter order."""
+    canonical = json.dumps([method.upper(), path, sorted(query)])
+    return f"{method.lower()}_{hashlib.sha256(canonical.encode()).hexdigest()[:20]}"
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """
+    Saves each response as a JSON fixture ("cassette") for offline replay.
+
+    Only the method, path, query and response body are stored - never request
+    headers, so credentials stay out of the fixtures. Responses the retry layer
+    would retry (429/5xx) are not recorded.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, directory: Path):
+        self.transport = transport
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self.transport.handle_request(request)
+        if response.status_code in RETRY_STATUSES:
+            return response
+
+        content = response.read()
+        query = list(request.url.params.multi_items())
+        try:
+            body = json.loads(content) if content else None
+        except ValueError:
+            body = content.decode(errors="replace")
+
+        fixture = {
+            "request": {"method": request.method, "path": request.url.path, "query": query},
+            "response": {"status": response.status_code, "body": body},
+        }
+        path = self.directory / f"{cassette_key(request.method, request.url.path, query)}.json"
+        path.write_text(json.dumps(fixture, indent=1, sort_keys=True))
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+@lru_cache(maxsize=None)
+def get_http_client() -> httpx.Client:
+    """The process-wide pooled client; safe to share between threads."""
+    http2 = HTTP2
+    if http2 and importlib.util.find_spec("h2") is None:
+        print("Warning: LANGFUSE_HTTP2 is set but the `h2` package is not installed, using HTTP/1.1", file=sys.stderr)
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+        keepalive_expiry=30.0,
+    )
+    transport: httpx.BaseTransport = RetryTransport(httpx.HTTPTransport(http2=http2, limits=limits))
+    if RECORD_DIR:
+        print(f"Recording Langfuse API responses to {RECORD_DIR}", file=sys.stderr)
+        transport = RecordingTransport(transport, Path(RECORD_DIR))
+    return httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+    )
+
+
+def get_langfuse() -> Langfuse | None:
+    """Get Langfuse client from environment variables, sharing the pooled HTTP client."""
+    try:
+        public_key = os.environ.get("LANGFUSE_PUBLIC_KEY")
+        secret_key = os.environ.get("LANGFUSE_SECRET_KEY")
+        host = os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com")
+
+        if not public_key or not secret_key:
+            print("ERROR: Missing required environment variables:")
+            print("  - LANGFUSE_PUBLIC_KEY")
+            print("  - LANGFUSE_SECRET_KEY")
+            print("\nThese are automatically loaded from arsenal/.env")
+            return None
+
+        return Langfuse(
+            public_key=public_key,
+            secret_key=secret_key,
+            host=host,
+            httpx_client=get_http_client(),
+            # The SDK applies its own per-request timeout on top of the client's
+            timeout=int(HTTP_TIMEOUT),
+        )
+    except Exception as e:
+        print(f"ERROR: Failed to initialize Langfuse client: {e}")
+        return None
+
+
+def _api_timestamp(value: datetime | None) -> str | None:
+    """Datetimes in the format the SDK sends them (UTC, `Z` suffix)."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def raw_searchable(term: str) -> bool:
+    """
+    Whether `term` appears verbatim in raw JSON wherever it appears in the decoded values.
+
+    False for terms JSON would escape: quotes, backslashes, control or non-ASCII characters.
+    """
+    return term.isascii() and term.isprintable() and '"' not in term and "\\" not in term
+
+
+class RawPage:
+    """One list response, decoded on first access so callers can skip pages by their raw text."""
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    @cached_property
+    def body(self) -> dict:
+        return json_loads(self.content)
+
+    @property
+    def data(self) -> list[dict]:
+        return self.body.get("data", [])
+
+    @property
+    def meta(self) -> SimpleNamespace:
+        meta = self.body.get("meta") or {}
+        return SimpleNamespace(
+            page=meta.get("page"),
+            limit=meta.get("limit"),
+            total_items=meta.get("totalItems"),
+            total_pages=meta.get("totalPages"),
+        )
+
+    def contains(self, term: str) -> bool:
+        """
+        Case-insensitive substring test on the undecoded response.
+
+        Only says False when the term cannot be in any decoded value; terms that
+        are not raw_searchable always report True so the caller decodes and checks.
+        """
+        if not raw_searchable(term):
+            return True
+        return term.lower().encode() in self.content.lower()
+
+
+class RawApi:
+    """
+    Read-only bulk access to the public REST API, returning plain dicts.
+
+    fetch_traces/fetch_observations take the same arguments as the SDK methods
+    (plus the API's `level` and `fields` filters) and return RawPage objects
+    with `.data` and `.meta`, so paging loops work unchanged. Timestamps stay
+    ISO strings rather than datetimes.
+    """
+
+    def __init__(self, host: str, public_key: str, secret_key: str, client: httpx.Client):
+        self.host = host.rstrip("/")
+        self.auth = (public_key, secret_key)
+        self.client = client
+
+    def get(self, path: str, params: dict[str, Any]) -> RawPage:
+        query = {key: value for key, value in params.items() if value is not None}
+        response = self.client.get(f"{self.host}{path}", params=query, auth=self.auth)
+        response.raise_for_status()
+        return RawPage(response.content)
+
+    def fetch_traces(
+        self,
+        *,
+        page: int | None = None,
+        limit: int | None = None,
+        user_id: str | None = None,
+        name: str | None = None,
+        session_id: str | None = None,
+        from_timestamp: datetime | None = None,
+        to_timestamp: datetime | None = None,
+        order_by: str | None = None,
+        fields: str | None = None,
+        **_: Any,
+    ) -> RawPage:
+        """GET /api/public/traces. `fields="core"` asks servers that support it to omit input/output."""
+        return self.get(
+            "/api/public/traces",
+            {
+                "page": page,
+                "limit": limit,
+                "userId": user_id,
+                "name": name,
+                "sessionId": session_id,
+                "fromTimestamp": _api_timestamp(from_timestamp),
+                "toTimestamp": _api_timestamp(to_timestamp),
+                "orderBy": order_by,
+                "fields": fields,
+            },
+        )
+
+    def fetch_observations(
+        self,
+        *,
+        page: int | None = None,
+        limit: int | None = None,
+        name: str | None = None,
+        trace_id: str | None = None,
+        parent_observation_id: str | None = None,
+        from_start_time: datetime | None = None,
+        to_start_time: datetime | None = None,
+        type: str | None = None,
+        level: str | None = None,
+        **_: Any,
+    ) -> RawPage:
+        """GET /api/public/observations, including the `level` filter the v2 SDK does not expose."""
+        return self.get(
+            "/api/public/observations",
+            {
+                "page": page,
+                "limit": limit,
+                "name": name,
+                "traceId": trace_id,
+                "parentObservationId": parent_observation_id,
+                "fromStartTime": _api_timestamp(from_start_time),
+                "toStartTime": _api_timestamp(to_start_time),
+                "type": type,
+                "level": level,
+            },
+        )
+
+
+@lru_cache(maxsize=None)
+def get_raw_api() -> RawApi:
+    """RawApi for the configured environment, sharing the pooled HTTP client."""
+    return RawApi(
+        os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com"),
+        os.environ.get("LANGFUSE_PUBLIC_KEY", ""),
+        os.environ.get("LANGFUSE_SECRET_KEY", ""),
+        get_http_client(),
+    )
+
+
+def bulk_reader(langfuse: Any) -> Any:
+    """
+    What bulk scans should page through: RawApi for a Langfuse client, the
+    object itself otherwise (e.g. the local TraceStore, which already returns dicts).
+    """
+    return get_raw_api() if isinstance(langfuse, Langfuse) else langfuse
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Latency percentiles per observation name, type and model across a time window.
+
+INSTRUCTIONS FOR CLAUDE/AI AGENTS:
+- This script is READ-ONLY - it only fetches observation data from Langfuse for viewing
+- DO NOT use this script to modify or delete traces in Langfuse
+- DO NOT push any changes to Langfuse
+- This is strictly a debugging tool for understanding latency
+
+Usage:
+    python latency_report.py
+    python latency_report.py --days 7 --name message_enricher
+    python latency_report.py --type GENERATION --group-by model
+
+Examples:
+    # p50/p90/p99 per observation name/type/model over the last 24 hours (default)
+    python latency_report.py
+
+    # "What is p99 latency of message_enricher generations this week?"
+    python latency_report.py --days 7 --name message_enricher --type GENERATION
+
+    # Compare models across every generation in production
+    python latency_report.py --env production --type GENERATION --group-by model
+
+    # Report over the local mirror filled by sync_traces.py
+    python latency_report.py --local --days 30
+
+Observations are streamed page by page into fixed-accuracy log-bucketed
+histograms, so memory depends on the number of groups, not the number of
+observations, and the report can run over millions of observations.
+
+Environment:
+    Requires LANGFUSE_PUBLIC_KEY, LANGFUSE_SECRET_KEY, and LANGFUSE_HOST environment variables.
+    These are automatically loaded from arsenal/.env
+"""
+
+import argparse
+import math
+import os
+import sys
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add current directory to path to import env_loader
+sys.path.insert(0, str(Path(__file__).parent))
+from env_loader import load_superpowers_env, select_langfuse_environment
+from langfuse_client import bulk_reader, get_langfuse
+from trace_profile import parse_time
+from trace_store import open_local_store
+
+from langfuse import Langfuse
+
+# Langfuse API has a max limit of 100 per request
+PAGE_SIZE = 100
+
+GROUP_FIELDS = ("name", "type", "model")
+PERCENTILES = (0.5, 0.9, 0.99)
+
+# Histogram quantiles are within 1% of the true value
+RELATIVE_ACCURACY = 0.01
+
+
+class LatencyHistogram:
+    """
+    Mergeable latency histogram with logarithmic buckets (as in DDSketch/HDR).
+
+    A value v lands in bucket ceil(log_gamma(v)); every quantile estimate is within
+    RELATIVE_ACCURACY of the true value. Durations from 1ms to a day need under a
+    thousand buckets, so memory is bounded however many values are added, and two
+    histograms merge by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge histograms with different accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimated value at quantile q (0-1), clamped to the observed min/max."""
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i] in relative terms
+                estimate = 2 * self.gamma**index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+
+def iter_observations(
+    langfuse: Langfuse,
+    from_timestamp: datetime,
+    to_timestamp: datetime,
+    name: str | None = None,
+    observation_type: str | None = None,
+) -> Iterator[dict]:
+    """Yield observations that started in the time range as plain dicts, one page at a time."""
+    reader = bulk_reader(langfuse)
+    page = 1
+    while True:
+        observations = reader.fetch_observations(
+            page=page,
+            limit=PAGE_SIZE,
+            name=name,
+            type=observation_type,
+            from_start_time=from_timestamp,
+            to_start_time=to_timestamp,
+        )
+        yield from observations.data
+
+        total_pages = getattr(getattr(observations, "meta", None), "total_pages", None)
+        if len(observations.data) < PAGE_SIZE or (total_pages is not None and page >= total_pages):
+            return
+        page += 1
+
+
+def observation_duration_ms(obs: dict) -> float | None:
+    """Duration from startTime to endTime, or None if the observation has not ended."""
+    start = parse_time(obs.get("startTime"))
+    end = parse_time(obs.get("endTime"))
+    if start is None or end is None:
+        return None
+    return max(0.0, (end - start).total_seconds() * 1000)
+
+
+def build_latency_histograms(
+    observations: Iterator[dict], group_by: tuple[str, ...]
+) -> tuple[dict[tuple[str, ...], LatencyHistogram], int, int]:
+    """
+    Aggregate observation durations into one histogram per group.
+
+    Returns (histograms by group key, observations read, observations skipped
+    because they had no end time).
+    """
+    histograms: dict[tuple[str, ...], LatencyHistogram] = {}
+    seen = skipped = 0
+    for obs in observations:
+        seen += 1
+        if seen % (PAGE_SIZE * 100) == 0:
+            print(f"  ...read {seen} observations", file=sys.stderr)
+
+        duration = observation_duration_ms(obs)
+        if duration is None:
+            skipped += 1
+            continue
+        key = tuple(str(obs.get(field) or "-") for field in group_by)
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = LatencyHistogram()
+        histogram.add(duration)
+    return histograms, seen, skipped
+
+
+def _fmt(ms: float) -> str:
+    return f"{ms / 1000:.2f}s" if ms >= 1000 else f"{ms:.0f}ms"
+
+
+def print_latency_report(
+    histograms: dict[tuple[str, ...], LatencyHistogram], group_by: tuple[str, ...], window_hours: float
+) -> None:
+    """Print one row per group, busiest first, plus an overall row merged from all groups."""
+    headers = [field.upper() for field in group_by]
+    widths = [max([len(h)] + [len(key[i]) for key in histograms]) for i, h in enumerate(headers)]
+    widths = [min(width, 40) for width in widths]
+    stats = ["COUNT", "PER HOUR"] + [f"P{round(p * 100)}" for p in PERCENTILES] + ["MAX", "MEAN"]
+
+    def row(labels: list[str], histogram: LatencyHistogram) -> str:
+        cells = [label[:width].ljust(width) for label, width in zip(labels, widths)]
+        values = [str(histogram.count), f"{histogram.count / window_hours:.1f}"]
+        values += [_fmt(histogram.quantile(p)) for p in PERCENTILES]
+        values += [_fmt(histogram.max), _fmt(histogram.mean)]
+        return "  ".join(cells + [value.rjust(9) for value in values])
+
+    print("  ".join([h.ljust(w) for h, w in zip(headers, widths)] + [s.rjust(9) for s in stats]))
+    print("-" * (sum(widths) + 2 * len(widths) + 11 * len(stats)))
+
+    overall = LatencyHistogram()
+    for key, histogram in sorted(histograms.items(), key=lambda item: -item[1].count):
+        print(row(list(key), histogram))
+        overall.merge(histogram)
+
+    if len(histograms) > 1:
+        print("-" * (sum(widths) + 2 * len(widths) + 11 * len(stats)))
+        print(row(["ALL"] + [""] * (len(group_by) - 1), overall))
+
+
+def latency_report(
+    langfuse: Langfuse,
+    hours: int | None = None,
+    days: int | None = None,
+    name: str | None = None,
+    observation_type: str | None = None,
+    group_by: tuple[str, ...] = GROUP_FIELDS,
+) -> None:
+    """
+    Report latency percentiles and throughput for observations in the time range.
+
+    Args:
+        langfuse: Langfuse client (or TraceStore for the local mirror)
+        hours: Number of hours to look back (mutually exclusive with days)
+        days: Number of days to look back (mutually exclusive with hours)
+        name: Only include observations with this name
+        observation_type: Only include observations of this type (SPAN, GENERATION, EVENT)
+        group_by: Observation fields to group by
+    """
+    now = datetime.now(timezone.utc)
+    if days:
+        time_delta = timedelta(days=days)
+        time_desc = f"last {days} day(s)"
+    else:
+        hours = hours or 24
+        time_delta = timedelta(hours=hours)
+        time_desc = f"last {hours} hour(s)"
+
+    from_timestamp = now - time_delta
+
+    print("\n" + "=" * 80)
+    print(f"LATENCY REPORT ({time_desc})")
+    print("=" * 80)
+    print(f"Time range: {from_timestamp.strftime('%Y-%m-%d %H:%M:%S')} to {now.strftime('%Y-%m-%d %H:%M:%S')} UTC")
+    print(f"Langfuse host: {os.environ.get('LANGFUSE_HOST', 'unknown')}")
+    if name or observation_type:
+        print(f"Filter: name={name or '*'} type={observation_type or '*'}")
+    print("=" * 80)
+
+    try:
+        observations = iter_observations(langfuse, from_timestamp, now, name, observation_type)
+        histograms, seen, skipped = build_latency_histograms(observations, group_by)
+    except Exception as e:
+        print(f"\nERROR: Failed to fetch observations: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return
+
+    if not histograms:
+        print(f"\nNo completed observations found in {time_desc}")
+        return
+
+    print(f"\n{seen} observation(s) read, {skipped} without an end time skipped\n")
+    print_latency_report(histograms, group_by, time_delta.total_seconds() / 3600)
+    print(f"\nPercentiles are accurate to within {RELATIVE_ACCURACY:.0%}.")
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Latency percentiles per observation name/type/model over a time range",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # p50/p90/p99 per observation name/type/model over the last 24 hours
+  python latency_report.py
+
+  # p99 of message_enricher generations this week
+  python latency_report.py --days 7 --name message_enricher --type GENERATION
+
+  # Compare models across all generations
+  python latency_report.py --type GENERATION --group-by model
+
+  # Report over the local mirror filled by sync_traces.py
+  python latency_report.py --local --days 30
+        """,
+    )
+
+    parser.add_argument(
+        "--hours",
+        type=int,
+        help="Number of hours to look back (default: 24, mutually exclusive with --days)",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        help="Number of days to look back (mutually exclusive with --hours)",
+    )
+    parser.add_argument("--name", help="Only include observations with this name")
+    parser.add_argument(
+        "--type",
+        dest="observation_type",
+        choices=["SPAN", "GENERATION", "EVENT"],
+        help="Only include observations of this type",
+    )
+    parser.add_argument(
+        "--group-by",
+        default=",".join(GROUP_FIELDS),
+        help=f"Comma-separated fields to group by, from {', '.join(GROUP_FIELDS)} (default: all)",
+    )
+    parser.add_argument(
+        "--env",
+        choices=["staging", "production", "prod"],
+        help="Langfuse environment to use (default: from LANGFUSE_ENVIRONMENT or staging)",
+    )
+    parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Read from the local mirror (run sync_traces.py first) instead of the Langfuse API",
+    )
+
+    args = parser.parse_args()
+
+    # Validate mutually exclusive options
+    if args.hours and args.days:
+        print("ERROR: --hours and --days are mutually exclusive")
+        parser.print_help()
+        sys.exit(1)
+
+    group_by = tuple(field.strip() for field in args.group_by.split(",") if field.strip())
+    if not group_by or any(field not in GROUP_FIELDS for field in group_by):
+        print(f"ERROR: --group-by must be a comma-separated subset of {', '.join(GROUP_FIELDS)}")
+        sys.exit(1)
+
+    # Auto-load environment from arsenal/.env
+    if not load_superpowers_env():
+        sys.exit(1)
+
+    # Override environment if --env flag provided
+    if args.env:
+        select_langfuse_environment(args.env)
+
+    langfuse = open_local_store() if args.local else get_langfuse()
+    if not langfuse:
+        sys.exit(1)
+
+    latency_report(
+        langfuse,
+        hours=args.hours,
+        days=args.days,
+        name=args.name,
+        observation_type=args.observation_type,
+        group_by=group_by,
+    )
+
+
+if __name__ == "__main__":
+    main()
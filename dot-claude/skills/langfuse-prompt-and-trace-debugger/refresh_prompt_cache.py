@@ -17,6 +17,10 @@ Examples:
     python refresh_prompt_cache.py --production       # Download all prompts from PRODUCTION
     python refresh_prompt_cache.py message_enricher --production  # Download from PRODUCTION
 
+Prompts are fetched in parallel. docs/cached_prompts/manifest.json records each
+prompt's label, version and content hash; unchanged prompts are not rewritten,
+so a refresh with no upstream changes leaves no git diff.
+
 Environment:
     Requires LANGFUSE_PUBLIC_KEY and LANGFUSE_SECRET_KEY environment variables.
     Auto-loads from arsenal/.env or set manually: set -a; source arsenal/.env; set +a
@@ -24,38 +28,27 @@ Environment:
     Defaults to STAGING unless --production flag is used.
 """
 
+import hashlib
 import json
 import os
 import re
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add current directory to path to import env_loader
 sys.path.insert(0, str(Path(__file__).parent))
 from env_loader import load_superpowers_env, find_project_root, select_langfuse_environment
+from langfuse_client import get_langfuse
 
 from langfuse import Langfuse
 from langfuse.api.resources.commons.errors.not_found_error import NotFoundError
 
-
-def get_langfuse() -> Langfuse | None:
-    """Get Langfuse client from environment variables."""
-    try:
-        public_key = os.environ.get("LANGFUSE_PUBLIC_KEY")
-        secret_key = os.environ.get("LANGFUSE_SECRET_KEY")
-        host = os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com")
-
-        if not public_key or not secret_key:
-            print("ERROR: Missing required environment variables:")
-            print("  - LANGFUSE_PUBLIC_KEY")
-            print("  - LANGFUSE_SECRET_KEY")
-            print("\nLoad them with: set -a; source arsenal/.env; set +a")
-            return None
-
-        return Langfuse(public_key=public_key, secret_key=secret_key, host=host)
-    except Exception as e:  # noqa: BLE001 - CLI tool: catch all for user-friendly error message
-        print(f"ERROR: Failed to initialize Langfuse client: {e}")
-        return None
+PROMPT_LABELS = ["production"]
+MANIFEST_FILE = "manifest.json"
+# Enough to fetch a typical project's prompts in one round trip
+DEFAULT_CONCURRENCY = 16
 
 
 def get_all_prompts(langfuse: Langfuse) -> list[str]:
@@ -97,11 +90,90 @@ def get_all_prompts(langfuse: Langfuse) -> list[str]:
     return all_prompts
 
 
+def prompt_cache_files(prompt_name: str, label: str, prompt) -> dict[str, str]:
+    """Render the cached files for one prompt as {filename: content}."""
+    safe_prompt_name = re.sub(r"[^a-zA-Z0-9_\-]", "_", prompt_name)
+    safe_label = re.sub(r"[^a-zA-Z0-9_\-]", "_", label)
+
+    # Chat prompts are a list of messages rather than a string
+    body = prompt.prompt if isinstance(prompt.prompt, str) else json.dumps(prompt.prompt, indent=2)
+    files = {
+        f"{safe_prompt_name}_{safe_label}.txt": (
+            f"# {prompt_name} ({label})\n"
+            f"# Version: {getattr(prompt, 'version', 'unknown')}\n"
+            "#" + "=" * 60 + "\n\n" + body
+        )
+    }
+
+    # Save config if it exists
+    if hasattr(prompt, "config") and prompt.config:
+        files[f"{safe_prompt_name}_{safe_label}_config.json"] = json.dumps(prompt.config, indent=2)
+
+    return files
+
+
+def content_hash(files: dict[str, str]) -> str:
+    """Hash of everything written for a prompt, used to detect changes between refreshes."""
+    digest = hashlib.sha256()
+    for filename in sorted(files):
+        digest.update(filename.encode())
+        digest.update(b"\0")
+        digest.update(files[filename].encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def write_atomic(path: Path, content: str) -> None:
+    """Write via a temp file and rename, so readers never see a half-written file."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        # mkstemp creates files owner-only; cached prompts should be readable like any other file
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def load_manifest(cache_dir: Path) -> dict[str, dict]:
+    """Previously cached prompts, keyed by "name:label"."""
+    try:
+        return json.loads((cache_dir / MANIFEST_FILE).read_text()).get("prompts", {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(cache_dir: Path, manifest: dict[str, dict]) -> None:
+    """Write the manifest deterministically (sorted, no timestamps) so it only diffs on real changes."""
+    content = json.dumps({"prompts": manifest}, indent=2, sort_keys=True) + "\n"
+    manifest_path = cache_dir / MANIFEST_FILE
+    if not manifest_path.exists() or manifest_path.read_text() != content:
+        write_atomic(manifest_path, content)
+
+
+def fetch_prompt(langfuse: Langfuse, prompt_name: str, label: str) -> tuple[object | None, str | None]:
+    """Fetch one labeled prompt, returning (prompt, error message)."""
+    try:
+        return langfuse.get_prompt(prompt_name, label=label), None
+    except NotFoundError:
+        return None, "not found"
+    except Exception as e:  # noqa: BLE001 - CLI tool: continue processing other prompts on error
+        return None, str(e)
+
+
 def refresh_prompt_cache(
-    langfuse: Langfuse, prompt_names: list[str] | None = None, cache_dir: Path | None = None
+    langfuse: Langfuse,
+    prompt_names: list[str] | None = None,
+    cache_dir: Path | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
 ) -> Path:
     """Download prompts from Langfuse to local cache for viewing only (AI agents: READ-ONLY operation).
 
+    Prompts are fetched concurrently. Files are only rewritten (atomically) when
+    the prompt's content hash differs from the one recorded in the manifest.
+
     Returns:
         Path to the cache directory where prompts were saved.
     """
@@ -120,34 +192,51 @@ def refresh_prompt_cache(
     else:
         prompts_to_refresh = prompt_names
 
-    for prompt_name in prompts_to_refresh:
-        for label in ["production"]:
-            try:
-                prompt = langfuse.get_prompt(prompt_name, label=label)
-
-                # Save prompt content with sanitized filenames
-                safe_prompt_name = re.sub(r"[^a-zA-Z0-9_\-]", "_", prompt_name)
-                safe_label = re.sub(r"[^a-zA-Z0-9_\-]", "_", label)
-                prompt_file = cache_dir / f"{safe_prompt_name}_{safe_label}.txt"
-                with open(prompt_file, "w") as f:
-                    f.write(f"# {prompt_name} ({label})\n")
-                    f.write(f"# Version: {getattr(prompt, 'version', 'unknown')}\n")
-                    f.write("#" + "=" * 60 + "\n\n")
-                    f.write(prompt.prompt)
-
-                # Save config if it exists
-                if hasattr(prompt, "config") and prompt.config:
-                    config_file = cache_dir / f"{safe_prompt_name}_{safe_label}_config.json"
-                    with open(config_file, "w") as f:
-                        json.dump(prompt.config, f, indent=2)
-
-                print(f"✓ Cached: {prompt_name} ({label})")
-
-            except NotFoundError:
-                print(f"⚠ Not found: {prompt_name} ({label})")
-            except Exception as e:  # noqa: BLE001 - CLI tool: continue processing other prompts on error
-                print(f"✗ Error caching {prompt_name}: {e}")
-
+    manifest = load_manifest(cache_dir)
+    lookups = [(prompt_name, label) for prompt_name in prompts_to_refresh for label in PROMPT_LABELS]
+    updated = unchanged = failed = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        results = executor.map(lambda lookup: fetch_prompt(langfuse, *lookup), lookups)
+
+        for (prompt_name, label), (prompt, error) in zip(lookups, results):
+            if prompt is None:
+                if error == "not found":
+                    print(f"⚠ Not found: {prompt_name} ({label})")
+                else:
+                    print(f"✗ Error caching {prompt_name}: {error}")
+                failed += 1
+                continue
+
+            files = prompt_cache_files(prompt_name, label, prompt)
+            digest = content_hash(files)
+            key = f"{prompt_name}:{label}"
+            previous = manifest.get(key, {})
+            version = getattr(prompt, "version", None)
+
+            if previous.get("hash") == digest and all((cache_dir / filename).exists() for filename in files):
+                print(f"= Unchanged: {prompt_name} ({label}) v{version}")
+                unchanged += 1
+                continue
+
+            for filename, content in files.items():
+                write_atomic(cache_dir / filename, content)
+            # Drop files the previous version had but this one doesn't (e.g. a removed config)
+            for filename in set(previous.get("files", [])) - files.keys():
+                (cache_dir / filename).unlink(missing_ok=True)
+
+            manifest[key] = {
+                "name": prompt_name,
+                "label": label,
+                "version": version,
+                "hash": digest,
+                "files": sorted(files),
+            }
+            print(f"✓ Cached: {prompt_name} ({label}) v{version}")
+            updated += 1
+
+    save_manifest(cache_dir, manifest)
+    print(f"\n{updated} updated, {unchanged} unchanged, {failed} failed")
     return cache_dir
 
 
@@ -4,82 +4,145 @@ Search Langfuse traces for specific error messages in trace content.
 
 Usage:
     python search_trace_errors.py "error message" --hours 48
+    python search_trace_errors.py "error message" --hours 168 --local   # search the sync_traces.py mirror
+
+Several patterns are answered in one scan, and each hit reports which pattern
+matched where. A pattern is case-insensitive text or a /regex/, searched in
+outputs and status messages; prefix it with status:, name:, input: or output:
+to look in that field only (names cover traces and observations):
+    python search_trace_errors.py timeout "rate limit" '/HTTP 5[0-9]{2}/'
+    python search_trace_errors.py name:intent_router 'status:/timed? ?out/' --all
+
+With --local a single plain pattern runs against the mirror's full-text index,
+covering every synced trace in the window. Words must all appear (any order),
+"quoted text" is a phrase, a trailing * matches a prefix, and OR/NOT combine terms:
+    python search_trace_errors.py '"connection reset" OR timeout' --local
+    python search_trace_errors.py 'KeyError transcri*' --local
+Anything else (several patterns, regexes, fields, --all) scans every synced trace.
 """
 
 import argparse
-import json
 import os
 import sys
+from collections import Counter
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Any
 
 sys.path.insert(0, str(Path(__file__).parent))
 from env_loader import load_superpowers_env, select_langfuse_environment
+from langfuse_client import RawPage, bulk_reader, get_langfuse
+from trace_matcher import Hit, PatternMatcher, parse_pattern
+from trace_store import TraceStore, open_local_store
 
 from langfuse import Langfuse
 
+# Langfuse API has a max limit of 100 per request
+PAGE_SIZE = 100
+
+
+def match_trace(reader: Any, matcher: PatternMatcher, trace_dict: dict) -> dict[int, Hit]:
+    """First hit per pattern anywhere in one trace: its own payloads, then its observations."""
+    hits = matcher.match("trace", trace_dict)
+    if len(hits) == len(matcher.patterns):
+        return hits
+
+    try:
+        observations = reader.fetch_observations(trace_id=trace_dict.get("id"))
+    except Exception:
+        # Skip observations we can't fetch; trace-level hits still count
+        return hits
+
+    # An observation page whose raw text contains none of the patterns is never decoded
+    if isinstance(observations, RawPage) and not matcher.may_match_raw(observations.content):
+        return hits
+
+    for obs_dict in observations.data:
+        hits.update(matcher.match("observation", obs_dict, found=set(hits)))
+        if len(hits) == len(matcher.patterns):
+            break
+    return hits
+
+
+def scan_traces(
+    langfuse: Langfuse | TraceStore,
+    matcher: PatternMatcher,
+    from_timestamp: datetime,
+    limit: int | None,
+    require_all: bool = False,
+) -> list[tuple[dict, list[Hit]]]:
+    """
+    Match every pattern against the most recent traces and their observations, newest first.
+
+    One pass answers all patterns. Returns (trace_dict, hits) for traces where any
+    pattern hit (every pattern with `require_all`); `limit` caps the traces checked.
+    """
+    reader = bulk_reader(langfuse)
+    matches = []
+    checked = 0
+    page = 1
+    while limit is None or checked < limit:
+        traces = reader.fetch_traces(page=page, limit=PAGE_SIZE, from_timestamp=from_timestamp)
+        batch = traces.data if limit is None else traces.data[: limit - checked]
+
+        for trace_dict in batch:
+            hits = match_trace(reader, matcher, trace_dict)
+            if hits and (not require_all or len(hits) == len(matcher.patterns)):
+                matches.append((trace_dict, [hits[index] for index in sorted(hits)]))
+
+        checked += len(batch)
+        total_pages = getattr(getattr(traces, "meta", None), "total_pages", None)
+        if len(traces.data) < PAGE_SIZE or (total_pages is not None and page >= total_pages):
+            break
+        page += 1
+
+    print(f"Checked {checked} traces")
+    return matches
+
+
+def uses_full_text_index(specs: list[str], require_all: bool) -> bool:
+    """A single plain search on the mirror goes through its full-text index and query syntax."""
+    if len(specs) != 1 or require_all:
+        return False
+    pattern = parse_pattern(specs[0])
+    return pattern.field is None and pattern.literal is not None
+
 
 def search_traces_for_error(
-    langfuse: Langfuse,
-    search_term: str,
+    langfuse: Langfuse | TraceStore,
+    specs: list[str],
     hours: int = 48,
     limit: int = 200,
+    require_all: bool = False,
 ) -> None:
-    """Search traces for specific error messages."""
+    """Search traces for any (or, with require_all, every) pattern in `specs`."""
 
+    matcher = PatternMatcher.from_specs(specs)
     now = datetime.now(timezone.utc)
     from_timestamp = now - timedelta(hours=hours)
+    described = " AND ".join(specs) if require_all else " | ".join(specs)
 
-    print(f"\nSearching traces from last {hours} hours for: '{search_term}'")
+    print(f"\nSearching traces from last {hours} hours for: '{described}'")
     print(f"Time range: {from_timestamp.strftime('%Y-%m-%d %H:%M:%S')} to {now.strftime('%Y-%m-%d %H:%M:%S')} UTC")
 
-    # Fetch traces
-    traces = langfuse.fetch_traces(limit=min(limit, 100))
-
-    print(f"Checking {len(traces.data)} traces...")
-
-    matches = []
-
-    for trace in traces.data:
-        trace_dict = trace.dict() if hasattr(trace, "dict") else trace
-        trace_id = trace_dict.get("id", "unknown")
-
-        # Search in trace output
-        output = trace_dict.get("output")
-        if output:
-            output_str = json.dumps(output) if isinstance(output, dict) else str(output)
-            if search_term.lower() in output_str.lower():
-                matches.append((trace_dict, "trace_output", output_str[:500]))
-                continue
-
-        # Search in observations
-        try:
-            observations = langfuse.fetch_observations(trace_id=trace_id)
-            for obs in observations.data:
-                obs_dict = obs.dict() if hasattr(obs, "dict") else obs
-
-                # Check status message
-                status_msg = obs_dict.get("statusMessage", "")
-                if search_term.lower() in str(status_msg).lower():
-                    matches.append((trace_dict, "status_message", status_msg))
-                    break
-
-                # Check output
-                obs_output = obs_dict.get("output")
-                if obs_output:
-                    output_str = json.dumps(obs_output) if isinstance(obs_output, dict) else str(obs_output)
-                    if search_term.lower() in output_str.lower():
-                        matches.append((trace_dict, "observation_output", output_str[:500]))
-                        break
-        except Exception:
-            # Skip traces where we can't fetch observations
-            continue
+    if isinstance(langfuse, TraceStore) and uses_full_text_index(specs, require_all):
+        # The mirror's full-text index covers every synced trace in the window
+        print(f"Searching full-text index of {langfuse.path.name}...")
+        pattern = matcher.patterns[0]
+        matches = [
+            (trace_dict, [Hit(pattern, location, snippet)])
+            for trace_dict, location, snippet in langfuse.search(specs[0], from_timestamp=from_timestamp)
+        ]
+    else:
+        # The mirror is scanned in full; the API only up to --limit traces
+        scan_limit = None if isinstance(langfuse, TraceStore) else limit
+        matches = scan_traces(langfuse, matcher, from_timestamp, scan_limit, require_all)
 
     if matches:
         print(f"\n✅ Found {len(matches)} matching traces:\n")
         langfuse_host = os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com")
 
-        for trace_dict, location, content in matches:
+        for trace_dict, hits in matches:
             trace_id = trace_dict.get("id")
             name = trace_dict.get("name", "unnamed")
             timestamp = trace_dict.get("timestamp", "")
@@ -87,36 +150,57 @@ def search_traces_for_error(
             print(f"🔍 {name}")
             print(f"   ID: {trace_id}")
             print(f"   Time: {timestamp}")
-            print(f"   Location: {location}")
-            print(f"   Content: {content[:200]}...")
+            for hit in hits:
+                source = f" ({hit.source})" if hit.source else ""
+                prefix = f"[{hit.pattern.spec}] " if len(specs) > 1 else ""
+                print(f"   {prefix}Location: {hit.location}{source}")
+                print(f"   {' ' * len(prefix)}Content: {hit.snippet}")
             print(f"   URL: {langfuse_host}/trace/{trace_id}")
             print()
     else:
-        print(f"\n❌ No traces found containing: '{search_term}'")
+        print(f"\n❌ No traces found containing: '{described}'")
+
+    if len(specs) > 1:
+        counts = Counter(hit.pattern.spec for _, hits in matches for hit in hits)
+        width = max(len(spec) for spec in specs)
+        print("Traces per pattern:")
+        for spec in specs:
+            print(f"  {spec:<{width}}  {counts[spec]:>6}")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Search traces for error messages")
-    parser.add_argument("search_term", help="Error message to search for")
+    parser.add_argument(
+        "patterns",
+        nargs="+",
+        metavar="pattern",
+        help="Text or /regex/ to search for, optionally scoped with status:, name:, input: or output:",
+    )
     parser.add_argument("--hours", type=int, default=48, help="Hours to look back")
-    parser.add_argument("--limit", type=int, default=200, help="Max traces to check")
+    parser.add_argument("--limit", type=int, default=200, help="Max traces to check (API only; --local searches every synced trace)")
+    parser.add_argument("--all", action="store_true", help="Only report traces where every pattern matched")
     parser.add_argument("--env", choices=["staging", "production", "prod"], help="Langfuse environment")
+    parser.add_argument("--local", action="store_true", help="Search the local mirror (run sync_traces.py first)")
 
     args = parser.parse_args()
 
+    try:
+        for spec in args.patterns:
+            parse_pattern(spec)
+    except ValueError as e:
+        parser.error(str(e))
+
     if not load_superpowers_env():
         sys.exit(1)
 
     if args.env:
         select_langfuse_environment(args.env)
 
-    langfuse = Langfuse(
-        public_key=os.environ["LANGFUSE_PUBLIC_KEY"],
-        secret_key=os.environ["LANGFUSE_SECRET_KEY"],
-        host=os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com"),
-    )
+    langfuse = open_local_store() if args.local else get_langfuse()
+    if not langfuse:
+        sys.exit(1)
 
-    search_traces_for_error(langfuse, args.search_term, args.hours, args.limit)
+    search_traces_for_error(langfuse, args.patterns, args.hours, args.limit, args.all)
 
 
 if __name__ == "__main__":
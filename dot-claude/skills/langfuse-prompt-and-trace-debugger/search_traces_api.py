@@ -11,8 +11,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 from env_loader import load_superpowers_env, select_langfuse_environment
-
-import httpx
+from langfuse_client import get_http_client
 
 
 def search_traces(search_term: str, limit: int = 100):
@@ -34,16 +33,14 @@ def search_traces(search_term: str, limit: int = 100):
         (f"{host}/api/public/traces", {"filter": json.dumps({"query": search_term}), "limit": limit}),
     ]
 
+    # One pooled client, so each attempt reuses the same connection
+    client = get_http_client()
+
     for endpoint, params in endpoints_to_try:
         print(f"Trying: {endpoint} with params {params}")
 
         try:
-            response = httpx.get(
-                endpoint,
-                params=params,
-                auth=(public_key, secret_key),
-                timeout=30.0,
-            )
+            response = client.get(endpoint, params=params, auth=(public_key, secret_key))
 
             print(f"  Status: {response.status_code}")
 
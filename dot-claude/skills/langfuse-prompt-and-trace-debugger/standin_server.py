@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Langfuse API, for running the scripts offline.
+
+INSTRUCTIONS FOR CLAUDE/AI AGENTS:
+- This server never talks to a real Langfuse instance
+- Use it to regression-test or benchmark scripts without production credentials
+- Prompts pushed to it are kept in memory only and lost on exit
+
+Usage:
+    python standin_server.py --cassette .cassettes/            # replay recorded responses
+    python standin_server.py --synthetic-traces 20000        # generated data for benchmarks
+    python standin_server.py --cassette .cassettes/ --latency-ms 80 --jitter-ms 40
+
+Record a cassette by running any script with LANGFUSE_RECORD_DIR set:
+    LANGFUSE_RECORD_DIR=.cassettes/ python fetch_error_traces.py --days 1
+
+Then point the scripts at the stand-in (any credentials are accepted):
+    LANGFUSE_HOST=http://127.0.0.1:3999 python fetch_error_traces.py --days 1
+
+Requests that exactly match a recording get the recorded response. Anything
+else is answered from the traces, observations and prompts found in the
+recordings (plus any synthetic data), with the API's filters and pagination,
+so scripts can page differently from how the cassette was recorded.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, unquote, urlparse
+
+sys.path.insert(0, str(Path(__file__).parent))
+from langfuse_client import cassette_key
+from trace_profile import parse_time
+
+DEFAULT_PORT = 3999
+DEFAULT_LIMIT = 50
+# Filtered ID lists kept for paging; clients send "now"-relative windows, so old keys are evicted
+QUERY_CACHE_SIZE = 32
+
+TRACE_PATH = re.compile(r"^/api/public/traces/(?P<id>[^/]+)$")
+PROMPT_PATH = re.compile(r"^/api/public/v2/prompts/(?P<name>[^/]+)$")
+OBSERVATION_FILTERS = ("name", "type", "level", "traceId", "parentObservationId")
+
+SYNTHETIC_ERRORS = [
+    "KeyError: 'transcription_id'",
+    "TimeoutError: request to openai timed out after {n}s",
+    "ValidationError: field 'summary' missing in response {uuid}",
+    "RateLimitError: 429 Too Many Requests (retry after {n}s)",
+]
+
+
+def iso(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def timestamp_key(value: Any) -> float:
+    parsed = parse_time(value)
+    return parsed.timestamp() if parsed else 0.0
+
+
+class TimeIndex:
+    """Entity IDs sorted by timestamp, for range queries with bisect."""
+
+    def __init__(self) -> None:
+        self.keys: list[float] = []
+        self.ids: list[str] = []
+        self._pending: dict[str, float] = {}
+
+    def add(self, entity_id: str, key: float) -> None:
+        self._pending[entity_id] = key
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        merged = dict(zip(self.ids, self.keys))
+        merged.update(self._pending)
+        self._pending.clear()
+        ordered = sorted(merged.items(), key=lambda item: item[1])
+        self.ids = [entity_id for entity_id, _ in ordered]
+        self.keys = [key for _, key in ordered]
+
+    def newest_first(self, start: float | None, end: float | None) -> list[str]:
+        self._flush()
+        lo = bisect_left(self.keys, start) if start is not None else 0
+        hi = bisect_right(self.keys, end) if end is not None else len(self.keys)
+        return self.ids[lo:hi][::-1]
+
+
+class StandinData:
+    """Traces, observations and prompts served by the stand-in."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.traces: dict[str, dict] = {}
+        self.trace_scores: dict[str, list] = {}
+        self.observations: dict[str, dict] = {}
+        self.observations_by_trace: dict[str, set[str]] = {}
+        self.prompts: dict[str, dict[int, dict]] = {}
+        self.prompt_metas: dict[str, dict] = {}
+        self.trace_index = TimeIndex()
+        self.observation_index = TimeIndex()
+        # Filtered ID lists per query (without page), so paging through a result stays O(page)
+        self._query_cache: OrderedDict[tuple, list[str]] = OrderedDict()
+
+    # --- loading ---------------------------------------------------------------
+
+    def add_trace(self, trace: dict) -> None:
+        trace = dict(trace)
+        observations = trace.pop("observations", None) or []
+        scores = trace.pop("scores", None) or []
+        if any(isinstance(score, dict) for score in scores):
+            self.trace_scores[trace["id"]] = scores
+        self.traces[trace["id"]] = {**self.traces.get(trace["id"], {}), **trace}
+        self.trace_index.add(trace["id"], timestamp_key(trace.get("timestamp")))
+        for obs in observations:
+            if isinstance(obs, dict):
+                self.add_observation(obs)
+        self._query_cache.clear()
+
+    def add_observation(self, obs: dict) -> None:
+        self.observations[obs["id"]] = obs
+        if obs.get("traceId"):
+            self.observations_by_trace.setdefault(obs["traceId"], set()).add(obs["id"])
+        self.observation_index.add(obs["id"], timestamp_key(obs.get("startTime")))
+        self._query_cache.clear()
+
+    def add_prompt(self, prompt: dict) -> None:
+        self.prompts.setdefault(prompt["name"], {})[int(prompt["version"])] = prompt
+
+    def load_recording(self, path: str, query: dict[str, str], body: Any) -> None:
+        """Pull entities out of one recorded response body."""
+        if not isinstance(body, dict):
+            return
+        if path == "/api/public/traces":
+            for trace in body.get("data", []):
+                self.add_trace(trace)
+        elif TRACE_PATH.match(path):
+            self.add_trace(body)
+        elif path == "/api/public/observations":
+            for obs in body.get("data", []):
+                self.add_observation(obs)
+        elif path == "/api/public/v2/prompts":
+            for meta in body.get("data", []):
+                self.prompt_metas[meta["name"]] = meta
+        elif PROMPT_PATH.match(path) and "version" in body:
+            self.add_prompt(body)
+
+    # --- queries ---------------------------------------------------------------
+
+    def _query(self, key: tuple, index: TimeIndex, entities: dict[str, dict], start, end, matches) -> list[str]:
+        with self.lock:
+            cached = self._query_cache.get(key)
+            if cached is None:
+                ids = index.newest_first(start, end)
+                cached = [entity_id for entity_id in ids if matches(entities[entity_id])]
+                self._query_cache[key] = cached
+                if len(self._query_cache) > QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+            else:
+                self._query_cache.move_to_end(key)
+            return cached
+
+    def list_traces(self, params: dict[str, str]) -> dict:
+        filters = {field: params.get(field) for field in ("userId", "name", "sessionId") if params.get(field)}
+        start = timestamp_key(params["fromTimestamp"]) if params.get("fromTimestamp") else None
+        end = timestamp_key(params["toTimestamp"]) if params.get("toTimestamp") else None
+
+        key = ("traces", start, end, tuple(sorted(filters.items())))
+        ids = self._query(
+            key,
+            self.trace_index,
+            self.traces,
+            start,
+            end,
+            lambda trace: all(trace.get(field) == value for field, value in filters.items()),
+        )
+        if params.get("orderBy", "").endswith(".asc"):
+            ids = ids[::-1]
+        return paginate(ids, params, lambda trace_id: self.trace_summary(self.traces[trace_id]))
+
+    def trace_summary(self, trace: dict) -> dict:
+        """A trace as list endpoints return it: observation and score IDs, not objects."""
+        observation_ids = sorted(self.observations_by_trace.get(trace["id"], ()))
+        return {
+            "htmlPath": f"/trace/{trace['id']}",
+            "latency": 0.0,
+            "totalCost": 0.0,
+            **trace,
+            "observations": observation_ids,
+            "scores": [score["id"] for score in self.trace_scores.get(trace["id"], []) if "id" in score],
+        }
+
+    def trace_detail(self, trace_id: str) -> dict | None:
+        trace = self.traces.get(trace_id)
+        if trace is None:
+            return None
+        observations = [self.observations[obs_id] for obs_id in self.observations_by_trace.get(trace_id, ())]
+        observations.sort(key=lambda obs: timestamp_key(obs.get("startTime")))
+        scores = self.trace_scores.get(trace_id, [])
+        return {**self.trace_summary(trace), "observations": observations, "scores": scores}
+
+    def list_observations(self, params: dict[str, str]) -> dict:
+        filters = {field: params.get(field) for field in OBSERVATION_FILTERS if params.get(field)}
+        start = timestamp_key(params["fromStartTime"]) if params.get("fromStartTime") else None
+        end = timestamp_key(params["toStartTime"]) if params.get("toStartTime") else None
+
+        if "traceId" in filters and start is None and end is None:
+            # Fast path for one trace's observations
+            trace_observation_ids = self.observations_by_trace.get(filters["traceId"], ())
+            observations = [self.observations[obs_id] for obs_id in trace_observation_ids]
+            observations.sort(key=lambda obs: timestamp_key(obs.get("startTime")), reverse=True)
+            matching = [obs for obs in observations if all(obs.get(field) == value for field, value in filters.items())]
+            return paginate(matching, params)
+
+        key = ("observations", start, end, tuple(sorted(filters.items())))
+        ids = self._query(
+            key,
+            self.observation_index,
+            self.observations,
+            start,
+            end,
+            lambda obs: all(obs.get(field) == value for field, value in filters.items()),
+        )
+        return paginate(ids, params, self.observations.__getitem__)
+
+    def get_prompt(self, name: str, label: str | None, version: str | None) -> dict | None:
+        versions = self.prompts.get(name)
+        if not versions:
+            return None
+        if version:
+            return versions.get(int(version))
+        label = label or "production"
+        if label == "latest":
+            return versions[max(versions)]
+        labeled = [v for v, prompt in versions.items() if label in prompt.get("labels", [])]
+        return versions[max(labeled)] if labeled else None
+
+    def list_prompt_metas(self, params: dict[str, str]) -> dict:
+        metas = dict(self.prompt_metas)
+        for name, versions in self.prompts.items():
+            latest = versions[max(versions)]
+            metas[name] = {
+                "name": name,
+                "versions": sorted(versions),
+                "labels": sorted({label for prompt in versions.values() for label in prompt.get("labels", [])}),
+                "tags": latest.get("tags", []),
+                "lastUpdatedAt": latest.get("updatedAt") or iso(datetime.now(timezone.utc)),
+                "lastConfig": latest.get("config"),
+            }
+        result = sorted(metas.values(), key=lambda meta: meta["name"])
+        if params.get("name"):
+            result = [meta for meta in result if meta["name"] == params["name"]]
+        if params.get("label"):
+            result = [meta for meta in result if params["label"] in meta.get("labels", [])]
+        return paginate(result, params)
+
+    def create_prompt(self, body: dict) -> dict:
+        """POST /v2/prompts: new version; its labels move off older versions."""
+        with self.lock:
+            versions = self.prompts.setdefault(body["name"], {})
+            version = max(versions, default=0) + 1
+            labels = list(dict.fromkeys([*body.get("labels", []), "latest"]))
+            for prompt in versions.values():
+                prompt["labels"] = [label for label in prompt.get("labels", []) if label not in labels]
+            now = iso(datetime.now(timezone.utc))
+            prompt = {
+                "type": body.get("type", "text"),
+                "name": body["name"],
+                "version": version,
+                "prompt": body.get("prompt"),
+                "config": body.get("config") or {},
+                "labels": labels,
+                "tags": body.get("tags") or [],
+                "commitMessage": body.get("commitMessage"),
+                "createdAt": now,
+                "updatedAt": now,
+            }
+            versions[version] = prompt
+            return prompt
+
+
+def load_cassettes(directory: Path, data: StandinData) -> dict[str, tuple[int, Any]]:
+    """Load every recording; returns exact responses by cassette key."""
+    exact: dict[str, tuple[int, Any]] = {}
+    for path in sorted(directory.glob("*.json")):
+        fixture = json.loads(path.read_text())
+        request, response = fixture["request"], fixture["response"]
+        query = [tuple(item) for item in request["query"]]
+        exact[cassette_key(request["method"], request["path"], query)] = (response["status"], response["body"])
+        if request["method"] == "GET" and response["status"] == 200:
+            data.load_recording(request["path"], dict(query), response["body"])
+    return exact
+
+
+def add_synthetic_data(data: StandinData, trace_count: int, days: int, seed: int = 0) -> None:
+    """
+    Generate traces shaped like a typical LLM app's, for benchmarks.
+
+    Each trace has a root span with a retrieval span and one or two generations;
+    every 20th trace fails with one of a few recurring error messages.
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    window = timedelta(days=days).total_seconds()
+    prompt_names = ["message_enricher", "intent_router", "reply_writer"]
+    models = ["gpt-4.1", "gpt-4.1-mini"]
+
+    for name in prompt_names:
+        data.add_prompt(
+            {
+                "type": "text",
+                "name": name,
+                "version": 1,
+                "prompt": f"You are the {name.replace('_', ' ')}. {{{{input}}}}",
+                "config": {"model": models[0]},
+                "labels": ["production", "latest"],
+                "tags": [],
+            }
+        )
+
+    for i in range(trace_count):
+        trace_id = f"synthetic-{i:07d}"
+        start = now - timedelta(seconds=rng.uniform(0, window))
+        cursor = start
+        observations = []
+
+        def add(obs_type: str, name: str, duration_ms: float, parent: str | None, **extra) -> dict:
+            obs = {
+                "id": f"{trace_id}-{len(observations)}",
+                "traceId": trace_id,
+                "type": obs_type,
+                "name": name,
+                "startTime": iso(cursor),
+                "endTime": iso(cursor + timedelta(milliseconds=duration_ms)),
+                "parentObservationId": parent,
+                "level": "DEFAULT",
+                "statusMessage": None,
+                **extra,
+            }
+            observations.append(obs)
+            return obs
+
+        root = add("SPAN", "handle_message", 0, None)
+        cursor += timedelta(milliseconds=rng.uniform(1, 5))
+        add("SPAN", "retrieve_context", rng.lognormvariate(3.5, 0.6), root["id"])
+        cursor = parse_time(observations[-1]["endTime"])
+        for prompt_name in rng.sample(prompt_names, rng.randint(1, 2)):
+            input_tokens, output_tokens = rng.randint(300, 3000), rng.randint(20, 600)
+            model = rng.choice(models)
+            add(
+                "GENERATION",
+                prompt_name,
+                rng.lognormvariate(6.5, 0.5),
+                root["id"],
+                model=model,
+                promptName=prompt_name,
+                usage={"input": input_tokens, "output": output_tokens, "total": input_tokens + output_tokens},
+                usageDetails={"input": input_tokens, "output": output_tokens, "total": input_tokens + output_tokens},
+                calculatedTotalCost=(input_tokens * 2 + output_tokens * 8) / 1_000_000,
+                output={"text": "ok"},
+            )
+            cursor = parse_time(observations[-1]["endTime"])
+
+        if i % 20 == 0:
+            failed = observations[-1]
+            failed["level"] = "ERROR"
+            failed["statusMessage"] = rng.choice(SYNTHETIC_ERRORS).format(n=rng.randint(5, 60), uuid=f"{i:08x}")
+            failed["output"] = {"error": failed["statusMessage"]}
+        root["endTime"] = iso(cursor + timedelta(milliseconds=2))
+
+        data.add_trace(
+            {
+                "id": trace_id,
+                "timestamp": iso(start),
+                "name": "handle_message",
+                "userId": f"user-{rng.randint(1, 50)}",
+                "sessionId": f"session-{rng.randint(1, trace_count // 5 + 1)}",
+                "input": {"message": f"synthetic message {i}"},
+                "output": observations[-1].get("output"),
+                "latency": (cursor - start).total_seconds(),
+                "totalCost": sum(obs.get("calculatedTotalCost", 0) for obs in observations),
+                "observations": observations,
+            }
+        )
+
+
+def paginate(items: list, params: dict[str, str], render: Callable[[Any], dict] | None = None) -> dict:
+    """One page of `items` in the API's {data, meta} shape, rendering only the items on the page."""
+    page = max(1, int(params.get("page") or 1))
+    limit = max(1, int(params.get("limit") or DEFAULT_LIMIT))
+    total = len(items)
+    page_items = items[(page - 1) * limit : page * limit]
+    return {
+        "data": [render(item) for item in page_items] if render else page_items,
+        "meta": {"page": page, "limit": limit, "totalItems": total, "totalPages": -(-total // limit)},
+    }
+
+
+def make_handler(
+    data: StandinData, exact: dict[str, tuple[int, Any]], latency_ms: float, jitter_ms: float, verbose: bool
+) -> type[BaseHTTPRequestHandler]:
+    class StandinHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:
+            if verbose:
+                super().log_message(format, *args)
+
+        def _respond(self, status: int, body: Any) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _read_body(self) -> bytes:
+            # Always drain the body (the SDK sends one even on some GETs) to keep the connection usable
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        def _delay(self) -> None:
+            delay = latency_ms + random.uniform(0, jitter_ms)
+            if delay > 0:
+                time.sleep(delay / 1000)
+
+        def do_GET(self) -> None:
+            self._read_body()
+            self._delay()
+            url = urlparse(self.path)
+            query = parse_qsl(url.query, keep_blank_values=True)
+            recorded = exact.get(cassette_key("GET", url.path, query))
+            if recorded:
+                self._respond(*recorded)
+                return
+
+            params = dict(query)
+            if url.path == "/api/public/traces":
+                self._respond(200, data.list_traces(params))
+            elif match := TRACE_PATH.match(url.path):
+                trace = data.trace_detail(unquote(match["id"]))
+                if trace is None:
+                    self._respond(404, {"message": "Trace not found", "error": "LangfuseNotFoundError"})
+                else:
+                    self._respond(200, trace)
+            elif url.path == "/api/public/observations":
+                self._respond(200, data.list_observations(params))
+            elif url.path == "/api/public/v2/prompts":
+                self._respond(200, data.list_prompt_metas(params))
+            elif match := PROMPT_PATH.match(url.path):
+                prompt = data.get_prompt(unquote(match["name"]), params.get("label"), params.get("version"))
+                if prompt is None:
+                    self._respond(404, {"message": "Prompt not found", "error": "LangfuseNotFoundError"})
+                else:
+                    self._respond(200, prompt)
+            else:
+                self._respond(404, {"message": f"Not implemented by the stand-in: {url.path}"})
+
+        def do_POST(self) -> None:
+            body = json.loads(self._read_body() or b"{}")
+            self._delay()
+            url = urlparse(self.path)
+            if url.path == "/api/public/v2/prompts" and body.get("name"):
+                self._respond(201, data.create_prompt(body))
+            elif url.path == "/api/public/ingestion":
+                # The SDK flushes its (empty) event queue on exit
+                self._respond(207, {"successes": [], "errors": []})
+            else:
+                self._respond(404, {"message": f"Not implemented by the stand-in: {url.path}"})
+
+    return StandinHandler
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Serve recorded or synthetic Langfuse data on a local port",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Record, then replay offline
+  LANGFUSE_RECORD_DIR=.cassettes/ python fetch_error_traces.py --days 1
+  python standin_server.py --cassette .cassettes/
+  LANGFUSE_HOST=http://127.0.0.1:3999 python fetch_error_traces.py --days 1
+
+  # Benchmark pagination and concurrency against 50k traces at 100ms per request
+  python standin_server.py --synthetic-traces 50000 --latency-ms 100
+        """,
+    )
+    parser.add_argument("--cassette", type=Path, help="Directory of responses recorded with LANGFUSE_RECORD_DIR")
+    parser.add_argument("--synthetic-traces", type=int, default=0, help="Generate this many traces (default: 0)")
+    parser.add_argument("--synthetic-days", type=int, default=7, help="Spread synthetic traces over this many days")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every response (default: 0)")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Extra random delay up to this much (default: 0)")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+
+    args = parser.parse_args()
+
+    if not args.cassette and not args.synthetic_traces:
+        print("ERROR: Pass --cassette DIR and/or --synthetic-traces N")
+        parser.print_help()
+        sys.exit(1)
+
+    data = StandinData()
+    exact: dict[str, tuple[int, Any]] = {}
+    if args.cassette:
+        if not args.cassette.is_dir():
+            print(f"ERROR: Cassette directory not found: {args.cassette}")
+            sys.exit(1)
+        exact = load_cassettes(args.cassette, data)
+        print(f"Loaded {len(exact)} recorded response(s) from {args.cassette}")
+    if args.synthetic_traces:
+        add_synthetic_data(data, args.synthetic_traces, args.synthetic_days)
+
+    print(
+        f"Serving {len(data.traces)} trace(s), {len(data.observations)} observation(s), "
+        f"{len(data.prompts) + len(data.prompt_metas)} prompt(s)"
+    )
+    if args.latency_ms or args.jitter_ms:
+        print(f"Injected latency: {args.latency_ms:.0f}ms + up to {args.jitter_ms:.0f}ms jitter per request")
+
+    handler = make_handler(data, exact, args.latency_ms, args.jitter_ms, args.verbose)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"\nLANGFUSE_HOST=http://{args.host}:{args.port}  (any LANGFUSE_PUBLIC_KEY/SECRET_KEY works)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
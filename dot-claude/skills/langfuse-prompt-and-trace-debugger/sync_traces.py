@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Incrementally mirror Langfuse traces and observations into a local SQLite store.
+
+INSTRUCTIONS FOR CLAUDE/AI AGENTS:
+- This script is READ-ONLY with respect to Langfuse - it only downloads data
+- It writes only to the local mirror in .trace_store/ (one file per Langfuse host)
+- Run it before investigations, then use --local with the other scripts
+
+Usage:
+    python sync_traces.py                 # First run: last 7 days, afterwards: since last sync
+    python sync_traces.py --days 30       # Backfill a longer window on first run
+    python sync_traces.py --full --days 3 # Re-download the window, ignoring the high-water mark
+    python sync_traces.py --env production
+
+Each run resumes from the newest timestamp already mirrored, minus an overlap
+(--overlap-minutes) so traces that were still being updated when the last sync
+ran are refreshed. Spans and generations mirrored while still running (no end
+time yet) pull the window further back, up to OPEN_OBSERVATION_LOOKBACK, so
+their final output and level replace the partial copy.
+
+Environment:
+    Requires LANGFUSE_PUBLIC_KEY, LANGFUSE_SECRET_KEY, and LANGFUSE_HOST environment variables.
+    These are automatically loaded from arsenal/.env
+    Optional: LANGFUSE_TRACE_STORE to override the mirror file location
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent))
+from env_loader import load_superpowers_env, select_langfuse_environment
+from langfuse_client import bulk_reader, get_langfuse
+from trace_store import TraceStore, normalize_timestamp
+
+from langfuse import Langfuse
+
+# Langfuse API has a max limit of 100 per request
+PAGE_SIZE = 100
+# Matches the --follow re-read window of fetch_error_traces.py
+DEFAULT_OVERLAP_MINUTES = 15
+# Observations still running at the last sync are re-fetched while they are at
+# most this old; older ones are assumed abandoned and no longer hold the window back
+OPEN_OBSERVATION_LOOKBACK = timedelta(hours=6)
+
+
+def sync_entity(
+    store: TraceStore,
+    entity: str,
+    fetch_page: Callable[[int, datetime, datetime], Any],
+    upsert: Callable[[list[dict]], None],
+    time_key: str,
+    window_start: datetime,
+    window_end: datetime,
+) -> int:
+    """Page through one entity's window, upserting each page, then advance its high-water mark."""
+    page = 1
+    synced = 0
+    newest: datetime | None = None
+
+    while True:
+        response = fetch_page(page, window_start, window_end)
+        items = [item.dict() if hasattr(item, "dict") else item for item in response.data]
+        if items:
+            upsert(items)
+            synced += len(items)
+            page_newest = max(datetime.fromisoformat(normalize_timestamp(item[time_key])) for item in items)
+            newest = max(newest, page_newest) if newest else page_newest
+            print(f"  {entity}: page {page}, {synced} synced")
+
+        total_pages = getattr(getattr(response, "meta", None), "total_pages", None)
+        if len(items) < PAGE_SIZE or (total_pages is not None and page >= total_pages):
+            break
+        page += 1
+
+    if newest:
+        store.set_high_water_mark(entity, newest)
+    return synced
+
+
+def sync_traces(
+    langfuse: Langfuse, store: TraceStore, days: int, overlap_minutes: int, full: bool = False
+) -> None:
+    """Mirror traces and observations newer than each entity's high-water mark."""
+    now = datetime.now(timezone.utc)
+    backfill_start = now - timedelta(days=days)
+    overlap = timedelta(minutes=overlap_minutes)
+
+    print(f"\nSyncing into {store.path}")
+    print(f"Langfuse host: {os.environ.get('LANGFUSE_HOST', 'unknown')}")
+
+    # Pages are stored as-is, so read them as raw JSON rather than through SDK models
+    reader = bulk_reader(langfuse)
+    started = time.monotonic()
+    open_since = None if full else store.oldest_open_observation(now - OPEN_OBSERVATION_LOOKBACK)
+    for entity, fetch_page, upsert, time_key in [
+        (
+            "traces",
+            lambda page, start, end: reader.fetch_traces(
+                page=page, limit=PAGE_SIZE, from_timestamp=start, to_timestamp=end, order_by="timestamp.asc"
+            ),
+            store.upsert_traces,
+            "timestamp",
+        ),
+        (
+            "observations",
+            lambda page, start, end: reader.fetch_observations(
+                page=page, limit=PAGE_SIZE, from_start_time=start, to_start_time=end
+            ),
+            store.upsert_observations,
+            "startTime",
+        ),
+    ]:
+        high_water_mark = None if full else store.get_high_water_mark(entity)
+        window_start = high_water_mark - overlap if high_water_mark else backfill_start
+        # Traces are re-read too: their output is usually set when their last span ends
+        reopened = open_since is not None and open_since < window_start
+        if reopened:
+            window_start = open_since
+        print(f"\n{entity}: {window_start.strftime('%Y-%m-%d %H:%M:%S')} → {now.strftime('%Y-%m-%d %H:%M:%S')} UTC")
+        if reopened:
+            print("  (from the oldest observation still running at the last sync)")
+        synced = sync_entity(store, entity, fetch_page, upsert, time_key, window_start, now)
+        print(f"  ✓ {synced} {entity} synced")
+
+    counts = store.counts()
+    print(f"\n✓ Mirror holds {counts['traces']} traces and {counts['observations']} observations")
+    print(f"  Sync took {time.monotonic() - started:.1f}s")
+    print("\nQuery it with --local, e.g.:")
+    print("  uv run python fetch_error_traces.py --local --days 1")
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Incrementally mirror Langfuse traces and observations into a local SQLite store",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--days", type=int, default=7, help="Window to download when nothing is mirrored yet (default: 7)")
+    parser.add_argument(
+        "--overlap-minutes",
+        type=int,
+        default=DEFAULT_OVERLAP_MINUTES,
+        help=f"Re-fetch this many minutes before the high-water mark (default: {DEFAULT_OVERLAP_MINUTES})",
+    )
+    parser.add_argument("--full", action="store_true", help="Ignore the high-water mark and re-download --days")
+    parser.add_argument("--env", choices=["staging", "production", "prod"], help="Langfuse environment")
+
+    args = parser.parse_args()
+
+    if not load_superpowers_env():
+        sys.exit(1)
+
+    if args.env:
+        select_langfuse_environment(args.env)
+
+    langfuse = get_langfuse()
+    if not langfuse:
+        sys.exit(1)
+
+    store = TraceStore()
+    try:
+        sync_traces(langfuse, store, args.days, args.overlap_minutes, full=args.full)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Multi-pattern matching over trace and observation payloads.
+
+Used by `search_trace_errors.py`. A search is a list of patterns, each a
+case-insensitive literal or a /regex/, optionally scoped to one field with a
+`status:`, `name:`, `input:` or `output:` prefix. Patterns are compiled once
+per field: the literals into one Aho-Corasick automaton (pyahocorasick when
+installed, otherwise a single alternation regex), the regexes into one combined
+regex that rejects non-matching text in a single pass. Every payload is
+serialized and lowercased at most once, however many patterns there are.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from langfuse_client import raw_searchable
+from trace_store import searchable_text
+
+try:
+    # pyahocorasick; optional, the fallback is a single alternation regex
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# field prefix -> (record kind, payload key, location reported for hits)
+SEARCH_FIELDS: dict[str, tuple[tuple[str, str, str], ...]] = {
+    "status": (("observation", "statusMessage", "status_message"),),
+    "output": (("trace", "output", "trace_output"), ("observation", "output", "observation_output")),
+    "input": (("trace", "input", "trace_input"), ("observation", "input", "observation_input")),
+    "name": (("trace", "name", "trace_name"), ("observation", "name", "observation_name")),
+}
+# Where patterns without a field prefix are looked for
+DEFAULT_FIELDS = ("output", "status")
+SNIPPET_CHARS = 200
+
+# Numbered or named backreferences change meaning once patterns share one regex
+BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=|\\g<")
+
+
+@dataclass(frozen=True)
+class SearchPattern:
+    """One parsed pattern; exactly one of `literal` (lowercased) and `regex` is set."""
+
+    spec: str
+    field: str | None = None
+    literal: str | None = None
+    regex: re.Pattern | None = None
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return (self.field,) if self.field else DEFAULT_FIELDS
+
+
+def parse_pattern(spec: str) -> SearchPattern:
+    """
+    Parse `[field:]text` or `[field:]/regex/`.
+
+    A prefix only scopes the pattern when it names a known field, so text like
+    `KeyError: 'x'` is still searched as a literal.
+    """
+    prefix, sep, value = spec.partition(":")
+    if sep and prefix.lower() in SEARCH_FIELDS:
+        field = prefix.lower()
+    else:
+        field, value = None, spec
+    if not value:
+        raise ValueError(f"Empty search pattern: {spec!r}")
+
+    if len(value) > 2 and value.startswith("/") and value.endswith("/"):
+        try:
+            regex = re.compile(value[1:-1], re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"Invalid regex in {spec!r}: {e}") from e
+        return SearchPattern(spec, field, regex=regex)
+    return SearchPattern(spec, field, literal=value.lower())
+
+
+class LiteralSet:
+    """Literals found together in one pass over lowercased text."""
+
+    def __init__(self, literals: dict[str, list[int]]):
+        # literal -> indices of the patterns it belongs to
+        self.literals = literals
+        self.pattern_count = sum(len(indices) for indices in literals.values())
+        self.automaton = None
+        self.combined = None
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for literal, indices in literals.items():
+                self.automaton.add_word(literal, (len(literal), indices))
+            self.automaton.make_automaton()
+        else:
+            self.combined = re.compile("|".join(re.escape(literal) for literal in literals))
+
+    def find(self, folded: str) -> dict[int, int]:
+        """Pattern index -> offset of its first occurrence in `folded`."""
+        hits: dict[int, int] = {}
+        if self.automaton is not None:
+            for end, (length, indices) in self.automaton.iter(folded):
+                for index in indices:
+                    hits.setdefault(index, end - length + 1)
+                if len(hits) == self.pattern_count:
+                    break
+            return hits
+
+        # The alternation only tells whether anything matched; which literals did is
+        # then a substring test each, paid only for the rare texts that match
+        if not self.combined.search(folded):
+            return hits
+        for literal, indices in self.literals.items():
+            offset = folded.find(literal)
+            if offset >= 0:
+                for index in indices:
+                    hits[index] = offset
+        return hits
+
+
+class RegexSet:
+    """Regexes behind one combined regex, so text that matches none is rejected in a single pass."""
+
+    def __init__(self, regexes: dict[int, re.Pattern]):
+        self.regexes = regexes
+        self.combined = None
+        sources = [regex.pattern for regex in regexes.values()]
+        if len(sources) > 1 and not any(BACKREFERENCE.search(source) for source in sources):
+            try:
+                self.combined = re.compile("|".join(f"(?:{source})" for source in sources), re.IGNORECASE)
+            except re.error:
+                # e.g. inline global flags, which are only allowed at the very start
+                self.combined = None
+
+    def find(self, text: str) -> dict[int, int]:
+        """Pattern index -> offset of its first match in `text`."""
+        if self.combined is not None and not self.combined.search(text):
+            return {}
+        hits = {}
+        for index, regex in self.regexes.items():
+            if match := regex.search(text):
+                hits[index] = match.start()
+        return hits
+
+
+class FieldMatcher:
+    """All patterns that apply to one payload key of one record kind."""
+
+    def __init__(self, key: str, location: str, patterns: dict[int, SearchPattern]):
+        self.key = key
+        self.location = location
+        literals: dict[str, list[int]] = {}
+        regexes = {}
+        for index, pattern in patterns.items():
+            if pattern.regex is not None:
+                regexes[index] = pattern.regex
+            else:
+                literals.setdefault(pattern.literal, []).append(index)
+        self.literals = LiteralSet(literals) if literals else None
+        self.regexes = RegexSet(regexes) if regexes else None
+
+    def find(self, text: str) -> dict[int, int]:
+        hits = self.regexes.find(text) if self.regexes else {}
+        if self.literals:
+            hits.update(self.literals.find(text.lower()))
+        return hits
+
+
+@dataclass
+class Hit:
+    """Where one pattern first matched within a trace."""
+
+    pattern: SearchPattern
+    location: str
+    snippet: str
+    # Name of the observation the hit came from, None for the trace itself
+    source: str | None = None
+
+
+def snippet(text: str, offset: int) -> str:
+    """Up to SNIPPET_CHARS of `text` around `offset`, on one line."""
+    start = max(0, offset - SNIPPET_CHARS // 4)
+    end = start + SNIPPET_CHARS
+    piece = text[start:end].replace("\n", " ")
+    return ("…" if start else "") + piece + ("…" if end < len(text) else "")
+
+
+class PatternMatcher:
+    """A compiled search: every pattern, grouped by the payload fields it applies to."""
+
+    def __init__(self, patterns: list[SearchPattern]):
+        self.patterns = patterns
+        by_location: dict[tuple[str, str, str], dict[int, SearchPattern]] = {}
+        for index, pattern in enumerate(patterns):
+            for field in pattern.fields:
+                for target in SEARCH_FIELDS[field]:
+                    by_location.setdefault(target, {})[index] = pattern
+
+        self.fields: dict[str, list[FieldMatcher]] = {"trace": [], "observation": []}
+        for (kind, key, location), scoped in by_location.items():
+            self.fields[kind].append(FieldMatcher(key, location, scoped))
+
+        # Undecoded pages can be rejected by their raw text only when every
+        # pattern is a literal that JSON encoding leaves intact
+        self.raw_literals = None
+        if all(pattern.literal is not None and raw_searchable(pattern.literal) for pattern in patterns):
+            literals: dict[str, list[int]] = {}
+            for index, pattern in enumerate(patterns):
+                literals.setdefault(pattern.literal, []).append(index)
+            self.raw_literals = LiteralSet(literals)
+
+    @classmethod
+    def from_specs(cls, specs: list[str]) -> "PatternMatcher":
+        return cls([parse_pattern(spec) for spec in specs])
+
+    def match(self, kind: str, record: dict[str, Any], found: set[int] | None = None) -> dict[int, Hit]:
+        """
+        First hit per pattern in a trace ("trace") or observation ("observation") dict.
+
+        Patterns in `found` already hit elsewhere in the trace and are not reported again.
+        """
+        found = found or set()
+        hits: dict[int, Hit] = {}
+        for matcher in self.fields[kind]:
+            value = record.get(matcher.key)
+            if value is None or value == "":
+                continue
+            text = searchable_text(value)
+            for index, offset in matcher.find(text).items():
+                if index not in found and index not in hits:
+                    source = record.get("name") if kind == "observation" else None
+                    hits[index] = Hit(self.patterns[index], matcher.location, snippet(text, offset), source)
+        return hits
+
+    def may_match_raw(self, content: bytes) -> bool:
+        """False only when no pattern can match anything in this undecoded JSON response."""
+        if self.raw_literals is None:
+            return True
+        return bool(self.raw_literals.find(content.decode(errors="replace").lower()))
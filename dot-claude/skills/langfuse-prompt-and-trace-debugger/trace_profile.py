@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Timing analysis for a single trace's observation tree.
+
+Used by `fetch_trace.py --profile`: per-observation duration and self time
+(duration minus time covered by children), the critical path through the
+parent/child tree, children that ran concurrently, and a flame-graph style
+summary. Profiles can be exported as Chrome trace JSON (opens in speedscope,
+Perfetto and chrome://tracing) or as a native speedscope file.
+"""
+
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+# Timestamps closer than this (ms) are treated as equal
+EPSILON_MS = 0.001
+BAR_WIDTH = 30
+
+
+def parse_time(value: Any) -> datetime | None:
+    """Accept the SDK's datetimes as well as ISO strings from the local mirror."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+@dataclass
+class Span:
+    """One observation on the trace's timeline, in milliseconds since the trace started."""
+
+    id: str
+    name: str
+    type: str
+    parent_id: str | None
+    start: float
+    end: float
+    children: list["Span"] = field(default_factory=list)
+    self_time: float = 0.0
+    depth: int = 0
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class Profile:
+    roots: list[Span]
+    spans: list[Span]
+    wall_ms: float
+    origin: datetime
+    missing_end: int
+
+
+def covered_length(intervals: list[tuple[float, float]]) -> float:
+    """Total length covered by possibly overlapping intervals."""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def peak_concurrency(intervals: list[tuple[float, float]]) -> int:
+    """Maximum number of intervals open at the same instant."""
+    events = sorted([(start, 1) for start, end in intervals] + [(end, -1) for start, end in intervals])
+    peak = running = 0
+    for _, delta in events:
+        running += delta
+        peak = max(peak, running)
+    return peak
+
+
+def build_profile(observations: list[dict]) -> Profile | None:
+    """Turn observation dicts into a timed span tree; None if nothing has a start time."""
+    timed = [(obs, parse_time(obs.get("startTime")), parse_time(obs.get("endTime"))) for obs in observations]
+    timed = [(obs, start, end) for obs, start, end in timed if start is not None]
+    if not timed:
+        return None
+
+    origin = min(start for _, start, _ in timed)
+
+    def ms(value: datetime) -> float:
+        return (value - origin).total_seconds() * 1000
+
+    spans: dict[str, Span] = {}
+    missing_end = 0
+    for obs, start, end in timed:
+        if end is None:
+            # Still running or never ended; treat as instantaneous rather than guessing
+            missing_end += 1
+            end = start
+        spans[str(obs["id"])] = Span(
+            id=str(obs["id"]),
+            name=str(obs.get("name") or "unnamed"),
+            type=str(obs.get("type") or "unknown"),
+            parent_id=str(obs["parentObservationId"]) if obs.get("parentObservationId") else None,
+            start=ms(start),
+            end=max(ms(end), ms(start)),
+        )
+
+    roots = []
+    for span in spans.values():
+        parent = spans.get(span.parent_id) if span.parent_id else None
+        if parent:
+            parent.children.append(span)
+        else:
+            roots.append(span)
+
+    roots.sort(key=lambda s: s.start)
+    stack = [(root, 0) for root in roots]
+    while stack:
+        span, depth = stack.pop()
+        span.depth = depth
+        span.children.sort(key=lambda s: s.start)
+        clipped = [(max(c.start, span.start), min(c.end, span.end)) for c in span.children]
+        span.self_time = span.duration - covered_length([(s, e) for s, e in clipped if e > s])
+        stack.extend((child, depth + 1) for child in span.children)
+
+    wall_ms = max(span.end for span in spans.values()) - min(span.start for span in spans.values())
+    return Profile(roots=roots, spans=list(spans.values()), wall_ms=wall_ms, origin=origin, missing_end=missing_end)
+
+
+def critical_path(profile: Profile) -> list[tuple[Span, float]]:
+    """
+    The chain of spans that determined the trace's end-to-end latency.
+
+    Walking back from each span's end, repeatedly take the child that finished
+    last before the current point, then continue from that child's start.
+    Returns (span, time attributed to the span itself on the path) in start order.
+    """
+    path: list[tuple[Span, float]] = []
+    # The roots are treated as children of a virtual span covering the whole trace
+    stack: list[tuple[Span | None, list[Span], float, float]] = [
+        (None, profile.roots, min(r.start for r in profile.roots), max(r.end for r in profile.roots))
+    ]
+    while stack:
+        span, children, start, end = stack.pop()
+        cursor = end
+        on_path: list[Span] = []
+        for child in sorted(children, key=lambda c: min(c.end, end), reverse=True):
+            if min(child.end, end) <= cursor + EPSILON_MS and child.end > start:
+                on_path.append(child)
+                cursor = max(child.start, start)
+                if cursor <= start + EPSILON_MS:
+                    break
+
+        if span is not None:
+            covered = sum(min(c.end, end) - max(c.start, start) for c in on_path)
+            path.append((span, max(0.0, (end - start) - covered)))
+        stack.extend((child, child.children, child.start, child.end) for child in on_path)
+
+    path.sort(key=lambda item: (item[0].start, item[0].depth))
+    return path
+
+
+def self_time_by_name(profile: Profile) -> list[tuple[str, int, float]]:
+    """(name, count, total self time) per observation name, largest first."""
+    totals: dict[str, list[float]] = defaultdict(lambda: [0, 0.0])
+    for span in profile.spans:
+        totals[span.name][0] += 1
+        totals[span.name][1] += span.self_time
+    return sorted(((name, int(c), t) for name, (c, t) in totals.items()), key=lambda item: -item[2])
+
+
+def collapsed_stacks(profile: Profile) -> list[tuple[str, float]]:
+    """Self time per root-to-span name path, i.e. the data behind a flame graph."""
+    totals: dict[str, float] = defaultdict(float)
+    stack = [(root, root.name) for root in profile.roots]
+    while stack:
+        span, path = stack.pop()
+        totals[path] += span.self_time
+        stack.extend((child, f"{path};{child.name}") for child in span.children)
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def concurrency_groups(profile: Profile) -> list[tuple[Span, int, float, float]]:
+    """
+    Parents whose children overlapped in time.
+
+    Returns (parent, peak concurrent children, summed child time, wall time the
+    children covered), ordered by how much time the overlap saved.
+    """
+    groups = []
+    for span in profile.spans:
+        intervals = [(c.start, c.end) for c in span.children if c.end > c.start]
+        if len(intervals) < 2:
+            continue
+        peak = peak_concurrency(intervals)
+        if peak > 1:
+            groups.append((span, peak, sum(e - s for s, e in intervals), covered_length(intervals)))
+    groups.sort(key=lambda g: -(g[2] - g[3]))
+    return groups
+
+
+def _bar(value: float, total: float) -> str:
+    filled = int(round(BAR_WIDTH * value / total)) if total > 0 else 0
+    return "█" * filled + "·" * (BAR_WIDTH - filled)
+
+
+def _fmt(ms: float) -> str:
+    return f"{ms / 1000:.2f}s" if ms >= 1000 else f"{ms:.0f}ms"
+
+
+def print_profile(profile: Profile, top: int = 15) -> None:
+    """Print the timing report: summary, critical path, hot spots, flame stacks, concurrency."""
+    wall = profile.wall_ms
+    print(f"Wall time: {_fmt(wall)} across {len(profile.spans)} observation(s)")
+    if profile.missing_end:
+        print(f"  ({profile.missing_end} observation(s) had no endTime and are counted as instantaneous)")
+
+    print("\n" + "-" * 80)
+    print("CRITICAL PATH (offset, duration, self time on path):")
+    print("-" * 80)
+    for span, own in critical_path(profile):
+        indent = "  " * span.depth
+        print(
+            f"  +{_fmt(span.start):>8} {_fmt(span.duration):>8} {_fmt(own):>8} {_bar(own, wall)} "
+            f"{indent}{span.type.upper()}: {span.name}"
+        )
+
+    print("\n" + "-" * 80)
+    print(f"SELF TIME BY NAME (top {top}):")
+    print("-" * 80)
+    for name, count, total in self_time_by_name(profile)[:top]:
+        share = 100 * total / wall if wall else 0
+        print(f"  {_fmt(total):>8} {share:5.1f}% {_bar(total, wall)} {name} (x{count})")
+
+    print("\n" + "-" * 80)
+    print(f"FLAME SUMMARY - self time by stack (top {top}):")
+    print("-" * 80)
+    for path, total in collapsed_stacks(profile)[:top]:
+        print(f"  {_fmt(total):>8} {_bar(total, wall)} {path.replace(';', ' → ')}")
+
+    groups = concurrency_groups(profile)
+    print("\n" + "-" * 80)
+    print("CONCURRENT SPANS:")
+    print("-" * 80)
+    if not groups:
+        print("  No overlapping sibling observations - everything ran sequentially")
+    for parent, peak, summed, covered in groups[:top]:
+        print(
+            f"  {parent.name}: {len(parent.children)} children, up to {peak} at once, "
+            f"{_fmt(summed)} of work in {_fmt(covered)} (saved {_fmt(summed - covered)})"
+        )
+
+
+def close_finished(open_spans: list[Span], span: Span) -> list[Span]:
+    """
+    Pop the spans of a lane's stack that ended by the time `span` starts, innermost first.
+
+    A span's own parent stays open even when it ends right where the span starts,
+    so zero-length children still nest under it.
+    """
+    closed = []
+    while open_spans and open_spans[-1].end <= span.start + EPSILON_MS and open_spans[-1].id != span.parent_id:
+        closed.append(open_spans.pop())
+    return closed
+
+
+def assign_lanes(profile: Profile) -> list[tuple[Span, int]]:
+    """
+    Place spans on lanes (threads) so that spans sharing a lane are properly nested.
+
+    Trace viewers require nesting per thread and show whatever encloses a span as
+    its parent, so a span only joins a lane whose innermost open span is its
+    parent; roots take an idle lane, anything else (e.g. the children of the
+    second of two concurrent siblings) starts a new one.
+
+    >>> spans = [
+    ...     Span("r", "root", "SPAN", None, 0, 100),
+    ...     Span("a", "a", "SPAN", "r", 10, 90),
+    ...     Span("b", "b", "SPAN", "r", 20, 60),
+    ...     Span("a1", "a1", "SPAN", "a", 30, 40),
+    ...     Span("b1", "b1", "SPAN", "b", 45, 55),
+    ... ]
+    >>> profile = Profile(roots=spans[:1], spans=spans, wall_ms=100, origin=None, missing_end=0)
+    >>> [(span.id, lane) for span, lane in assign_lanes(profile)]
+    [('r', 0), ('a', 0), ('b', 1), ('a1', 0), ('b1', 1)]
+    """
+    placed: list[tuple[Span, int]] = []
+    lanes: list[list[Span]] = []
+    for span in sorted(profile.spans, key=lambda s: (s.start, -s.end)):
+        for open_spans in lanes:
+            close_finished(open_spans, span)
+
+        lane_index = next(
+            (
+                index
+                for index, open_spans in enumerate(lanes)
+                if open_spans
+                and open_spans[-1].id == span.parent_id
+                and open_spans[-1].end >= span.end - EPSILON_MS
+            ),
+            None,
+        )
+        if lane_index is None:
+            lane_index = next((index for index, open_spans in enumerate(lanes) if not open_spans), None)
+        if lane_index is None:
+            lanes.append([])
+            lane_index = len(lanes) - 1
+        lanes[lane_index].append(span)
+        placed.append((span, lane_index))
+    return placed
+
+
+def to_chrome_trace(profile: Profile, trace_name: str) -> dict:
+    """Chrome trace event format; speedscope, Perfetto and chrome://tracing all open it."""
+    events: list[dict] = [
+        {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": trace_name}},
+    ]
+    for span, lane in assign_lanes(profile):
+        events.append(
+            {
+                "name": span.name,
+                "cat": span.type,
+                "ph": "X",
+                "ts": round(span.start * 1000, 3),
+                "dur": round(span.duration * 1000, 3),
+                "pid": 1,
+                "tid": lane,
+                "args": {"id": span.id, "self_ms": round(span.self_time, 3)},
+            }
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def to_speedscope(profile: Profile, trace_name: str) -> dict:
+    """Native speedscope file with one evented profile per lane."""
+    frames: list[dict] = []
+    frame_index: dict[str, int] = {}
+    by_lane: dict[int, list[Span]] = defaultdict(list)
+    for span, lane in assign_lanes(profile):
+        by_lane[lane].append(span)
+
+    profiles = []
+    for lane in sorted(by_lane):
+        events = []
+        # Replay the lane's nesting so every span closes after the spans inside it
+        open_spans: list[Span] = []
+        for span in by_lane[lane]:
+            for closed in close_finished(open_spans, span):
+                events.append({"type": "C", "frame": frame_index[closed.name], "at": closed.end})
+            if span.name not in frame_index:
+                frame_index[span.name] = len(frames)
+                frames.append({"name": span.name})
+            events.append({"type": "O", "frame": frame_index[span.name], "at": span.start})
+            open_spans.append(span)
+        while open_spans:
+            closed = open_spans.pop()
+            events.append({"type": "C", "frame": frame_index[closed.name], "at": closed.end})
+        profiles.append(
+            {
+                "type": "evented",
+                "name": f"{trace_name} (lane {lane})",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": profile.wall_ms,
+                "events": events,
+            }
+        )
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": trace_name,
+        "shared": {"frames": frames},
+        "profiles": profiles,
+        "exporter": "langfuse-prompt-and-trace-debugger",
+    }
+
+
+def export_profile(profile: Profile, path: Path, trace_name: str) -> None:
+    """Write `*.speedscope.json` as a native speedscope file, anything else as Chrome trace JSON."""
+    if path.name.endswith(".speedscope.json"):
+        data = to_speedscope(profile, trace_name)
+    else:
+        data = to_chrome_trace(profile, trace_name)
+    path.write_text(json.dumps(data))
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Local SQLite mirror of Langfuse traces and observations.
+
+`sync_traces.py` fills the mirror incrementally; debugging scripts run with
+`--local` read from it instead of the Langfuse API. TraceStore implements the
+subset of the Langfuse client the scripts use (fetch_traces, fetch_observations)
+and returns plain dicts, so the scripts work against either unchanged.
+
+Trace outputs, observation outputs and status messages are also kept in an
+FTS5 full-text index, updated on every upsert, for search_trace_errors.py.
+"""
+
+import json
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+STORE_DIR = Path(__file__).parent / ".trace_store"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS traces (
+    id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    name TEXT,
+    user_id TEXT,
+    session_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_traces_timestamp ON traces(timestamp);
+CREATE INDEX IF NOT EXISTS idx_traces_session ON traces(session_id);
+
+CREATE TABLE IF NOT EXISTS observations (
+    id TEXT PRIMARY KEY,
+    trace_id TEXT,
+    start_time TEXT NOT NULL,
+    name TEXT,
+    type TEXT,
+    level TEXT,
+    parent_observation_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_observations_trace ON observations(trace_id);
+CREATE INDEX IF NOT EXISTS idx_observations_start ON observations(start_time);
+CREATE INDEX IF NOT EXISTS idx_observations_level ON observations(level, start_time);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    entity TEXT PRIMARY KEY,
+    high_water_mark TEXT NOT NULL
+);
+
+-- Searchable text, one row per (trace or observation, field); payload_fts indexes it
+CREATE TABLE IF NOT EXISTS payload_text (
+    rowid INTEGER PRIMARY KEY,
+    entity_id TEXT NOT NULL,
+    trace_id TEXT NOT NULL,
+    location TEXT NOT NULL,
+    content TEXT NOT NULL,
+    UNIQUE (entity_id, location)
+);
+CREATE INDEX IF NOT EXISTS idx_payload_text_trace ON payload_text(trace_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS payload_fts USING fts5(
+    content, content='payload_text', content_rowid='rowid', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS payload_text_ai AFTER INSERT ON payload_text BEGIN
+    INSERT INTO payload_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS payload_text_ad AFTER DELETE ON payload_text BEGIN
+    INSERT INTO payload_fts(payload_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS payload_text_au AFTER UPDATE ON payload_text BEGIN
+    INSERT INTO payload_fts(payload_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+    INSERT INTO payload_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+"""
+
+# Tables a read-only open expects; sync_traces.py creates and migrates them
+STORE_TABLES = ("traces", "observations", "sync_state", "payload_text", "payload_fts")
+FTS_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def normalize_timestamp(value: Any) -> str:
+    """Render a datetime or ISO string as a UTC ISO string that sorts chronologically."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return normalize_timestamp(value)
+    return str(value)
+
+
+def searchable_text(value: Any) -> str:
+    """Flatten an output/status payload to the text that gets indexed."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, default=_json_default, ensure_ascii=False)
+
+
+def to_fts_query(search: str) -> str:
+    """
+    Translate a search string into an FTS5 query.
+
+    Words must all match (in any order), "quoted text" must match as a phrase,
+    a trailing * matches a prefix, and AND/OR/NOT pass through as operators.
+    Everything else is quoted so punctuation like `KeyError: 'x'` is safe.
+    """
+    parts = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', search):
+        if phrase:
+            parts.append('"' + phrase.replace('"', '""') + '"')
+        elif word in FTS_OPERATORS:
+            parts.append(word)
+        else:
+            prefix = word.endswith("*")
+            word = word.rstrip("*")
+            if word:
+                parts.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(parts)
+
+
+def default_store_path(host: str | None = None) -> Path:
+    """One mirror file per Langfuse host, so staging and production never mix."""
+    if override := os.environ.get("LANGFUSE_TRACE_STORE"):
+        return Path(override)
+    host = host or os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com")
+    slug = re.sub(r"[^a-zA-Z0-9_\-]", "_", re.sub(r"^https?://", "", host))
+    return STORE_DIR / f"{slug}.sqlite"
+
+
+@dataclass
+class StoreResponse:
+    """Mirrors the SDK's Fetch*Response: items on `data`, paging info on `meta`."""
+
+    data: list[dict]
+    meta: SimpleNamespace
+
+
+class TraceStore:
+    """SQLite-backed trace/observation mirror with a Langfuse-client-like read API."""
+
+    def __init__(self, path: Path | None = None, create: bool = True):
+        self.path = path or default_store_path()
+        if create:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            database = str(self.path)
+        else:
+            # Read-only: fails instead of creating an empty mirror, and never migrates one
+            database = f"{self.path.resolve().as_uri()}?mode=ro"
+        # Scripts may read from worker threads; writes only happen from sync_traces.py
+        self.conn = sqlite3.connect(database, check_same_thread=False, uri=not create)
+        if create:
+            self.conn.executescript(SCHEMA)
+            self._ensure_search_index()
+        elif missing := self._missing_tables():
+            self.conn.close()
+            raise sqlite3.OperationalError(f"trace mirror has no {', '.join(missing)} table(s)")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _missing_tables(self) -> list[str]:
+        existing = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return [table for table in STORE_TABLES if table not in existing]
+
+    def is_synced(self) -> bool:
+        """True once sync_traces.py has completed at least one pass into this mirror."""
+        return self.conn.execute("SELECT 1 FROM sync_state LIMIT 1").fetchone() is not None
+
+    # --- Sync (write) side -------------------------------------------------
+
+    def oldest_open_observation(self, since: datetime) -> datetime | None:
+        """Start of the oldest span or generation after `since` mirrored before it had ended."""
+        row = self.conn.execute(
+            "SELECT MIN(start_time) FROM observations WHERE start_time >= ? AND type != 'EVENT' "
+            "AND json_extract(data, '$.endTime') IS NULL",
+            (normalize_timestamp(since),),
+        ).fetchone()
+        return datetime.fromisoformat(row[0]) if row[0] else None
+
+    def get_high_water_mark(self, entity: str) -> datetime | None:
+        row = self.conn.execute("SELECT high_water_mark FROM sync_state WHERE entity = ?", (entity,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def set_high_water_mark(self, entity: str, value: datetime) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO sync_state (entity, high_water_mark) VALUES (?, ?) "
+                "ON CONFLICT(entity) DO UPDATE SET high_water_mark = excluded.high_water_mark "
+                "WHERE excluded.high_water_mark > sync_state.high_water_mark",
+                (entity, normalize_timestamp(value)),
+            )
+
+    def _index_payloads(self, rows: list[tuple[str, str, str, Any]]) -> None:
+        """Upsert (entity_id, trace_id, location, value) rows; the FTS triggers follow along."""
+        self.conn.executemany(
+            "INSERT INTO payload_text (entity_id, trace_id, location, content) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(entity_id, location) DO UPDATE SET content = excluded.content "
+            "WHERE excluded.content != payload_text.content",
+            [(entity_id, trace_id, location, text) for entity_id, trace_id, location, value in rows
+             if (text := searchable_text(value))],
+        )
+
+    def _ensure_search_index(self) -> None:
+        """Index mirrors synced before full-text search existed."""
+        if self.conn.execute("SELECT 1 FROM payload_text LIMIT 1").fetchone():
+            return
+        if not self.conn.execute("SELECT 1 FROM traces LIMIT 1").fetchone():
+            return
+        with self.conn:
+            for table, index in (("traces", self._index_traces), ("observations", self._index_observations)):
+                index([json.loads(row[0]) for row in self.conn.execute(f"SELECT data FROM {table}")])
+
+    def _index_traces(self, traces: list[dict]) -> None:
+        self._index_payloads([(trace["id"], trace["id"], "trace_output", trace.get("output")) for trace in traces])
+
+    def _index_observations(self, observations: list[dict]) -> None:
+        self._index_payloads(
+            [
+                (obs["id"], obs.get("traceId"), location, obs.get(key))
+                for obs in observations
+                if obs.get("traceId")
+                for location, key in (("status_message", "statusMessage"), ("observation_output", "output"))
+            ]
+        )
+
+    def upsert_traces(self, traces: list[dict]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO traces (id, timestamp, name, user_id, session_id, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        trace["id"],
+                        normalize_timestamp(trace["timestamp"]),
+                        trace.get("name"),
+                        trace.get("userId"),
+                        trace.get("sessionId"),
+                        json.dumps(trace, default=_json_default),
+                    )
+                    for trace in traces
+                ],
+            )
+            self._index_traces(traces)
+
+    def upsert_observations(self, observations: list[dict]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO observations "
+                "(id, trace_id, start_time, name, type, level, parent_observation_id, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        obs["id"],
+                        obs.get("traceId"),
+                        normalize_timestamp(obs["startTime"]),
+                        obs.get("name"),
+                        obs.get("type"),
+                        obs.get("level"),
+                        obs.get("parentObservationId"),
+                        json.dumps(obs, default=_json_default),
+                    )
+                    for obs in observations
+                ],
+            )
+            self._index_observations(observations)
+
+    # --- Full-text search --------------------------------------------------
+
+    def search(
+        self, search: str, from_timestamp: datetime | None = None, limit: int | None = None
+    ) -> list[tuple[dict, str, str]]:
+        """
+        Find traces whose outputs or observation status/outputs match `search` (see to_fts_query).
+
+        Returns (trace_dict, location, snippet) per matching trace, newest first,
+        using the first matching field of each trace.
+        """
+        query = to_fts_query(search)
+        if not query:
+            return []
+
+        rows = self.conn.execute(
+            "SELECT t.id, t.data, p.location, snippet(payload_fts, 0, '»', '«', '…', 32) "
+            "FROM payload_fts "
+            "JOIN payload_text p ON p.rowid = payload_fts.rowid "
+            "JOIN traces t ON t.id = p.trace_id "
+            "WHERE payload_fts MATCH ? AND t.timestamp >= ? "
+            "ORDER BY t.timestamp DESC, p.location DESC",
+            (query, normalize_timestamp(from_timestamp) if from_timestamp else ""),
+        )
+
+        matches: dict[str, tuple[dict, str, str]] = {}
+        for trace_id, data, location, snippet in rows:
+            if trace_id not in matches:
+                matches[trace_id] = (json.loads(data), location, snippet)
+                if limit is not None and len(matches) >= limit:
+                    break
+        return list(matches.values())
+
+    def counts(self) -> dict[str, int]:
+        return {
+            table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("traces", "observations")
+        }
+
+    # --- Langfuse-client-compatible read side ------------------------------
+
+    def _page(
+        self, table: str, time_column: str, filters: dict[str, Any], page: int | None, limit: int | None, ascending: bool
+    ) -> StoreResponse:
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if column == "from":
+                clauses.append(f"{time_column} >= ?")
+                params.append(normalize_timestamp(value))
+            elif column == "to":
+                clauses.append(f"{time_column} <= ?")
+                params.append(normalize_timestamp(value))
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        page = page or 1
+        limit = limit or 50
+        total = self.conn.execute(f"SELECT COUNT(*) FROM {table} {where}", params).fetchone()[0]
+        rows = self.conn.execute(
+            f"SELECT data FROM {table} {where} ORDER BY {time_column} {'ASC' if ascending else 'DESC'} "
+            "LIMIT ? OFFSET ?",
+            [*params, limit, (page - 1) * limit],
+        ).fetchall()
+
+        meta = SimpleNamespace(page=page, limit=limit, total_items=total, total_pages=-(-total // limit))
+        return StoreResponse(data=[json.loads(row[0]) for row in rows], meta=meta)
+
+    def fetch_traces(
+        self,
+        *,
+        page: int | None = None,
+        limit: int | None = None,
+        user_id: str | None = None,
+        name: str | None = None,
+        session_id: str | None = None,
+        from_timestamp: datetime | None = None,
+        to_timestamp: datetime | None = None,
+        order_by: str | None = None,
+        **_: Any,
+    ) -> StoreResponse:
+        """Same filters and newest-first default ordering as Langfuse.fetch_traces."""
+        filters = {"user_id": user_id, "name": name, "session_id": session_id, "from": from_timestamp, "to": to_timestamp}
+        ascending = bool(order_by and order_by.endswith(".asc"))
+        return self._page("traces", "timestamp", filters, page, limit, ascending)
+
+    def fetch_observations(
+        self,
+        *,
+        page: int | None = None,
+        limit: int | None = None,
+        name: str | None = None,
+        trace_id: str | None = None,
+        parent_observation_id: str | None = None,
+        from_start_time: datetime | None = None,
+        to_start_time: datetime | None = None,
+        type: str | None = None,
+        level: str | None = None,
+        **_: Any,
+    ) -> StoreResponse:
+        """
+        Same filters as Langfuse.fetch_observations plus the API's `level` filter.
+
+        A trace's observations come back in start order, other queries newest first.
+        """
+        filters = {
+            "name": name,
+            "trace_id": trace_id,
+            "parent_observation_id": parent_observation_id,
+            "type": type,
+            "level": level,
+            "from": from_start_time,
+            "to": to_start_time,
+        }
+        # Scripts fetch a trace's observations without paging, so return the whole tree
+        return self._page(
+            "observations", "start_time", filters, page, limit or (1000 if trace_id else 50), ascending=bool(trace_id)
+        )
+
+    def fetch_trace(self, id: str) -> SimpleNamespace:
+        """Like Langfuse.fetch_trace: the trace dict with its observations, on `data`."""
+        row = self.conn.execute("SELECT data FROM traces WHERE id = ?", (id,)).fetchone()
+        if not row:
+            raise KeyError(f"Trace {id} is not in the local mirror, run sync_traces.py")
+        trace = json.loads(row[0])
+        trace["observations"] = self.fetch_observations(trace_id=id).data
+        return SimpleNamespace(data=trace)
+
+
+def open_local_store(path: Path | None = None) -> TraceStore | None:
+    """
+    Open an existing, synced mirror for the `--local` scripts.
+
+    Only sync_traces.py creates the mirror; a missing or never-synced one would
+    otherwise read as "no traces found". Prints an error and returns None instead.
+    """
+    path = path or default_store_path()
+    try:
+        store = TraceStore(path, create=False)
+    except sqlite3.OperationalError:
+        store = None
+    if store is not None and store.is_synced():
+        return store
+    if store is not None:
+        store.close()
+    print(f"ERROR: No synced trace mirror at {path}")
+    print("Run sync_traces.py first (with the same --env), then retry with --local")
+    return None
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Token and cost rollups for LLM generations by prompt, model, user and day.
+
+INSTRUCTIONS FOR CLAUDE/AI AGENTS:
+- This script is READ-ONLY - it only fetches observation data from Langfuse for viewing
+- DO NOT use this script to modify or delete traces in Langfuse
+- DO NOT push any changes to Langfuse
+- This is strictly a reporting tool for estimating LLM spend
+
+Usage:
+    python usage_report.py
+    python usage_report.py --days 30 --by prompt,model
+    python usage_report.py --days 30 --by prompt+day --csv spend.csv
+
+Examples:
+    # Calls, tokens and cost per prompt and per model over the last 24 hours (default)
+    python usage_report.py
+
+    # Last month's spend per prompt, model, user and day
+    python usage_report.py --days 30 --by prompt,model,user,day
+
+    # Daily spend per prompt as CSV for a spreadsheet
+    python usage_report.py --days 30 --by prompt+day --csv spend.csv
+
+    # Report over the local mirror filled by sync_traces.py
+    python usage_report.py --local --days 30
+
+Generations are read page by page into dictionary-encoded columns (one array
+per field, strings stored once), then every rollup is a single pass over integer
+group codes, so a month of data aggregates in seconds.
+
+Environment:
+    Requires LANGFUSE_PUBLIC_KEY, LANGFUSE_SECRET_KEY, and LANGFUSE_HOST environment variables.
+    These are automatically loaded from arsenal/.env
+"""
+
+import argparse
+import csv
+import os
+import sys
+from array import array
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TextIO
+
+# Add current directory to path to import env_loader
+sys.path.insert(0, str(Path(__file__).parent))
+from env_loader import load_superpowers_env, select_langfuse_environment
+from langfuse_client import bulk_reader, get_langfuse
+from latency_report import PAGE_SIZE, iter_observations
+from trace_profile import parse_time
+from trace_store import open_local_store
+
+from langfuse import Langfuse
+
+DIMENSIONS = ("prompt", "model", "user", "day")
+METRICS = ("calls", "input_tokens", "output_tokens", "total_tokens", "cost_usd")
+DEFAULT_ROLLUPS = ("prompt", "model")
+
+# Traces can start a little before their generations; widen the user lookup window by this much
+TRACE_LOOKUP_MARGIN = timedelta(hours=1)
+
+
+class Categories:
+    """Dictionary encoding: each distinct string is stored once and referenced by an int code."""
+
+    def __init__(self) -> None:
+        self.labels: list[str] = []
+        self._codes: dict[str, int] = {}
+
+    def code(self, label: str) -> int:
+        code = self._codes.get(label)
+        if code is None:
+            code = self._codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+def usage_numbers(obs: dict) -> tuple[int, int, int, float]:
+    """(input tokens, output tokens, total tokens, cost in USD) from whichever usage fields are present."""
+    details = obs.get("usageDetails") or {}
+    usage = obs.get("usage") or {}
+    input_tokens = details.get("input", usage.get("input") or obs.get("promptTokens") or 0) or 0
+    output_tokens = details.get("output", usage.get("output") or obs.get("completionTokens") or 0) or 0
+    total_tokens = details.get("total", usage.get("total") or obs.get("totalTokens") or 0) or (
+        input_tokens + output_tokens
+    )
+
+    cost = obs.get("calculatedTotalCost")
+    if cost is None:
+        cost = (obs.get("costDetails") or {}).get("total", usage.get("totalCost"))
+    return int(input_tokens), int(output_tokens), int(total_tokens), float(cost or 0.0)
+
+
+class UsageColumns:
+    """
+    Generation usage stored column-wise.
+
+    String fields are dictionary-encoded into int arrays; user is resolved per
+    trace afterwards, since observations only carry the trace ID.
+    """
+
+    def __init__(self) -> None:
+        self.categories = {name: Categories() for name in ("prompt", "model", "day", "trace")}
+        self.codes = {name: array("l") for name in self.categories}
+        self.input_tokens = array("q")
+        self.output_tokens = array("q")
+        self.total_tokens = array("q")
+        self.cost = array("d")
+
+    def __len__(self) -> int:
+        return len(self.cost)
+
+    def append(self, obs: dict) -> None:
+        start = parse_time(obs.get("startTime"))
+        values = {
+            "prompt": obs.get("promptName") or "-",
+            "model": obs.get("model") or "-",
+            "day": start.date().isoformat() if start else "-",
+            "trace": obs.get("traceId") or "-",
+        }
+        for name, value in values.items():
+            self.codes[name].append(self.categories[name].code(value))
+
+        input_tokens, output_tokens, total_tokens, cost = usage_numbers(obs)
+        self.input_tokens.append(input_tokens)
+        self.output_tokens.append(output_tokens)
+        self.total_tokens.append(total_tokens)
+        self.cost.append(cost)
+
+    def user_codes(self, users_by_trace: dict[str, str]) -> tuple[array, Categories]:
+        """Map each row's trace code to a user code with one lookup per distinct trace."""
+        users = Categories()
+        trace_ids = self.categories["trace"].labels
+        trace_to_user = [users.code(users_by_trace.get(trace_id) or "-") for trace_id in trace_ids]
+        return array("l", (trace_to_user[code] for code in self.codes["trace"])), users
+
+    def rollup(
+        self, dimensions: tuple[str, ...], user_codes: tuple[array, Categories] | None = None
+    ) -> list[tuple[tuple[str, ...], list[float]]]:
+        """
+        Sum every metric per group in one pass over combined group codes.
+
+        Returns [(group labels, [calls, input, output, total tokens, cost])], most expensive first.
+        """
+        columns: list[tuple[array, Categories]] = []
+        for dimension in dimensions:
+            if dimension == "user":
+                if user_codes is None:
+                    raise ValueError("user rollups need user_codes")
+                columns.append(user_codes)
+            else:
+                columns.append((self.codes[dimension], self.categories[dimension]))
+
+        # Combine per-dimension codes into one mixed-radix group code per row
+        group_codes = array("q", bytes(8 * len(self)))
+        radix = 1
+        for codes, categories in columns:
+            for row, code in enumerate(codes):
+                group_codes[row] += code * radix
+            radix *= max(1, len(categories))
+
+        sums: dict[int, list[float]] = {}
+        for group, input_tokens, output_tokens, total_tokens, cost in zip(
+            group_codes, self.input_tokens, self.output_tokens, self.total_tokens, self.cost
+        ):
+            totals = sums.get(group)
+            if totals is None:
+                totals = sums[group] = [0, 0, 0, 0, 0.0]
+            totals[0] += 1
+            totals[1] += input_tokens
+            totals[2] += output_tokens
+            totals[3] += total_tokens
+            totals[4] += cost
+
+        rows = []
+        for group, totals in sums.items():
+            labels = []
+            for _, categories in columns:
+                size = max(1, len(categories))
+                labels.append(categories.labels[group % size])
+                group //= size
+            rows.append((tuple(labels), totals))
+        rows.sort(key=lambda row: (-row[1][4], -row[1][3]))
+        return rows
+
+
+def fetch_users_by_trace(langfuse: Langfuse, from_timestamp: datetime, to_timestamp: datetime) -> dict[str, str]:
+    """userId for every trace in the window, read from the paged trace list."""
+    reader = bulk_reader(langfuse)
+    users: dict[str, str] = {}
+    page = 1
+    while True:
+        # Only IDs are needed, so skip input/output where the server supports it
+        traces = reader.fetch_traces(
+            page=page, limit=PAGE_SIZE, from_timestamp=from_timestamp, to_timestamp=to_timestamp, fields="core"
+        )
+        for trace_dict in traces.data:
+            if trace_dict.get("userId"):
+                users[trace_dict["id"]] = trace_dict["userId"]
+
+        total_pages = getattr(getattr(traces, "meta", None), "total_pages", None)
+        if len(traces.data) < PAGE_SIZE or (total_pages is not None and page >= total_pages):
+            return users
+        page += 1
+
+
+def print_rollup(dimensions: tuple[str, ...], rows: list[tuple[tuple[str, ...], list[float]]], top: int) -> None:
+    """Print one rollup as a table with a total row."""
+    headers = [dimension.upper() for dimension in dimensions]
+    widths = [min(40, max([len(h)] + [len(labels[i]) for labels, _ in rows])) for i, h in enumerate(headers)]
+    widths[0] = max(widths[0], len("TOTAL"))
+    metric_headers = ["CALLS", "INPUT TOK", "OUTPUT TOK", "TOTAL TOK", "COST USD"]
+
+    def line(labels: list[str], totals: list[float]) -> str:
+        cells = [label[:width].ljust(width) for label, width in zip(labels, widths)]
+        values = [f"{int(v):,}" for v in totals[:4]] + [f"${totals[4]:,.4f}"]
+        return "  ".join(cells + [value.rjust(12) for value in values])
+
+    rule = "-" * (sum(widths) + 2 * len(widths) + 14 * len(metric_headers))
+    print("\n" + "  ".join([h.ljust(w) for h, w in zip(headers, widths)] + [m.rjust(12) for m in metric_headers]))
+    print(rule)
+    for labels, totals in rows[:top]:
+        print(line(list(labels), totals))
+    if len(rows) > top:
+        print(f"  ... {len(rows) - top} more group(s), use --top or --csv to see all")
+
+    grand = [sum(totals[i] for _, totals in rows) for i in range(len(METRICS))]
+    print(rule)
+    print(line(["TOTAL"] + [""] * (len(dimensions) - 1), grand))
+
+
+def write_csv(output: TextIO, rollups: list[tuple[tuple[str, ...], list]]) -> None:
+    """One row per group; `rollup` names the grouping and unused dimension columns are empty."""
+    writer = csv.writer(output)
+    writer.writerow(["rollup", *DIMENSIONS, *METRICS])
+    for dimensions, rows in rollups:
+        for labels, totals in rows:
+            by_dimension = dict(zip(dimensions, labels))
+            writer.writerow(
+                [
+                    "+".join(dimensions),
+                    *(by_dimension.get(d, "") for d in DIMENSIONS),
+                    *map(int, totals[:4]),
+                    f"{totals[4]:.6f}",
+                ]
+            )
+
+
+def usage_report(
+    langfuse: Langfuse,
+    hours: int | None = None,
+    days: int | None = None,
+    rollups: list[tuple[str, ...]] | None = None,
+    name: str | None = None,
+    top: int = 25,
+    csv_path: str | None = None,
+) -> None:
+    """
+    Report calls, tokens and cost for generations in the time range.
+
+    Args:
+        langfuse: Langfuse client (or TraceStore for the local mirror)
+        hours: Number of hours to look back (mutually exclusive with days)
+        days: Number of days to look back (mutually exclusive with hours)
+        rollups: Groupings to report, each a tuple of DIMENSIONS
+        name: Only include generations with this observation name
+        top: Rows to print per rollup
+        csv_path: Write every rollup as CSV to this path ("-" for stdout) instead of tables
+    """
+    rollups = rollups or [(dimension,) for dimension in DEFAULT_ROLLUPS]
+    now = datetime.now(timezone.utc)
+    if days:
+        time_delta = timedelta(days=days)
+        time_desc = f"last {days} day(s)"
+    else:
+        hours = hours or 24
+        time_delta = timedelta(hours=hours)
+        time_desc = f"last {hours} hour(s)"
+
+    from_timestamp = now - time_delta
+    # Keep stdout clean when it carries the CSV
+    log = sys.stderr if csv_path == "-" else sys.stdout
+
+    print("\n" + "=" * 80, file=log)
+    print(f"USAGE REPORT ({time_desc})", file=log)
+    print("=" * 80, file=log)
+    print(
+        f"Time range: {from_timestamp.strftime('%Y-%m-%d %H:%M:%S')} to {now.strftime('%Y-%m-%d %H:%M:%S')} UTC",
+        file=log,
+    )
+    print(f"Langfuse host: {os.environ.get('LANGFUSE_HOST', 'unknown')}", file=log)
+    print("=" * 80, file=log)
+
+    columns = UsageColumns()
+    user_codes = None
+    try:
+        for obs in iter_observations(langfuse, from_timestamp, now, name, "GENERATION"):
+            columns.append(obs)
+            if len(columns) % (PAGE_SIZE * 100) == 0:
+                print(f"  ...read {len(columns)} generations", file=sys.stderr)
+
+        if columns and any("user" in dimensions for dimensions in rollups):
+            print("Resolving users from traces...", file=log)
+            users_by_trace = fetch_users_by_trace(langfuse, from_timestamp - TRACE_LOOKUP_MARGIN, now)
+            user_codes = columns.user_codes(users_by_trace)
+    except Exception as e:
+        print(f"\nERROR: Failed to fetch generations: {e}", file=log)
+        import traceback
+
+        traceback.print_exc()
+        return
+
+    if not len(columns):
+        print(f"\nNo generations found in {time_desc}", file=log)
+        return
+
+    print(f"\n{len(columns)} generation(s) read", file=log)
+    results = [(dimensions, columns.rollup(dimensions, user_codes)) for dimensions in rollups]
+
+    if csv_path == "-":
+        write_csv(sys.stdout, results)
+    elif csv_path:
+        with open(csv_path, "w", newline="") as f:
+            write_csv(f, results)
+        print(f"\n✓ Wrote {sum(len(rows) for _, rows in results)} rows to {csv_path}")
+    else:
+        for dimensions, rows in results:
+            print_rollup(dimensions, rows, top)
+        print("\nCost is Langfuse's calculated cost; generations without model pricing count as $0.")
+
+
+def parse_rollups(value: str) -> list[tuple[str, ...]]:
+    """'prompt,model+day' -> [('prompt',), ('model', 'day')]"""
+    rollups = []
+    for spec in value.split(","):
+        dimensions = tuple(d.strip() for d in spec.split("+") if d.strip())
+        if not dimensions or any(d not in DIMENSIONS for d in dimensions):
+            raise argparse.ArgumentTypeError(
+                f"invalid rollup '{spec}', use dimensions from {', '.join(DIMENSIONS)} joined by '+'"
+            )
+        rollups.append(dimensions)
+    return rollups
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Token and cost rollups for LLM generations over a time range",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Calls, tokens and cost per prompt and per model over the last 24 hours
+  python usage_report.py
+
+  # Last month per prompt, model, user and day
+  python usage_report.py --days 30 --by prompt,model,user,day
+
+  # Daily spend per prompt as CSV
+  python usage_report.py --days 30 --by prompt+day --csv spend.csv
+
+  # Report over the local mirror filled by sync_traces.py
+  python usage_report.py --local --days 30
+        """,
+    )
+
+    parser.add_argument(
+        "--hours",
+        type=int,
+        help="Number of hours to look back (default: 24, mutually exclusive with --days)",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        help="Number of days to look back (mutually exclusive with --hours)",
+    )
+    parser.add_argument(
+        "--by",
+        type=parse_rollups,
+        default=[(dimension,) for dimension in DEFAULT_ROLLUPS],
+        help=(
+            f"Comma-separated rollups from {', '.join(DIMENSIONS)}; join with '+' to group by several "
+            f"(default: {','.join(DEFAULT_ROLLUPS)})"
+        ),
+    )
+    parser.add_argument("--name", help="Only include generations with this observation name")
+    parser.add_argument("--top", type=int, default=25, help="Rows to print per rollup (default: 25)")
+    parser.add_argument("--csv", metavar="PATH", help="Write all rollups as CSV to PATH ('-' for stdout)")
+    parser.add_argument(
+        "--env",
+        choices=["staging", "production", "prod"],
+        help="Langfuse environment to use (default: from LANGFUSE_ENVIRONMENT or staging)",
+    )
+    parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Read from the local mirror (run sync_traces.py first) instead of the Langfuse API",
+    )
+
+    args = parser.parse_args()
+
+    # Validate mutually exclusive options
+    if args.hours and args.days:
+        print("ERROR: --hours and --days are mutually exclusive")
+        parser.print_help()
+        sys.exit(1)
+
+    # Auto-load environment from arsenal/.env
+    if not load_superpowers_env():
+        sys.exit(1)
+
+    # Override environment if --env flag provided
+    if args.env:
+        select_langfuse_environment(args.env)
+
+    langfuse = open_local_store() if args.local else get_langfuse()
+    if not langfuse:
+        sys.exit(1)
+
+    usage_report(
+        langfuse,
+        hours=args.hours,
+        days=args.days,
+        rollups=args.by,
+        name=args.name,
+        top=args.top,
+        csv_path=args.csv,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,8 @@ CREATE TABLE IF NOT EXISTS code_elements (
     docstring TEXT,
     searchable_text TEXT,
     embedding vector(1536),  -- OpenAI text-embedding-3-small dimensions
+    line_number INTEGER,  -- with file_path, identifies the element its chunk rows belong to
+    chunk_index INTEGER NOT NULL DEFAULT 0,  -- oversized elements span several rows; 0 is the first
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -25,4 +27,32 @@ CREATE INDEX IF NOT EXISTS idx_code_elements_name ON code_elements(element_name)
 -- Create vector similarity index (IVFFlat with cosine distance)
 CREATE INDEX IF NOT EXISTS idx_code_elements_embedding 
 ON code_elements USING ivfflat (embedding vector_cosine_ops)
-WITH (lists = 100);
\ No newline at end of file
+WITH (lists = 100);
+
+-- Single-row index state; generation changes whenever indexed rows do
+CREATE TABLE IF NOT EXISTS index_state (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    generation BIGINT NOT NULL DEFAULT 0,
+    last_indexed_at TIMESTAMP,
+    embedding_cache_hits BIGINT NOT NULL DEFAULT 0,
+    embedding_cache_misses BIGINT NOT NULL DEFAULT 0,
+    result_cache_hits BIGINT NOT NULL DEFAULT 0,
+    result_cache_misses BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO index_state (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+-- Persistent query caches (LRU + TTL, see src/cache.py)
+CREATE TABLE IF NOT EXISTS query_embedding_cache (
+    query_text TEXT PRIMARY KEY,  -- sanitized query text
+    embedding REAL[] NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_used_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS search_result_cache (
+    cache_key TEXT PRIMARY KEY,  -- hash of query, limit and filters
+    generation BIGINT NOT NULL,  -- index generation the results were computed against
+    results JSONB NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_used_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Persistent caches for query embeddings and search results."""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from embeddings import generate_embedding, sanitize_text_for_embedding
+from database import VectorDB
+
+# Query embeddings only change if the embedding model does, so they can live long
+EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("CODE_SEARCH_EMBEDDING_CACHE_TTL", str(30 * 24 * 3600)))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("CODE_SEARCH_EMBEDDING_CACHE_SIZE", "10000"))
+# Results are also invalidated by the index generation, the TTL just bounds staleness
+RESULT_CACHE_TTL_SECONDS = int(os.getenv("CODE_SEARCH_RESULT_CACHE_TTL", str(24 * 3600)))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("CODE_SEARCH_RESULT_CACHE_SIZE", "5000"))
+
+
+def cached_query_embedding(db: VectorDB, query: str) -> Optional[List[float]]:
+    """Embed a query, reusing the stored vector for any query that sanitizes to the same text."""
+    query_text = sanitize_text_for_embedding(query)
+    embedding = db.get_cached_embedding(query_text, EMBEDDING_CACHE_TTL_SECONDS)
+    if embedding is None:
+        embedding = generate_embedding(query)
+        if embedding:
+            db.put_cached_embedding(query_text, embedding, EMBEDDING_CACHE_MAX_ENTRIES)
+    return embedding
+
+
+def result_cache_key(query: str, limit: int, element_type: Optional[str]) -> str:
+    """Stable key for a search request; the index generation is stored alongside it."""
+    payload = json.dumps({
+        'query': sanitize_text_for_embedding(query),
+        'limit': limit,
+        'element_type': element_type,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def cached_search(db: VectorDB, query: str, limit: int,
+                  element_type: Optional[str] = None) -> Optional[List[Tuple[Dict[str, Any], float]]]:
+    """Run a semantic search, serving repeats from the result cache until the index changes.
+
+    Returns None if the query could not be embedded.
+    """
+    generation = db.generation()
+    cache_key = result_cache_key(query, limit, element_type)
+
+    results = db.get_cached_results(cache_key, generation, RESULT_CACHE_TTL_SECONDS)
+    if results is not None:
+        return results
+
+    query_embedding = cached_query_embedding(db, query)
+    if not query_embedding:
+        return None
+
+    results = db.search_similar(query_embedding, limit, element_type)
+    db.put_cached_results(cache_key, generation, results, RESULT_CACHE_MAX_ENTRIES)
+    return results
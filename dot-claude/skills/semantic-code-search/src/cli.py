@@ -3,13 +3,55 @@
 
 import sys
 import argparse
-from typing import Dict, List, Tuple, Any
+import math
+import resource
+from typing import Dict, Iterable, Iterator, List, Tuple, Any
 
-from indexer import find_python_files, extract_code_elements
-from embeddings import generate_embedding, create_searchable_text
-from database import VectorDB
+from indexer import CodeElement, find_python_files, extract_code_elements, iter_code_elements
+from embeddings import (
+    generate_embedding, generate_embeddings, chunk_searchable_text, pack_embedding_batches,
+    is_transient_error,
+)
+from database import VectorDB, ElementRow, TRANSIENT_DB_ERRORS
+from watcher import watch
+from cache import cached_search
 import os
 
+# (element, chunk_index, searchable_text) awaiting an embedding
+Chunk = Tuple[CodeElement, int, str]
+
+# Share of the memory ceiling given to the in-flight batch; the rest covers
+# the interpreter, client libraries and the file currently being parsed.
+BATCH_MEMORY_FRACTION = 0.5
+DEFAULT_MAX_MEMORY_MB = int(os.getenv("CODE_SEARCH_MAX_MEMORY_MB", "256"))
+
+def batch_bytes_for_memory(max_memory_mb: int) -> int:
+    """In-flight batch budget that keeps indexing under the memory ceiling."""
+    return int(max_memory_mb * 1024 * 1024 * BATCH_MEMORY_FRACTION)
+
+def _announce_files(file_paths: Iterable[str], counter: Dict[str, int]) -> Iterator[str]:
+    """Print and count each file as it enters the pipeline."""
+    for file_path in file_paths:
+        print(f"Processing {file_path}...")
+        counter['files'] += 1
+        yield file_path
+
+def iter_chunks(elements: Iterable[CodeElement]) -> Iterator[Chunk]:
+    """Expand elements into token-bounded chunks of searchable text."""
+    for element in elements:
+        texts = chunk_searchable_text(element.element_name, element.signature, element.docstring)
+        for chunk_index, text in enumerate(texts):
+            yield element, chunk_index, text
+
+def embed_chunks(chunks: List[Chunk]) -> List[ElementRow]:
+    """Embed a batch of chunks in one request."""
+    embeddings = generate_embeddings([text for _, _, text in chunks])
+    return [chunk + (embedding,) for chunk, embedding in zip(chunks, embeddings)]
+
+def pack_chunks(chunks: Iterable[Chunk], max_bytes: int) -> Iterator[List[Chunk]]:
+    """Pack chunks densely up to the provider's limits and the in-flight memory budget."""
+    return pack_embedding_batches(chunks, lambda chunk: chunk[2], max_bytes=max_bytes)
+
 def cmd_index(args):
     """Index Python files with vector embeddings."""
     print(f"Indexing Python files in {args.directory}...")
@@ -19,52 +61,87 @@ def cmd_index(args):
         db.clear_all()
         print("Cleared existing index")
     
-    python_files = find_python_files(args.directory)
+    batch_bytes = batch_bytes_for_memory(args.max_memory_mb)
+    counter = {'files': 0}
     total_elements = 0
+    largest_batch = 0
     
-    for file_path in python_files:
-        print(f"Processing {file_path}...")
-        elements = extract_code_elements(file_path)
-        
-        for element in elements:
-            # Create searchable text for embedding
-            searchable_text = create_searchable_text(
-                element['element_name'], 
-                element['signature'], 
-                element['docstring']
-            )
-            
-            # Generate vector embedding
-            embedding = generate_embedding(searchable_text)
-            
-            if embedding:
-                db.insert(
-                    file_path=element['file_path'],
-                    name=element['element_name'],
-                    element_type=element['element_type'], 
-                    signature=element['signature'],
-                    docstring=element['docstring'],
-                    embedding=embedding
-                )
-                total_elements += 1
-    
-    print(f"Indexed {total_elements} elements from {len(python_files)} files")
+    # walk -> parse -> embed -> write, holding at most one batch in memory
+    files = _announce_files(find_python_files(args.directory), counter)
+    for batch in pack_chunks(iter_chunks(iter_code_elements(files)), batch_bytes):
+        db.insert_many(embed_chunks(batch))
+        largest_batch = max(largest_batch, len(batch))
+        total_elements += sum(1 for _, chunk_index, _ in batch if chunk_index == 0)
+    db.bump_generation()
+    
+    print(f"Indexed {total_elements} elements from {counter['files']} files")
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Peak memory: {peak_mb:.0f} MB (ceiling {args.max_memory_mb} MB, largest batch {largest_batch} chunks)")
     db.close()
 
+def cmd_watch(args):
+    """Keep the index fresh by re-indexing files as they change."""
+    db = VectorDB()
+    batch_bytes = batch_bytes_for_memory(args.max_memory_mb)
+
+    def reindex_file(file_path: str) -> None:
+        db.reconnect_if_closed()
+        if not os.path.exists(file_path):
+            db.delete_file(file_path)
+            print(f"Removed {file_path}")
+            return
+        try:
+            elements = list(extract_code_elements(file_path))
+        except (SyntaxError, ValueError) as e:
+            # Usually a save mid-edit (or null bytes / undecodable content); keep the
+            # previous rows until the file changes and parses again
+            print(f"Skipped {file_path}: {e}")
+            return
+        rows = []
+        for batch in pack_chunks(iter_chunks(elements), batch_bytes):
+            rows.extend(embed_chunks(batch))
+        db.replace_file(file_path, rows)
+        print(f"Re-indexed {file_path} ({len(elements)} elements)")
+
+    def reindex(paths: List[str]) -> List[str]:
+        """Re-index each path; returns the ones that hit a transient error so the watcher retries them."""
+        failed = []
+        for file_path in paths:
+            try:
+                reindex_file(file_path)
+            except Exception as e:
+                # OpenAI rate limits and timeouts, a dropped database connection, I/O errors
+                if isinstance(e, (OSError, *TRANSIENT_DB_ERRORS)) or is_transient_error(e):
+                    print(f"Failed to re-index {file_path}, will retry: {e}")
+                    failed.append(file_path)
+                else:
+                    print(f"Failed to re-index {file_path}, skipping until it changes: {e}")
+        return failed
+
+    try:
+        watch(args.directory, reindex, debounce=args.debounce,
+              poll=args.poll, poll_interval=args.poll_interval)
+    except KeyboardInterrupt:
+        print("Stopped watching")
+    finally:
+        db.close()
+
 def cmd_find(args):
     """Find code elements using semantic vector search."""
     db = VectorDB()
     
-    # Generate embedding for search query
-    query_embedding = generate_embedding(args.query)
+    if args.no_cache:
+        query_embedding = generate_embedding(args.query)
+        results = db.search_similar(query_embedding, args.limit, args.type) if query_embedding else None
+    else:
+        # Repeated queries skip the OpenAI round trip and, until the next reindex, the ANN query
+        results = cached_search(db, args.query, args.limit, args.type)
     
-    if not query_embedding:
+    if results is None:
         print("Failed to generate embedding for query")
+        db.close()
         return
     
-    # Perform vector similarity search
-    results = db.search_similar(query_embedding, args.limit)
-    
     if not results:
         print("No results found")
         db.close()
@@ -87,8 +164,21 @@ def cmd_find(args):
     
     db.close()
 
+def recommended_ivfflat_lists(rows: int) -> int:
+    """pgvector's guidance: rows / 1000 up to 1M rows, sqrt(rows) beyond."""
+    if rows <= 1_000_000:
+        return max(1, rows // 1000)
+    return int(math.sqrt(rows))
+
+def _hit_rate(hits: int, misses: int) -> str:
+    total = hits + misses
+    return f"{hits / total:.0%} ({hits}/{total})" if total else "n/a"
+
+def _megabytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
+
 def cmd_stats(args):
-    """Show indexing statistics."""
+    """Show indexing statistics and index health."""
     db = VectorDB()
     stats = db.stats()
     
@@ -97,6 +187,39 @@ def cmd_stats(args):
     print(f"Functions: {stats['functions']}")
     print(f"Classes: {stats['classes']}")
     print(f"Files indexed: {stats['unique_files']}")
+    print(f"Vectors (incl. chunks of long elements): {stats['total_vectors']}")
+    print(f"Last indexed: {stats['last_indexed_at'] or 'never'} (generation {stats['generation']})")
+    
+    print("\nIndex Health:")
+    warnings = []
+    if stats['ann_index_type']:
+        print(f"ANN index: {stats['ann_index_type']} ({_megabytes(stats['ann_index_bytes'])})")
+    else:
+        print("ANN index: missing (searches fall back to a sequential scan)")
+        warnings.append("No vector index on code_elements.embedding")
+    
+    if stats['ann_lists']:
+        recommended = recommended_ivfflat_lists(stats['total_vectors'])
+        print(f"Lists: {stats['ann_lists']} (recommended for {stats['total_vectors']} rows: {recommended})")
+        print(f"Probes: {stats['ann_probes']} (recommended: {max(1, int(math.sqrt(stats['ann_lists'])))})")
+        if not recommended / 4 <= stats['ann_lists'] <= recommended * 4:
+            warnings.append(
+                f"lists={stats['ann_lists']} is far from {recommended}; "
+                "recreate the index after bulk loads to keep recall high"
+            )
+    
+    live, dead = stats['live_tuples'], stats['dead_tuples']
+    dead_ratio = dead / (live + dead) if live + dead else 0.0
+    print(f"Table size: {_megabytes(stats['table_bytes'])}")
+    print(f"Dead tuples: {dead} ({dead_ratio:.0%}), last vacuum: {stats['last_vacuum_at'] or 'never'}")
+    if dead_ratio > 0.2:
+        warnings.append("Over 20% dead tuples; run VACUUM ANALYZE code_elements")
+    
+    print(f"Embedding cache hit rate: {_hit_rate(stats['embedding_cache_hits'], stats['embedding_cache_misses'])}")
+    print(f"Result cache hit rate: {_hit_rate(stats['result_cache_hits'], stats['result_cache_misses'])}")
+    
+    for warning in warnings:
+        print(f"⚠ {warning}")
     
     db.close()
 
@@ -109,12 +232,27 @@ def main():
     index_parser = subparsers.add_parser('index', help='Index Python files')
     index_parser.add_argument('directory', help='Directory to index')
     index_parser.add_argument('--clear', action='store_true', help='Clear existing index')
+    index_parser.add_argument('--max-memory-mb', type=int, default=DEFAULT_MAX_MEMORY_MB,
+                              help='Approximate memory ceiling for indexing (default: $CODE_SEARCH_MAX_MEMORY_MB or 256)')
     index_parser.set_defaults(func=cmd_index)
     
+    # Watch command
+    watch_parser = subparsers.add_parser('watch', help='Re-index files as they change')
+    watch_parser.add_argument('directory', help='Directory to watch')
+    watch_parser.add_argument('--poll', action='store_true', help='Poll for changes instead of using inotify')
+    watch_parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between polls (default: 1.0)')
+    watch_parser.add_argument('--debounce', type=float, default=0.5,
+                              help='Seconds a file must be quiet before re-indexing (default: 0.5)')
+    watch_parser.add_argument('--max-memory-mb', type=int, default=DEFAULT_MAX_MEMORY_MB,
+                              help='Approximate memory ceiling for embedding batches')
+    watch_parser.set_defaults(func=cmd_watch)
+    
     # Find command  
     find_parser = subparsers.add_parser('find', help='Search for code semantically')
     find_parser.add_argument('query', help='Search query')
     find_parser.add_argument('--limit', type=int, default=5, help='Number of results')
+    find_parser.add_argument('--type', choices=['function', 'class'], help='Only return this element type')
+    find_parser.add_argument('--no-cache', action='store_true', help='Bypass the query and result caches')
     find_parser.set_defaults(func=cmd_find)
     
     # Stats command
@@ -3,10 +3,22 @@
 
 import os
 import sys
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Sequence
 import psycopg2
 import psycopg2.extras
 
+from indexer import CodeElement
+
+# (element, chunk_index, searchable_text, embedding) as produced by the indexing pipeline
+ElementRow = Tuple[CodeElement, int, str, Sequence[float]]
+
+# Connection-level failures that a reconnect and retry can get past
+TRANSIENT_DB_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+def _vector_literal(embedding: Sequence[float]) -> str:
+    """Format an embedding as a pgvector text literal."""
+    return "[" + ",".join("%.7g" % value for value in embedding) + "]"
+
 class VectorDB:
     """PostgreSQL/pgvector database for semantic code search."""
     
@@ -21,6 +33,11 @@ class VectorDB:
         self.conn = psycopg2.connect(db_url)
         self.conn.autocommit = True
     
+    def reconnect_if_closed(self) -> None:
+        """Reopen the connection if the server dropped it."""
+        if self.conn is None or self.conn.closed:
+            self._connect()
+    
     def _ensure_schema(self):
         """Create tables if they don't exist."""
         with self.conn.cursor() as cur:
@@ -41,6 +58,16 @@ class VectorDB:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+            # Oversized elements are stored as several chunk rows; chunk 0 is the element itself
+            cur.execute("""
+                ALTER TABLE code_elements
+                ADD COLUMN IF NOT EXISTS chunk_index INTEGER NOT NULL DEFAULT 0
+            """)
+            # Tells apart elements of one file that share a name and signature (e.g. __init__(self))
+            cur.execute("""
+                ALTER TABLE code_elements
+                ADD COLUMN IF NOT EXISTS line_number INTEGER
+            """)
             
             # Create vector similarity index
             cur.execute("""
@@ -48,11 +75,68 @@ class VectorDB:
                 ON code_elements USING ivfflat (embedding vector_cosine_ops)
                 WITH (lists = 100)
             """)
+            
+            # Single-row index state; generation changes whenever indexed rows do
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS index_state (
+                    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+                    generation BIGINT NOT NULL DEFAULT 0,
+                    last_indexed_at TIMESTAMP,
+                    embedding_cache_hits BIGINT NOT NULL DEFAULT 0,
+                    embedding_cache_misses BIGINT NOT NULL DEFAULT 0,
+                    result_cache_hits BIGINT NOT NULL DEFAULT 0,
+                    result_cache_misses BIGINT NOT NULL DEFAULT 0
+                )
+            """)
+            cur.execute("INSERT INTO index_state (id) VALUES (1) ON CONFLICT (id) DO NOTHING")
+            
+            # Query caches survive process restarts
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS query_embedding_cache (
+                    query_text TEXT PRIMARY KEY,
+                    embedding REAL[] NOT NULL,
+                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    last_used_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS search_result_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    generation BIGINT NOT NULL,
+                    results JSONB NOT NULL,
+                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    last_used_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
     
     def clear_all(self):
         """Clear all indexed code elements."""
         with self.conn.cursor() as cur:
             cur.execute("DELETE FROM code_elements")
+            self._bump_generation(cur)
+    
+    def _bump_generation(self, cur) -> None:
+        """Advance the index generation and drop result-cache entries from older generations."""
+        cur.execute("""
+            UPDATE index_state
+            SET generation = generation + 1, last_indexed_at = CURRENT_TIMESTAMP
+            WHERE id = 1
+        """)
+        cur.execute("""
+            DELETE FROM search_result_cache
+            WHERE generation < (SELECT generation FROM index_state WHERE id = 1)
+        """)
+    
+    def bump_generation(self) -> None:
+        """Mark the index as changed so cached search results are invalidated."""
+        with self.conn.cursor() as cur:
+            self._bump_generation(cur)
+    
+    def generation(self) -> int:
+        """Current index generation number."""
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT generation FROM index_state WHERE id = 1")
+            return cur.fetchone()[0]
     
     def insert(self, file_path: str, name: str, element_type: str, 
                signature: str, docstring: str, embedding: List[float]) -> None:
@@ -67,20 +151,74 @@ class VectorDB:
                 (file_path, element_name, element_type, signature, docstring, searchable_text, embedding)
                 VALUES (%s, %s, %s, %s, %s, %s, %s)
             """, (file_path, name, element_type, signature, docstring, searchable_text, embedding))
+
+    def insert_many(self, rows: Sequence[ElementRow]) -> None:
+        """Insert a batch of code elements with their embeddings in one round trip."""
+        with self.conn.cursor() as cur:
+            psycopg2.extras.execute_values(cur, """
+                INSERT INTO code_elements
+                (file_path, element_name, element_type, signature, docstring,
+                 line_number, chunk_index, searchable_text, embedding)
+                VALUES %s
+            """, [
+                (element.file_path, element.element_name, element.element_type,
+                 element.signature, element.docstring, element.line_number, chunk_index,
+                 searchable_text, _vector_literal(embedding))
+                for element, chunk_index, searchable_text, embedding in rows
+            ], template="(%s, %s, %s, %s, %s, %s, %s, %s, %s::vector)", page_size=len(rows) or 1)
+    
+    def replace_file(self, file_path: str, rows: Sequence[ElementRow]) -> None:
+        """Atomically swap all rows for one file, so searches never see it half-indexed."""
+        self.conn.autocommit = False
+        try:
+            with self.conn:
+                with self.conn.cursor() as cur:
+                    cur.execute("DELETE FROM code_elements WHERE file_path = %s", (file_path,))
+                if rows:
+                    self.insert_many(rows)
+                with self.conn.cursor() as cur:
+                    self._bump_generation(cur)
+        finally:
+            self.conn.autocommit = True
+
+    def delete_file(self, file_path: str) -> None:
+        """Remove all indexed elements for a file."""
+        with self.conn.cursor() as cur:
+            cur.execute("DELETE FROM code_elements WHERE file_path = %s", (file_path,))
+            self._bump_generation(cur)
     
-    def search_similar(self, query_embedding: List[float], limit: int = 5) -> List[Tuple[Dict[str, Any], float]]:
-        """Search for similar code elements using vector similarity."""
+    def search_similar(self, query_embedding: List[float], limit: int = 5,
+                       element_type: Optional[str] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """Search for similar code elements using vector similarity.
+
+        Chunked elements score as their best-matching chunk.
+        """
+        from embeddings import MAX_CHUNKS_PER_ELEMENT
+
+        type_filter = "AND element_type = %(element_type)s" if element_type else ""
         with self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            # Use cosine similarity search with pgvector
-            cur.execute("""
-                SELECT 
-                    file_path, element_name, element_type, signature, docstring,
-                    1 - (embedding <=> %s::vector) as similarity_score
-                FROM code_elements 
-                WHERE embedding IS NOT NULL
-                ORDER BY embedding <=> %s::vector
-                LIMIT %s
-            """, (query_embedding, query_embedding, limit))
+            # Pull enough nearest chunks to cover `limit` elements even if each
+            # matches with all of its chunks, then keep the best chunk per element
+            cur.execute(f"""
+                WITH candidates AS (
+                    SELECT 
+                        file_path, line_number, element_name, element_type, signature, docstring,
+                        1 - (embedding <=> %(query)s::vector) as chunk_score
+                    FROM code_elements 
+                    WHERE embedding IS NOT NULL {type_filter}
+                    ORDER BY embedding <=> %(query)s::vector
+                    LIMIT %(candidates)s
+                )
+                SELECT file_path, element_name, element_type, signature, docstring,
+                       MAX(chunk_score) as similarity_score
+                FROM candidates
+                GROUP BY file_path, line_number, element_name, element_type, signature, docstring
+                ORDER BY similarity_score DESC
+                LIMIT %(limit)s
+            """, {
+                'query': query_embedding, 'limit': limit, 'element_type': element_type,
+                'candidates': limit * MAX_CHUNKS_PER_ELEMENT,
+            })
             
             results = []
             for row in cur.fetchall():
@@ -90,27 +228,126 @@ class VectorDB:
             
             return results
     
-    def stats(self) -> Dict[str, int]:
-        """Get database statistics."""
+    def get_cached_embedding(self, query_text: str, ttl_seconds: int) -> Optional[List[float]]:
+        """Return a cached query embedding younger than the TTL, refreshing its LRU position."""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE query_embedding_cache SET last_used_at = CURRENT_TIMESTAMP
+                WHERE query_text = %s AND created_at > CURRENT_TIMESTAMP - %s * INTERVAL '1 second'
+                RETURNING embedding
+            """, (query_text, ttl_seconds))
+            row = cur.fetchone()
+            counter = "embedding_cache_hits" if row else "embedding_cache_misses"
+            cur.execute(f"UPDATE index_state SET {counter} = {counter} + 1 WHERE id = 1")
+            return row[0] if row else None
+    
+    def put_cached_embedding(self, query_text: str, embedding: List[float], max_entries: int) -> None:
+        """Store a query embedding, evicting least recently used entries beyond max_entries."""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO query_embedding_cache (query_text, embedding) VALUES (%s, %s)
+                ON CONFLICT (query_text) DO UPDATE
+                SET embedding = EXCLUDED.embedding,
+                    created_at = CURRENT_TIMESTAMP, last_used_at = CURRENT_TIMESTAMP
+            """, (query_text, list(embedding)))
+            cur.execute("""
+                DELETE FROM query_embedding_cache WHERE query_text IN (
+                    SELECT query_text FROM query_embedding_cache
+                    ORDER BY last_used_at DESC OFFSET %s
+                )
+            """, (max_entries,))
+    
+    def get_cached_results(self, cache_key: str, generation: int,
+                           ttl_seconds: int) -> Optional[List[Tuple[Dict[str, Any], float]]]:
+        """Return cached search results for this index generation, if still fresh."""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE search_result_cache SET last_used_at = CURRENT_TIMESTAMP
+                WHERE cache_key = %s AND generation = %s
+                  AND created_at > CURRENT_TIMESTAMP - %s * INTERVAL '1 second'
+                RETURNING results
+            """, (cache_key, generation, ttl_seconds))
+            row = cur.fetchone()
+            counter = "result_cache_hits" if row else "result_cache_misses"
+            cur.execute(f"UPDATE index_state SET {counter} = {counter} + 1 WHERE id = 1")
+            if not row:
+                return None
+            return [(element, score) for element, score in row[0]]
+    
+    def put_cached_results(self, cache_key: str, generation: int,
+                           results: List[Tuple[Dict[str, Any], float]], max_entries: int) -> None:
+        """Store search results for this index generation, evicting least recently used entries."""
         with self.conn.cursor() as cur:
-            cur.execute("SELECT COUNT(*) FROM code_elements")
-            total = cur.fetchone()[0]
+            cur.execute("""
+                INSERT INTO search_result_cache (cache_key, generation, results) VALUES (%s, %s, %s)
+                ON CONFLICT (cache_key) DO UPDATE
+                SET generation = EXCLUDED.generation, results = EXCLUDED.results,
+                    created_at = CURRENT_TIMESTAMP, last_used_at = CURRENT_TIMESTAMP
+            """, (cache_key, generation, psycopg2.extras.Json([list(result) for result in results])))
+            cur.execute("""
+                DELETE FROM search_result_cache WHERE cache_key IN (
+                    SELECT cache_key FROM search_result_cache
+                    ORDER BY last_used_at DESC OFFSET %s
+                )
+            """, (max_entries,))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get database statistics and index health in a handful of cheap queries."""
+        with self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            # One scan for all element counts
+            cur.execute("""
+                SELECT
+                    COUNT(*) FILTER (WHERE chunk_index = 0) AS total_elements,
+                    COUNT(*) FILTER (WHERE chunk_index = 0 AND element_type = 'function') AS functions,
+                    COUNT(*) FILTER (WHERE chunk_index = 0 AND element_type = 'class') AS classes,
+                    COUNT(*) AS total_vectors,
+                    COUNT(DISTINCT file_path) AS unique_files
+                FROM code_elements
+            """)
+            stats = dict(cur.fetchone())
             
-            cur.execute("SELECT COUNT(*) FROM code_elements WHERE element_type = 'function'")
-            functions = cur.fetchone()[0]
+            # The rest comes from catalog and state rows, not the table itself
+            cur.execute("""
+                SELECT am.amname AS ann_index_type,
+                       pg_relation_size(c.oid) AS ann_index_bytes,
+                       c.reloptions AS ann_index_options
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                JOIN pg_am am ON am.oid = c.relam
+                WHERE i.indrelid = 'code_elements'::regclass
+                  AND am.amname IN ('ivfflat', 'hnsw')
+                LIMIT 1
+            """)
+            stats.update(cur.fetchone() or {
+                'ann_index_type': None, 'ann_index_bytes': 0, 'ann_index_options': None,
+            })
+            options = dict(option.split('=', 1) for option in stats.pop('ann_index_options') or [])
+            stats['ann_lists'] = int(options['lists']) if 'lists' in options else None
             
-            cur.execute("SELECT COUNT(*) FROM code_elements WHERE element_type = 'class'")
-            classes = cur.fetchone()[0]
+            cur.execute("SELECT current_setting('ivfflat.probes', true) AS probes")
+            # The setting only exists once pgvector is loaded in this session; 1 is its default
+            stats['ann_probes'] = int(cur.fetchone()['probes'] or 1)
             
-            cur.execute("SELECT COUNT(DISTINCT file_path) FROM code_elements")
-            files = cur.fetchone()[0]
+            cur.execute("""
+                SELECT n_live_tup AS live_tuples, n_dead_tup AS dead_tuples,
+                       GREATEST(last_vacuum, last_autovacuum) AS last_vacuum_at,
+                       pg_total_relation_size(relid) AS table_bytes
+                FROM pg_stat_user_tables
+                WHERE relname = 'code_elements'
+            """)
+            stats.update(cur.fetchone() or {
+                'live_tuples': 0, 'dead_tuples': 0, 'last_vacuum_at': None, 'table_bytes': 0,
+            })
+            
+            cur.execute("""
+                SELECT generation, last_indexed_at,
+                       embedding_cache_hits, embedding_cache_misses,
+                       result_cache_hits, result_cache_misses
+                FROM index_state WHERE id = 1
+            """)
+            stats.update(cur.fetchone())
             
-            return {
-                'total_elements': total,
-                'functions': functions, 
-                'classes': classes,
-                'unique_files': files
-            }
+            return stats
     
     def close(self):
         """Close database connection."""
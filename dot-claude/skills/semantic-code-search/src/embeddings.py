@@ -3,11 +3,40 @@
 
 import sys
 import os
-from typing import Optional
+import re
+from array import array
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, TypeVar
+
+T = TypeVar('T')
 
 # Standalone implementation - no external dependencies
 USING_MAIN_CODEBASE = False
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 1536
+# OpenAI accepts at most this many inputs per embeddings request
+MAX_INPUTS_PER_REQUEST = 2048
+# Provider limits are 8191 tokens per input and 300k tokens per request; our
+# estimate is heuristic, so pack requests to 80% of the request limit.
+MAX_TOKENS_PER_INPUT = 8191
+TOKEN_BUDGET_PER_REQUEST = 240_000
+# Oversized elements are split into chunks of this size, each carrying the
+# element's name and signature; text past the last chunk is dropped.
+MAX_CHUNK_TOKENS = int(os.getenv("CODE_SEARCH_MAX_CHUNK_TOKENS", "1024"))
+MAX_CHUNKS_PER_ELEMENT = int(os.getenv("CODE_SEARCH_MAX_CHUNKS", "4"))
+# The repeated name and signature may use at most this share of a chunk; longer
+# signatures (hundreds of parameters) are truncated so the docstring still fits.
+MAX_HEADER_FRACTION = 0.5
+# Rough peak cost of one input while its request is in flight: the response JSON
+# and parsed float list dominate (the stored float32 array is ~6KB), and the text
+# itself is held a few times over (raw, sanitized, request body).
+BYTES_PER_EMBEDDING_RESPONSE = 128 * 1024
+TEXT_COPIES_IN_FLIGHT = 4
+
+# BPE tokenizers rarely emit tokens longer than ~4 characters of a word, and
+# punctuation is usually its own token, so this over-counts slightly.
+_TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+
 def sanitize_text_for_embedding(text: str) -> str:
     """Simple text sanitization without emoji dependency."""
     if not text:
@@ -19,24 +48,83 @@ def sanitize_text_for_embedding(text: str) -> str:
     text = re.sub(r"\s+", " ", text)
     return text.strip()
 
+def estimate_tokens(text: str) -> int:
+    """Cheap, offline upper-bound-ish token count for embedding inputs."""
+    return sum(1 for _ in _TOKEN_PATTERN.finditer(text))
+
+def estimate_embedding_bytes(text: str) -> int:
+    """Approximate peak memory for embedding `text` as one input of a batch."""
+    return BYTES_PER_EMBEDDING_RESPONSE + TEXT_COPIES_IN_FLIGHT * len(text.encode())
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text after roughly `max_tokens` estimated tokens."""
+    if max_tokens <= 0:
+        return ""
+    for count, match in enumerate(_TOKEN_PATTERN.finditer(text), 1):
+        if count == max_tokens:
+            return text[:match.end()]
+    return text
+
 def generate_embedding(text: str, *, raise_on_error: bool = False) -> Optional[list[float]]:
     """Generate embeddings using OpenAI API."""
-    sanitized = sanitize_text_for_embedding(text)
+    sanitized = truncate_to_tokens(sanitize_text_for_embedding(text), MAX_TOKENS_PER_INPUT)
     if not sanitized:
-        return [0.0] * 1536
-    
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY environment variable not set")
+        return [0.0] * EMBEDDING_DIMENSIONS
     
-    import openai
-    client = openai.OpenAI(api_key=api_key)
-    response = client.embeddings.create(
-        model="text-embedding-3-small",
+    response = _get_client().embeddings.create(
+        model=EMBEDDING_MODEL,
         input=sanitized
     )
     return response.data[0].embedding
 
+def generate_embeddings(texts: Sequence[str]) -> List[array]:
+    """Generate embeddings for a batch of texts using as few OpenAI requests as possible.
+
+    Vectors are returned as compact float32 arrays in input order.
+    """
+    sanitized = [
+        truncate_to_tokens(sanitize_text_for_embedding(text), MAX_TOKENS_PER_INPUT)
+        for text in texts
+    ]
+    embeddings = [array('f', bytes(4 * EMBEDDING_DIMENSIONS)) for _ in sanitized]
+
+    # Empty texts keep their zero vector, matching generate_embedding
+    pending = [i for i, text in enumerate(sanitized) if text]
+    for start in range(0, len(pending), MAX_INPUTS_PER_REQUEST):
+        indexes = pending[start:start + MAX_INPUTS_PER_REQUEST]
+        response = _get_client().embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=[sanitized[i] for i in indexes]
+        )
+        for item in response.data:
+            embeddings[indexes[item.index]] = array('f', item.embedding)
+        del response
+
+    return embeddings
+
+_client = None
+
+def _get_client():
+    """Return a shared OpenAI client so batches reuse one HTTP connection pool."""
+    global _client
+    if _client is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY environment variable not set")
+
+        import openai
+        _client = openai.OpenAI(api_key=api_key)
+    return _client
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether an embedding request failed for a reason that may clear up on retry."""
+    try:
+        import openai
+    except ImportError:
+        return False
+    # APITimeoutError is an APIConnectionError
+    return isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError))
+
 def create_searchable_text(element_name: str, signature: str, docstring: str) -> str:
     """Create searchable text from code element components."""
     parts = [element_name, signature]
@@ -44,6 +132,70 @@ def create_searchable_text(element_name: str, signature: str, docstring: str) ->
         parts.append(docstring)
     return " ".join(filter(None, parts))
 
+def chunk_searchable_text(element_name: str, signature: str, docstring: str,
+                          max_tokens: int = MAX_CHUNK_TOKENS,
+                          max_chunks: int = MAX_CHUNKS_PER_ELEMENT) -> List[str]:
+    """Split an element's searchable text into chunks that each fit the token budget.
+
+    Every chunk repeats the name and signature so it embeds with context; the
+    result always has at least one chunk and none exceeds `max_tokens`.
+    """
+    text = create_searchable_text(element_name, signature, docstring)
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    header = truncate_to_tokens(create_searchable_text(element_name, signature, ""),
+                                int(max_tokens * MAX_HEADER_FRACTION))
+    budget = max_tokens - estimate_tokens(header)
+    chunks = []
+    words: List[str] = []
+    used = 0
+    for word in docstring.split():
+        cost = estimate_tokens(word)
+        if cost > budget:
+            # A single huge token run (e.g. an embedded blob) still has to fit
+            word, cost = truncate_to_tokens(word, budget), budget
+        if used + cost > budget:
+            chunks.append(f"{header} {' '.join(words)}")
+            if len(chunks) == max_chunks:
+                break
+            words, used = [], 0
+        words.append(word)
+        used += cost
+    else:
+        if words:
+            chunks.append(f"{header} {' '.join(words)}")
+    # Elements with an oversized signature and no docstring still get indexed.
+    # The hard cut is a backstop: chunks are built within budget already.
+    return [truncate_to_tokens(chunk, max_tokens) for chunk in chunks or [header]]
+
+def pack_embedding_batches(items: Iterable[T], text_of: Callable[[T], str],
+                           max_inputs: int = MAX_INPUTS_PER_REQUEST,
+                           max_tokens: int = TOKEN_BUDGET_PER_REQUEST,
+                           max_bytes: Optional[int] = None) -> Iterator[List[T]]:
+    """Group items into batches as large as the per-request input and token limits allow.
+
+    With `max_bytes`, batches also stay within that estimated in-flight memory.
+    """
+    batch: List[T] = []
+    used = 0
+    used_bytes = 0
+    for item in items:
+        text = text_of(item)
+        cost = min(estimate_tokens(text), MAX_TOKENS_PER_INPUT)
+        size = estimate_embedding_bytes(text) if max_bytes is not None else 0
+        if batch and (len(batch) >= max_inputs or used + cost > max_tokens
+                      or (max_bytes is not None and used_bytes + size > max_bytes)):
+            yield batch
+            batch, used, used_bytes = [], 0, 0
+        batch.append(item)
+        used += cost
+        used_bytes += size
+    if batch:
+        yield batch
+
 
 # Export the functions for compatibility
-__all__ = ['generate_embedding', 'sanitize_text_for_embedding', 'create_searchable_text']
\ No newline at end of file
+__all__ = ['generate_embedding', 'generate_embeddings', 'sanitize_text_for_embedding', 'create_searchable_text',
+           'chunk_searchable_text', 'estimate_tokens', 'estimate_embedding_bytes', 'pack_embedding_batches',
+           'is_transient_error']
\ No newline at end of file
@@ -3,26 +3,38 @@
 
 import ast
 import os
-from typing import List, Dict, Any
-from pathlib import Path
+from dataclasses import dataclass
+from typing import Iterable, Iterator
 
-def extract_code_elements(file_path: str) -> List[Dict[str, Any]]:
+SKIPPED_DIRS = {'__pycache__', 'node_modules'}
+
+
+@dataclass(slots=True)
+class CodeElement:
+    """Compact record for one extracted function or class."""
+    file_path: str
+    element_name: str
+    element_type: str
+    signature: str
+    docstring: str
+    line_number: int
+
+
+def extract_code_elements(file_path: str) -> Iterator[CodeElement]:
     """Extract functions and classes from a Python file using AST."""
     with open(file_path, 'r', encoding='utf-8') as f:
         content = f.read()
     
     tree = ast.parse(content)
-    elements = []
+    del content
     
     for node in ast.walk(tree):
         if isinstance(node, ast.FunctionDef):
-            elements.append(_extract_function(node, file_path))
+            yield _extract_function(node, file_path)
         elif isinstance(node, ast.ClassDef):
-            elements.append(_extract_class(node, file_path))
-    
-    return elements
+            yield _extract_class(node, file_path)
 
-def _extract_function(node: ast.FunctionDef, file_path: str) -> Dict[str, Any]:
+def _extract_function(node: ast.FunctionDef, file_path: str) -> CodeElement:
     """Extract function information from AST node."""
     # Build signature
     args = []
@@ -38,16 +50,16 @@ def _extract_function(node: ast.FunctionDef, file_path: str) -> Dict[str, Any]:
         and isinstance(node.body[0].value.value, str)):
         docstring = node.body[0].value.value
     
-    return {
-        'file_path': file_path,
-        'element_name': node.name,
-        'element_type': 'function',
-        'signature': signature,
-        'docstring': docstring,
-        'line_number': node.lineno
-    }
+    return CodeElement(
+        file_path=file_path,
+        element_name=node.name,
+        element_type='function',
+        signature=signature,
+        docstring=docstring,
+        line_number=node.lineno
+    )
 
-def _extract_class(node: ast.ClassDef, file_path: str) -> Dict[str, Any]:
+def _extract_class(node: ast.ClassDef, file_path: str) -> CodeElement:
     """Extract class information from AST node."""
     # Build signature with base classes
     bases = [base.id for base in node.bases if isinstance(base, ast.Name)]
@@ -62,24 +74,39 @@ def _extract_class(node: ast.ClassDef, file_path: str) -> Dict[str, Any]:
         and isinstance(node.body[0].value.value, str)):
         docstring = node.body[0].value.value
     
-    return {
-        'file_path': file_path,
-        'element_name': node.name,
-        'element_type': 'class',
-        'signature': signature,
-        'docstring': docstring,
-        'line_number': node.lineno
-    }
+    return CodeElement(
+        file_path=file_path,
+        element_name=node.name,
+        element_type='class',
+        signature=signature,
+        docstring=docstring,
+        line_number=node.lineno
+    )
 
-def find_python_files(directory: str) -> List[str]:
-    """Find all Python files in directory recursively."""
-    python_files = []
+def _is_skipped_dir(name: str) -> bool:
+    """Common non-source directories that are never indexed."""
+    return name.startswith('.') or name in SKIPPED_DIRS
+
+def _is_python_file(name: str) -> bool:
+    return name.endswith('.py') and not name.startswith('.')
+
+def find_python_files(directory: str) -> Iterator[str]:
+    """Find all Python files in directory recursively, yielding paths as they are found."""
     for root, dirs, files in os.walk(directory):
-        # Skip common non-source directories
-        dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['__pycache__', 'node_modules']]
+        dirs[:] = [d for d in dirs if not _is_skipped_dir(d)]
         
         for file in files:
-            if file.endswith('.py') and not file.startswith('.'):
-                python_files.append(os.path.join(root, file))
-    
-    return python_files
\ No newline at end of file
+            if _is_python_file(file):
+                yield os.path.join(root, file)
+
+def is_python_source(path: str, directory: str) -> bool:
+    """Whether find_python_files(directory) would yield this path."""
+    relative_dir, file = os.path.split(os.path.relpath(path, directory))
+    if not _is_python_file(file) or relative_dir.startswith('..'):
+        return False
+    return not any(_is_skipped_dir(part) for part in relative_dir.split(os.sep) if part)
+
+def iter_code_elements(file_paths: Iterable[str]) -> Iterator[CodeElement]:
+    """Stream code elements from each file, holding at most one parsed file in memory."""
+    for file_path in file_paths:
+        yield from extract_code_elements(file_path)
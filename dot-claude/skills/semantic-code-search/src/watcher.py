@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""File-system watching with debounced change batches for incremental indexing."""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from indexer import find_python_files, is_python_source
+
+# watchdog uses inotify on Linux; without it we fall back to mtime polling
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    HAS_WATCHDOG = True
+except ImportError:
+    FileSystemEventHandler = object
+    HAS_WATCHDOG = False
+
+CHANGE_EVENT_TYPES = {'created', 'modified', 'deleted', 'moved'}
+# Files whose re-index failed (rate limit, dropped connection) are retried after this long
+RETRY_DELAY = 10.0
+
+
+class ChangeQueue:
+    """Collects changed paths and releases them once they have been quiet for `debounce` seconds."""
+
+    def __init__(self, debounce: float):
+        self.debounce = debounce
+        self._pending: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, path: str, delay: float = 0.0) -> None:
+        """Record a change, pushing back the path's release time by at least `delay` seconds."""
+        with self._lock:
+            self._pending[path] = time.monotonic() + delay
+
+    def drain_ready(self) -> List[str]:
+        """Remove and return paths with no new events inside the debounce window."""
+        cutoff = time.monotonic() - self.debounce
+        with self._lock:
+            ready = [path for path, seen in self._pending.items() if seen <= cutoff]
+            for path in ready:
+                del self._pending[path]
+        return sorted(ready)
+
+
+class _InotifyHandler(FileSystemEventHandler):
+    """Forwards watchdog events for Python sources into a ChangeQueue."""
+
+    def __init__(self, directory: str, queue: ChangeQueue):
+        super().__init__()
+        self.directory = directory
+        self.queue = queue
+
+    def on_any_event(self, event):
+        # Open/close events fire when we read the file ourselves; ignore them
+        if event.is_directory or event.event_type not in CHANGE_EVENT_TYPES:
+            return
+        for path in (event.src_path, getattr(event, 'dest_path', '')):
+            if path and is_python_source(path, self.directory):
+                self.queue.add(path)
+
+
+class PollingWatcher:
+    """Detects changes by comparing file mtimes between directory scans."""
+
+    def __init__(self, directory: str, queue: ChangeQueue, interval: float):
+        self.directory = directory
+        self.queue = queue
+        self.interval = interval
+        self._snapshot = self._scan()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _scan(self) -> Dict[str, int]:
+        snapshot = {}
+        for path in find_python_files(self.directory):
+            try:
+                snapshot[path] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return snapshot
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            current = self._scan()
+            for path, mtime in current.items():
+                if self._snapshot.get(path) != mtime:
+                    self.queue.add(path)
+            for path in self._snapshot.keys() - current.keys():
+                self.queue.add(path)
+            self._snapshot = current
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def watch(directory: str, on_change: Callable[[List[str]], Optional[List[str]]], *,
+          debounce: float = 0.5, poll: bool = False, poll_interval: float = 1.0) -> None:
+    """Block forever, calling `on_change` with batches of changed Python files.
+
+    Events arriving while `on_change` runs keep accumulating, so a burst of
+    saves collapses into a single call per file. Paths `on_change` returns, or
+    the whole batch if it raises, are queued again and retried after RETRY_DELAY.
+    """
+    queue = ChangeQueue(debounce)
+
+    if HAS_WATCHDOG and not poll:
+        observer = Observer()
+        observer.schedule(_InotifyHandler(directory, queue), directory, recursive=True)
+        print(f"Watching {directory} for changes (inotify)...")
+    else:
+        observer = PollingWatcher(directory, queue, poll_interval)
+        print(f"Watching {directory} for changes (polling every {poll_interval}s)...")
+
+    observer.start()
+    try:
+        while True:
+            time.sleep(min(debounce, 0.2))
+            changed = queue.drain_ready()
+            if not changed:
+                continue
+            try:
+                failed = on_change(changed) or []
+            except Exception as e:
+                print(f"Re-index failed, retrying in {RETRY_DELAY:.0f}s: {e}")
+                failed = changed
+            for path in failed:
+                queue.add(path, delay=RETRY_DELAY)
+    finally:
+        observer.stop()
+        if HAS_WATCHDOG and not poll:
+            observer.join()
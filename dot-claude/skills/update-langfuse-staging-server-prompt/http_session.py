@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Shared, pooled requests session for the staging push/sync scripts.
+
+One process-wide session keeps connections alive across calls instead of
+opening a new TLS connection per request. requests negotiates gzip/deflate
+compression by default. Transient failures are retried with jittered
+exponential backoff, honoring `Retry-After` on 429 responses.
+
+Environment (all optional):
+    LANGFUSE_HTTP_TIMEOUT          Read timeout in seconds (default: 30)
+    LANGFUSE_HTTP_CONNECT_TIMEOUT  Connect timeout in seconds (default: 10)
+    LANGFUSE_HTTP_MAX_CONNECTIONS  Connection pool size per host (default: 20)
+    LANGFUSE_HTTP_MAX_RETRIES      Retries per request (default: 4)
+"""
+
+import os
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_TIMEOUT = float(os.environ.get("LANGFUSE_HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("LANGFUSE_HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("LANGFUSE_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_RETRIES = int(os.environ.get("LANGFUSE_HTTP_MAX_RETRIES", "4"))
+
+# (connect, read) timeout tuple for requests
+TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_TIMEOUT)
+
+
+class _PromptSafeRetry(Retry):
+    """
+    Retries 429 for every method but 5xx only for idempotent ones.
+
+    Creating a prompt version is a POST; resending it after a 5xx could create a
+    duplicate version, while a 429 means the server did not process it.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 429:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def _retry_policy() -> Retry:
+    options = dict(
+        total=HTTP_MAX_RETRIES,
+        connect=HTTP_MAX_RETRIES,
+        read=HTTP_MAX_RETRIES,
+        status=HTTP_MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    try:
+        # urllib3 2.x adds random jitter so parallel workers do not retry in lockstep
+        return _PromptSafeRetry(**options, backoff_jitter=0.5)
+    except TypeError:
+        return _PromptSafeRetry(**options)
+
+
+@lru_cache(maxsize=None)
+def get_session() -> requests.Session:
+    """The process-wide pooled session, created on first use."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_MAX_CONNECTIONS,
+        pool_maxsize=HTTP_MAX_CONNECTIONS,
+        max_retries=_retry_policy(),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -39,6 +39,7 @@ import requests
 # Add current directory to path to import env_loader
 sys.path.insert(0, str(Path(__file__).parent))
 from env_loader import load_arsenal_env, find_project_root
+from http_session import TIMEOUT, get_session
 
 
 def validate_credentials(environment: str = "staging") -> tuple[str, str, str] | None:
@@ -195,12 +196,12 @@ def push_prompt(
 
     # Make API request
     try:
-        response = requests.post(
+        response = get_session().post(
             url,
             json=payload,
             auth=(public_key, secret_key),
             headers={"Content-Type": "application/json"},
-            timeout=30,
+            timeout=TIMEOUT,
         )
 
         if response.status_code in [200, 201]:
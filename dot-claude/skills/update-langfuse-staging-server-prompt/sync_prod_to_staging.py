@@ -13,6 +13,8 @@ SAFETY FEATURES:
 - Validates both server credentials separately
 - Requires confirmation before syncing
 - Shows diff of what will be synced
+- Only pushes prompts whose content or config differ from staging's latest version,
+  so a sync with nothing to do creates no new versions
 
 Usage:
     python sync_prod_to_staging.py [--prompt PROMPT_NAME] [--yes]
@@ -29,17 +31,22 @@ Environment:
 """
 
 import argparse
+import hashlib
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import quote
 
-import requests
 
 # Add current directory to path to import env_loader
 sys.path.insert(0, str(Path(__file__).parent))
 from env_loader import find_arsenal_dir, find_project_root
+from http_session import TIMEOUT, get_session
+
+DEFAULT_CONCURRENCY = 8
 
 
 def load_env_file(env_file: Path) -> dict[str, str]:
@@ -128,11 +135,11 @@ def get_all_prompts(public_key: str, secret_key: str, host: str, label: str = "p
 
     while True:
         try:
-            response = requests.get(
+            response = get_session().get(
                 url,
                 params={"page": page, "limit": page_size},
                 auth=(public_key, secret_key),
-                timeout=30,
+                timeout=TIMEOUT,
             )
 
             if response.status_code != 200:
@@ -164,8 +171,90 @@ def get_all_prompts(public_key: str, secret_key: str, host: str, label: str = "p
     return all_prompts
 
 
+def fetch_prompt(name: str, label: str, public_key: str, secret_key: str, host: str) -> dict | None:
+    """
+    Fetch the version of a prompt that carries `label` (the list endpoint only returns metadata).
+
+    Returns:
+        Prompt dictionary, or None if no version has that label
+    """
+    response = get_session().get(
+        f"{host}/api/public/v2/prompts/{quote(name, safe='')}",
+        params={"label": label},
+        auth=(public_key, secret_key),
+        timeout=TIMEOUT,
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+def prompt_fingerprint(prompt: dict) -> str:
+    """Hash of what a sync would push: type, content and config."""
+    payload = {
+        "type": prompt.get("type", "text"),
+        "prompt": prompt.get("prompt"),
+        "config": prompt.get("config") or {},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def diff_prompts(
+    prompt_names: list[str], prod_creds: tuple, staging_creds: tuple, concurrency: int = DEFAULT_CONCURRENCY
+) -> tuple[list[tuple[dict, str]], list[str], list[str]]:
+    """
+    Compare production's labeled version of each prompt with staging's latest version.
+
+    Both sides are fetched in parallel with bounded concurrency.
+
+    Returns:
+        ([(production prompt, reason)] for prompts that differ, names of prompts that match or were skipped,
+         names of prompts that could not be compared)
+    """
+
+    def compare(name: str) -> tuple[dict | None, str]:
+        try:
+            prod_prompt = fetch_prompt(name, "production", *prod_creds)
+            if prod_prompt is None:
+                return None, "no production version"
+            staging_prompt = fetch_prompt(name, "latest", *staging_creds)
+        except Exception as e:
+            return None, f"error: {e}"
+
+        if staging_prompt is None:
+            return prod_prompt, "new on staging"
+        if prompt_fingerprint(prod_prompt) == prompt_fingerprint(staging_prompt):
+            return None, "unchanged"
+        if prod_prompt.get("prompt") != staging_prompt.get("prompt"):
+            return prod_prompt, "content differs"
+        return prod_prompt, "config differs"
+
+    changed: list[tuple[dict, str]] = []
+    skipped: list[str] = []
+    failed: list[str] = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for name, (prompt, reason) in zip(prompt_names, executor.map(compare, prompt_names)):
+            if prompt is not None:
+                changed.append((prompt, reason))
+            elif reason.startswith("error:"):
+                print(f"  ❌ Could not compare {name}: {reason}")
+                failed.append(name)
+            else:
+                if reason != "unchanged":
+                    print(f"  ⚠️  Skipping {name}: {reason}")
+                skipped.append(name)
+    return changed, skipped, failed
+
+
 def push_prompt_to_server(
-    prompt_name: str, prompt_content: str, config: dict | None, public_key: str, secret_key: str, host: str
+    prompt_name: str,
+    prompt_content: str | list,
+    config: dict | None,
+    public_key: str,
+    secret_key: str,
+    host: str,
+    prompt_type: str = "text",
 ) -> dict | None:
     """
     Push a prompt to a Langfuse server.
@@ -180,7 +269,7 @@ def push_prompt_to_server(
     # This acts as a human-in-the-loop safety control - humans must manually add labels in Langfuse UI
     payload = {
         "name": prompt_name,
-        "type": "text",  # Default to text, could be enhanced to detect chat type
+        "type": prompt_type,
         "prompt": prompt_content,
         # "labels": [],  # NEVER set labels - human must assign in Langfuse UI
         "tags": ["auto-synced", "synced-from-prod"],
@@ -191,8 +280,12 @@ def push_prompt_to_server(
         payload["config"] = config
 
     try:
-        response = requests.post(
-            url, json=payload, auth=(public_key, secret_key), headers={"Content-Type": "application/json"}, timeout=30
+        response = get_session().post(
+            url,
+            json=payload,
+            auth=(public_key, secret_key),
+            headers={"Content-Type": "application/json"},
+            timeout=TIMEOUT,
         )
 
         if response.status_code in [200, 201]:
@@ -207,8 +300,12 @@ def push_prompt_to_server(
 
 
 def sync_prompts(
-    prod_creds: tuple, staging_creds: tuple, prompt_filter: str | None = None, auto_confirm: bool = False
-) -> None:
+    prod_creds: tuple,
+    staging_creds: tuple,
+    prompt_filter: str | None = None,
+    auto_confirm: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> bool:
     """
     Main sync function.
 
@@ -217,6 +314,10 @@ def sync_prompts(
         staging_creds: (public_key, secret_key, host) for staging
         prompt_filter: Optional specific prompt name to sync
         auto_confirm: Skip confirmation prompts
+        concurrency: Maximum requests in flight at once per step
+
+    Returns:
+        False if any prompt could not be fetched, compared or pushed
     """
     prod_public, prod_secret, prod_host = prod_creds
     staging_public, staging_secret, staging_host = staging_creds
@@ -230,23 +331,42 @@ def sync_prompts(
 
     if not prod_prompts:
         print("\n❌ No production prompts found to sync")
-        return
+        return False
 
     # Filter if specific prompt requested
     if prompt_filter:
         prod_prompts = [p for p in prod_prompts if p["name"] == prompt_filter]
         if not prod_prompts:
             print(f"\n❌ Prompt '{prompt_filter}' not found in production")
-            return
+            return False
+
+    # Only prompts whose content or config differ from staging's latest version get pushed
+    print(f"\n🔍 Comparing {len(prod_prompts)} prompt(s) with staging...")
+    changed, unchanged, failed = diff_prompts(
+        [p["name"] for p in prod_prompts], prod_creds, staging_creds, concurrency
+    )
 
     # Show what will be synced
     print("\n" + "=" * 60)
     print("STEP 2: Preview changes")
     print("=" * 60)
-    print(f"\nWill sync {len(prod_prompts)} prompt(s) from production → staging:\n")
 
-    for prompt in prod_prompts:
-        print(f"  • {prompt['name']}")
+    if failed:
+        print(f"\n❌ Could not compare {len(failed)} prompt(s) with staging: {', '.join(failed)}")
+        print("  → Check both servers' credentials and connectivity, then re-run")
+
+    if not changed:
+        if not failed:
+            print(f"\n✅ Staging already matches production, nothing to sync ({len(unchanged)} prompt(s) checked)")
+        return not failed
+
+    print(
+        f"\nWill sync {len(changed)} prompt(s) from production → staging "
+        f"({len(unchanged)} unchanged, {len(failed)} failed to compare):\n"
+    )
+
+    for prompt, reason in changed:
+        print(f"  • {prompt['name']} ({reason})")
         print(f"    Version: {prompt.get('version', 'unknown')}")
         print(f"    Labels: {prompt.get('labels', [])}")
         print()
@@ -257,48 +377,54 @@ def sync_prompts(
         response = input("Proceed with sync? [y/N]: ")
         if response.lower() != "y":
             print("❌ Sync cancelled")
-            return
+            return not failed
 
     # Sync each prompt
     print("\n" + "=" * 60)
     print("STEP 3: Syncing prompts to staging")
     print("=" * 60)
 
-    success_count = 0
-    for prompt in prod_prompts:
-        print(f"\n📤 Syncing: {prompt['name']}")
-
-        result = push_prompt_to_server(
+    def push(prompt: dict) -> dict | None:
+        return push_prompt_to_server(
             prompt["name"],
             prompt["prompt"],
             prompt.get("config"),
             staging_public,
             staging_secret,
             staging_host,
+            prompt_type=prompt.get("type", "text"),
         )
 
-        if result:
-            print(f"  ✅ Success! Version {result.get('version')} created on staging")
-            print(f"  ⚠️  NO LABEL ASSIGNED - human must add label in UI to activate")
-            # Extract project ID to build URL
-            project_id = result.get("projectId")
-            if project_id:
-                url = f"{staging_host}/project/{project_id}/prompts/{prompt['name']}"
-                print(f"  🔗 View: {url}")
-            success_count += 1
-        else:
-            print(f"  ❌ Failed to sync {prompt['name']}")
+    success_count = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        prompts = [prompt for prompt, _ in changed]
+        for prompt, result in zip(prompts, executor.map(push, prompts)):
+            print(f"\n📤 Syncing: {prompt['name']}")
+            if result:
+                print(f"  ✅ Success! Version {result.get('version')} created on staging")
+                print(f"  ⚠️  NO LABEL ASSIGNED - human must add label in UI to activate")
+                # Extract project ID to build URL
+                project_id = result.get("projectId")
+                if project_id:
+                    url = f"{staging_host}/project/{project_id}/prompts/{prompt['name']}"
+                    print(f"  🔗 View: {url}")
+                success_count += 1
+            else:
+                print(f"  ❌ Failed to sync {prompt['name']}")
 
     # Summary
     print("\n" + "=" * 60)
     print("SYNC COMPLETE")
     print("=" * 60)
-    print(f"✅ Successfully synced: {success_count}/{len(prod_prompts)} prompts")
+    print(f"✅ Successfully synced: {success_count}/{len(changed)} changed prompts ({len(unchanged)} unchanged)")
+    if failed:
+        print(f"❌ Could not compare (not synced): {len(failed)} prompt(s): {', '.join(failed)}")
     print("\n⚠️  IMPORTANT: All prompts were created WITHOUT LABELS")
     print("  → These prompts will NOT be used by the system until labeled")
     print("  → A human must manually add labels in the Langfuse UI")
     print("  → This is a safety control to prevent untested prompts from being used")
     print("=" * 60)
+    return success_count == len(changed) and not failed
 
 
 def main() -> None:
@@ -310,6 +436,12 @@ def main() -> None:
     )
     parser.add_argument("--prompt", help="Sync specific prompt by name (default: sync all)")
     parser.add_argument("--yes", "-y", action="store_true", help="Skip confirmation prompts")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum requests in flight at once (default: {DEFAULT_CONCURRENCY})",
+    )
 
     args = parser.parse_args()
 
@@ -347,7 +479,10 @@ def main() -> None:
         sys.exit(1)
 
     # Perform sync
-    sync_prompts(prod_creds, staging_creds, prompt_filter=args.prompt, auto_confirm=args.yes)
+    if not sync_prompts(
+        prod_creds, staging_creds, prompt_filter=args.prompt, auto_confirm=args.yes, concurrency=args.concurrency
+    ):
+        sys.exit(1)
 
 
 if __name__ == "__main__":